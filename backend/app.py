@@ -1,30 +1,126 @@
-from flask import Flask, request, jsonify, send_file
-from tensorflow import keras
-from PIL import Image
+from flask import Flask, request, jsonify, send_file, g
 import numpy as np
-import io
 import os
-from tensorflow.keras.applications.efficientnet import preprocess_input
 from flask_cors import CORS, cross_origin
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-from werkzeug.utils import secure_filename
 import random
-from urllib.parse import unquote
+from urllib.parse import quote, unquote
 import mimetypes
+import json
+import hmac
+import threading
+import time
+from collections import namedtuple
+from batching import BatcherStopped, MicroBatcher
+from prediction_cache import PredictionCache, content_hash, model_identity
+from model_loader import ModelLoader
+from model_registry import ModelRegistry, check_compatible
+from runtimes import EnsembleRuntime, StubRuntime, bucket_size, load_runtime, resolve_model_paths
+from preprocessing import IMG_SIZE, preprocess_image
+from migrations import apply_migrations
+from pagination import PaginationError, paginated_json
+from db_config import engine_options, register_sqlite_pragmas
+from jobs import JobQueue, QueueFull
+from derivatives import FORMATS, DerivativeCache
+from storage import ContentStore
+from tta import MAX_VIEWS, augment_views
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, SlowRequestProfiler, begin_stages, end_stages, stage
 
 app = Flask(__name__)
-CORS(app)
+# Sayfalama imleci yanıt başlığında döner; tarayıcıdan okunabilmesi için açılır
+CORS(app, expose_headers=['X-Next-Cursor'])
 
-# Veritabanı ayarları
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hospital.db'
+# Veritabanı ayarları (DATABASE_URL ile ör. postgresql://... kullanılabilir)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///hospital.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', '1') != '0'
+# SQLite bağlantı ayarları (eşzamanlı yazmalarda "database is locked" hatasını önler)
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    pool_size=app.config['DB_POOL_SIZE'],
+    max_overflow=app.config['DB_MAX_OVERFLOW'],
+    pool_recycle=app.config['DB_POOL_RECYCLE'],
+    pre_ping=app.config['DB_POOL_PRE_PING']
+)
+register_sqlite_pragmas(
+    app.config['SQLITE_JOURNAL_MODE'],
+    app.config['SQLITE_SYNCHRONOUS'],
+    app.config['SQLITE_BUSY_TIMEOUT_MS']
+)
 db = SQLAlchemy(app)
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Yüklemeler diske bu boyutta parçalar halinde yazılır (istek başına bellek kullanımı sınırlı kalır)
+app.config['UPLOAD_CHUNK_SIZE'] = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+# Yüklenen MR görüntüleri içerik özetine göre saklanır; aynı tarama tek dosya olarak tutulur
+app.config['MRIMAGE_STORE_DIR'] = os.environ.get('MRIMAGE_STORE_DIR') or os.path.join(UPLOAD_FOLDER, 'objects')
+content_store = ContentStore(app.config['MRIMAGE_STORE_DIR'], app.config['UPLOAD_CHUNK_SIZE'])
+
+# MR görüntüsü küçük resim/önizleme kopyaları ve tarayıcı önbellek süresi (saniye)
+app.config['MRIMAGE_DERIVATIVE_DIR'] = os.environ.get('MRIMAGE_DERIVATIVE_DIR') or os.path.join(os.path.dirname(__file__), 'derivative_cache')
+app.config['MRIMAGE_DERIVATIVE_QUALITY'] = int(os.environ.get('MRIMAGE_DERIVATIVE_QUALITY', 80))
+app.config['MRIMAGE_CACHE_MAX_AGE'] = int(os.environ.get('MRIMAGE_CACHE_MAX_AGE', 86400))
+derivative_cache = DerivativeCache(app.config['MRIMAGE_DERIVATIVE_DIR'], app.config['MRIMAGE_DERIVATIVE_QUALITY'])
+
+# Tahmin batch ayarları (eşzamanlı /predict istekleri tek ileri geçişte toplanır)
+app.config['BATCH_MAX_SIZE'] = int(os.environ.get('BATCH_MAX_SIZE', 16))
+app.config['BATCH_MAX_WAIT_MS'] = float(os.environ.get('BATCH_MAX_WAIT_MS', 10))
+
+# Tahmin önbelleği ayarları (aynı görüntü tekrar yüklendiğinde model yeniden çalışmaz)
+app.config['PREDICTION_CACHE_SIZE'] = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+app.config['PREDICTION_CACHE_TTL'] = float(os.environ.get('PREDICTION_CACHE_TTL', 86400))
+app.config['PREDICTION_CACHE_DIR'] = os.environ.get('PREDICTION_CACHE_DIR') or None
+
+# Model arka planda yüklenir; MODEL_AUTOLOAD=0 ise yükleme elle başlatılır
+app.config['MODEL_AUTOLOAD'] = os.environ.get('MODEL_AUTOLOAD', '1') != '0'
+app.config['MODEL_WARMUP'] = os.environ.get('MODEL_WARMUP', '1') != '0'
+# Model çalışma ortamı: keras, savedmodel, tflite veya auto (dosya uzantısından seçilir)
+app.config['MODEL_RUNTIME'] = os.environ.get('MODEL_RUNTIME', 'auto')
+# Keras modelleri sabit imzalı tf.function ile çalıştırılır (MODEL_COMPILE=0 ise model.predict);
+# MODEL_JIT_COMPILE=1 ise XLA ile derlenir (batch boyutu kovaları ısınmada bir kez derlenir)
+app.config['MODEL_COMPILE'] = os.environ.get('MODEL_COMPILE', '1') != '0'
+app.config['MODEL_JIT_COMPILE'] = os.environ.get('MODEL_JIT_COMPILE', '0') != '0'
+# MODEL_RUNTIME=stub: gerçek model yerine sahte model (yük testleri, benchmarks/loadtest.py)
+app.config['STUB_MODEL_LATENCY_MS'] = float(os.environ.get('STUB_MODEL_LATENCY_MS', 0))
+app.config['STUB_MODEL_ROW_LATENCY_MS'] = float(os.environ.get('STUB_MODEL_ROW_LATENCY_MS', 0))
+# Model topluluğu: virgülle ayrılmış yollar veya glob deseni (ör. brain_tumor_model_fold*.keras)
+# Verilirse MODEL_PATH yerine üyelerin olasılık ortalaması kullanılır
+app.config['ENSEMBLE_MODELS'] = os.environ.get('ENSEMBLE_MODELS', '')
+app.config['ENSEMBLE_MERGE'] = os.environ.get('ENSEMBLE_MERGE', '1') != '0'
+# benchmarks/eval_ensemble.py çıktısı; verilirse /predict/ensemble yanıtına eklenir
+app.config['ENSEMBLE_REPORT'] = os.environ.get('ENSEMBLE_REPORT') or None
+# Model kayıt deposu (backend/model_registry.py); MODEL_VERSION verilirse veya depoda etkin sürüm
+# varsa MODEL_PATH yerine o sürüm yüklenir. Çalışırken sürüm POST /admin/model ile değiştirilir
+app.config['MODEL_REGISTRY_DIR'] = os.environ.get('MODEL_REGISTRY_DIR') or os.path.join(os.path.dirname(__file__), '..', 'model_registry')
+app.config['MODEL_VERSION'] = os.environ.get('MODEL_VERSION') or None
+# Yönetim endpoint'leri için belirteç; X-Admin-Token başlığıyla gönderilmelidir (verilmezse endpoint'ler kapalıdır)
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN') or None
+
+# serve.py işçi sayısı. İş kuyruğu, sunulan model ve metrikler işçiye özeldir; birden fazla
+# işçide asenkron tahmin ve POST /admin/model takası reddedilir (sürüm değiştirmek için
+# model_registry.py activate ve ardından ana işleme SIGHUP)
+app.config['SERVE_WORKERS'] = int(os.environ.get('SERVE_WORKERS', 1))
+
+# Asenkron tahmin işleri (POST /predict?async=1); kuyruk dolunca 429 döner
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('JOB_QUEUE_SIZE', 64))
+app.config['JOB_RESULT_TTL'] = float(os.environ.get('JOB_RESULT_TTL', 3600))
+app.config['JOB_RETRY_AFTER'] = int(os.environ.get('JOB_RETRY_AFTER', 5))
+
+# Yavaş istek profilleyicisi: 0'dan büyükse en yavaş N isteğin yığın örnekleri saklanır
+# (GET /metrics/profiles). Kapalıyken örnekleme thread'i çalışmaz
+app.config['PROFILE_SLOW_REQUESTS'] = int(os.environ.get('PROFILE_SLOW_REQUESTS', 0))
+app.config['PROFILE_INTERVAL_MS'] = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
 
 # Hasta tablosu
 class Patient(db.Model):
@@ -58,6 +154,14 @@ class MRImage(db.Model):
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=False)
     prediction = db.Column(db.String(100))
     uploaded_at = db.Column(db.DateTime)
+    # Dosya içeriğinin SHA-256 özeti (depo anahtarı ve tahmin önbelleği anahtarı)
+    content_hash = db.Column(db.String(64))
+    # Tahmini üreten model sürümü
+    model_version = db.Column(db.String(100))
+    __table_args__ = (
+        db.Index('ix_mr_image_patient_uploaded', 'patient_id', 'uploaded_at'),
+        db.Index('ix_mr_image_content_hash', 'content_hash'),
+    )
 
 # Randevu tablosu
 class Appointment(db.Model):
@@ -66,6 +170,12 @@ class Appointment(db.Model):
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False)
     date = db.Column(db.String(50))
     status = db.Column(db.String(50))
+    patient = db.relationship('Patient')
+    # Hasta/doktor listeleri ve doktorun hasta kümesi bu indekslerden okunur
+    __table_args__ = (
+        db.Index('ix_appointment_patient_doctor', 'patient_id', 'doctor_id'),
+        db.Index('ix_appointment_doctor_patient', 'doctor_id', 'patient_id'),
+    )
 
 # Bildirim tablosu
 class Notification(db.Model):
@@ -74,27 +184,167 @@ class Notification(db.Model):
     message = db.Column(db.String(300), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
-
-# Modeli yükle
-try:
-    MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'brain_tumor_model_fold10_20250601_065654.keras')
-    model = keras.models.load_model(MODEL_PATH)
-    print(f"Model başarıyla yüklendi: {MODEL_PATH}")
-except Exception as e:
-    print(f"Model yüklenirken hata oluştu: {e}")
-    model = None
+    __table_args__ = (
+        db.Index('ix_notification_patient_created', 'patient_id', 'created_at'),
+    )
 
 # Sınıf isimleri (modeldeki sıraya göre)
 CLASS_NAMES = ["glioma_tumor", "meningioma_tumor", "no_tumor", "pituitary_tumor"]
 
-# Görüntü ön işleme fonksiyonu (örnek, modeline göre düzenlenebilir)
-def preprocess_image(image_bytes):
-    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-    image = image.resize((224, 224))  # Modelin beklediği boyut
-    img_array = np.array(image)
-    img_array = np.expand_dims(img_array, axis=0)
-    img_array = preprocess_input(img_array)
-    return img_array
+# Modeli yükle (TensorFlow yalnızca yükleyici thread'inde içe aktarılır)
+MODEL_PATH = os.environ.get('MODEL_PATH') or os.path.join(os.path.dirname(__file__), '..', 'brain_tumor_model_fold10_20250601_065654.keras')
+
+ENSEMBLE_PATHS = resolve_model_paths(app.config['ENSEMBLE_MODELS'], os.path.join(os.path.dirname(__file__), '..'))
+
+# Model sürümü her tahminle birlikte kaydedilir: depodaki sürüm adı, topluluk için
+# 'ensemble-<kimlik>', aksi halde model dosyasının adı
+model_registry = ModelRegistry(app.config['MODEL_REGISTRY_DIR'])
+_DEFAULT_MODEL_PATH = MODEL_PATH
+_DEFAULT_MODEL_RUNTIME = app.config['MODEL_RUNTIME']
+
+def select_model(accept=None):
+    # Yüklenecek modeli belirler: topluluk, MODEL_VERSION veya depodaki etkin sürüm, yoksa MODEL_PATH.
+    # Sürüm uyumsuzsa veya accept(yol, çalışma ortamı) hata verirse önceki seçim değişmez
+    global MODEL_PATH, MODEL_VERSION, MODEL_IDENTITY
+    if ENSEMBLE_PATHS:
+        MODEL_IDENTITY = model_identity(ENSEMBLE_PATHS)
+        MODEL_VERSION = f'ensemble-{MODEL_IDENTITY}'
+        return
+    path, runtime = _DEFAULT_MODEL_PATH, _DEFAULT_MODEL_RUNTIME
+    version = app.config['MODEL_VERSION'] or model_registry.active_version()
+    if version:
+        metadata = model_registry.get(version)
+        check_compatible(metadata, CLASS_NAMES)
+        path, runtime = metadata['artifact_path'], metadata['runtime']
+    else:
+        version = os.path.basename(os.path.normpath(path))
+    if accept:
+        accept(path, runtime)
+    MODEL_PATH, MODEL_VERSION, MODEL_IDENTITY = path, version, model_identity(path)
+    app.config['MODEL_RUNTIME'] = runtime
+
+select_model()
+
+# Çalışma ortamına verilecek ek seçenekler (serve.py işçileri için ör. tflite num_threads ve
+# ana işlemde bir kez okunan model_content)
+model_runtime_options = {}
+
+def _load_model():
+    if ENSEMBLE_PATHS:
+        loaded = EnsembleRuntime(ENSEMBLE_PATHS, app.config['MODEL_RUNTIME'], app.config['ENSEMBLE_MERGE'],
+                                 app.config['MODEL_COMPILE'], app.config['MODEL_JIT_COMPILE']).load()
+        print(f"Model topluluğu yüklendi ({len(ENSEMBLE_PATHS)} model): {', '.join(ENSEMBLE_PATHS)}")
+        return loaded
+    if app.config['MODEL_RUNTIME'] == StubRuntime.name:
+        loaded = StubRuntime(MODEL_PATH, app.config['STUB_MODEL_LATENCY_MS'], app.config['STUB_MODEL_ROW_LATENCY_MS'])
+    else:
+        loaded = load_runtime(MODEL_PATH, app.config['MODEL_RUNTIME'], app.config['MODEL_COMPILE'],
+                              app.config['MODEL_JIT_COMPILE'], **model_runtime_options)
+    print(f"Model başarıyla yüklendi ({loaded.name}): {MODEL_PATH}")
+    return loaded
+
+def _warmup_model(loaded):
+    # XLA ile derlenen modelde sunucunun oluşturabileceği her batch kovası bir kez derlenir
+    limit = bucket_size(max(app.config['BATCH_MAX_SIZE'], MAX_VIEWS))
+    for size in getattr(loaded, 'buckets', (1,)):
+        if size <= limit:
+            loaded.predict(np.zeros((size, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+
+model_loader = ModelLoader(_load_model, _warmup_model if app.config['MODEL_WARMUP'] else None)
+if app.config['MODEL_AUTOLOAD']:
+    model_loader.start()
+
+# Prometheus metrikleri (GET /metrics)
+metrics_registry = MetricsRegistry()
+http_requests = metrics_registry.register(Counter(
+    'mri_http_requests_total', 'İstek sayısı', ['method', 'route', 'status']))
+http_errors = metrics_registry.register(Counter(
+    'mri_http_request_errors_total', 'Sunucu hatasıyla (5xx) biten istek sayısı', ['method', 'route']))
+http_duration = metrics_registry.register(Histogram(
+    'mri_http_request_duration_seconds', 'İstek süresi', ['method', 'route']))
+http_in_flight = metrics_registry.register(Gauge(
+    'mri_http_requests_in_flight', 'İşlenmekte olan istek sayısı'))
+# Aşamalar: parse, read, decode, model (kuyruk + çıkarım bekleme), inference, db_commit, store
+stage_duration = metrics_registry.register(Histogram(
+    'mri_stage_duration_seconds', 'İstek aşamalarının süresi', ['stage']))
+model_batch_size = metrics_registry.register(Histogram(
+    'mri_model_batch_size', 'Modele verilen batch boyutu', buckets=(1, 2, 4, 8, 16, 32, 64)))
+model_in_flight = metrics_registry.register(Gauge(
+    'mri_model_batches_in_flight', 'Modelde çalışmakta olan batch sayısı'))
+metrics_registry.register(Gauge(
+    'mri_model_queue_rows', 'Batch kuyruğunda bekleyen görüntü sayısı',
+    fn=lambda: served_model.batcher.stats()['queued_rows']))
+metrics_registry.register(Gauge(
+    'mri_model_ready', 'Model tahmin yapmaya hazır mı (1/0)', fn=lambda: int(model_ready())))
+metrics_registry.register(Gauge(
+    'mri_job_queue_depth', 'Asenkron iş kuyruğunda bekleyen iş sayısı',
+    fn=lambda: job_queue.stats()['queue_depth']))
+profiler = SlowRequestProfiler(app.config['PROFILE_SLOW_REQUESTS'], app.config['PROFILE_INTERVAL_MS']) \
+    if app.config['PROFILE_SLOW_REQUESTS'] > 0 else None
+
+def _run_model(batch):
+    return model_loader.model.predict(batch)
+
+def _make_batcher(predict_fn):
+    def timed_predict(batch):
+        model_batch_size.observe(len(batch))
+        model_in_flight.inc()
+        try:
+            with stage_duration.time('inference'):
+                return predict_fn(batch)
+        finally:
+            model_in_flight.dec()
+    return MicroBatcher(
+        timed_predict,
+        max_batch_size=app.config['BATCH_MAX_SIZE'],
+        max_wait_ms=app.config['BATCH_MAX_WAIT_MS']
+    )
+
+# Sunulan model: sürüm, önbellek kimliği, modele bağlı batch kuyruğu ve çalışma ortamı
+# (başlangıç modeli için None; model_loader.model kullanılır). Takas tek atamayla yapılır.
+ServedModel = namedtuple('ServedModel', ['version', 'identity', 'batcher', 'runtime'])
+served_model = ServedModel(MODEL_VERSION, MODEL_IDENTITY, _make_batcher(_run_model), None)
+
+# Önbellek anahtarı model kimliğini içerir; model değişince eski tahminler kullanılmaz
+prediction_cache = PredictionCache(
+    max_entries=app.config['PREDICTION_CACHE_SIZE'],
+    ttl_seconds=app.config['PREDICTION_CACHE_TTL'],
+    disk_dir=app.config['PREDICTION_CACHE_DIR'],
+    model_identity=MODEL_IDENTITY
+)
+
+def reselect_model(accept=None):
+    # Model yüklenmeden önce (serve.py ana işlemi, SIGHUP) sunulacak sürümü depodan yeniden seçer;
+    # sonra çatallanan işçiler depoda etkinleştirilen sürümü yükler
+    global served_model
+    select_model(accept)
+    served_model = served_model._replace(version=MODEL_VERSION, identity=MODEL_IDENTITY)
+    prediction_cache.set_model_identity(MODEL_IDENTITY)
+
+# Sürüm takası: yeni model arka planda yüklenip ısıtılır, ardından etkinleştirilir
+swap_loader = None
+_swap_lock = threading.Lock()
+
+def _activate_model(metadata, runtime):
+    global served_model
+    previous = served_model
+    identity = model_identity(metadata['artifact_path'])
+    served_model = ServedModel(metadata['version'], identity, _make_batcher(runtime.predict), runtime)
+    prediction_cache.set_model_identity(identity)
+    model_registry.set_active(metadata['version'])
+    # Eski kuyruktaki istekler eski modelle tamamlanır; ardından eski model bellekten bırakılır
+    previous.batcher.stop()
+    if previous.runtime is None:
+        model_loader.model = None
+    print(f"Model sürümü değiştirildi: {previous.version} -> {metadata['version']}")
+
+# Arka plan işleri tahminleri aynı batch kuyruğundan geçirir; işçi sayısı sınırlı olduğu için
+# etkileşimli /predict istekleri batch'lerde her zaman yer bulur
+job_queue = JobQueue(
+    workers=app.config['JOB_WORKERS'],
+    max_queue=app.config['JOB_QUEUE_SIZE'],
+    result_ttl=app.config['JOB_RESULT_TTL']
+)
 
 # Veritabanı tabloları sadece bir kez oluşturulsun diye bir bayrak
 _db_initialized = False
@@ -131,61 +381,347 @@ def seed_data():
         db.session.add_all([a1, a2])
         db.session.commit()
 
+def init_db():
+    global _db_initialized
+    db.create_all()
+    apply_migrations(db)
+    seed_data()
+    _db_initialized = True
+
 @app.before_request
 def initialize_db_once():
-    global _db_initialized
     if not _db_initialized:
-        db.create_all()
-        seed_data()
-        _db_initialized = True
+        init_db()
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    http_in_flight.inc()
+    begin_stages()
+    if profiler is not None:
+        profiler.begin()
+
+@app.after_request
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+# İstek süresi ve sayaçlar hata durumunda da (teardown) yazılır
+@app.teardown_request
+def finish_request_metrics(exc):
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    http_in_flight.dec()
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = g.pop('response_status', 500)
+    http_requests.inc(request.method, route, str(status))
+    if status >= 500:
+        http_errors.inc(request.method, route)
+    http_duration.observe(duration, request.method, route)
+    stages = end_stages()
+    if profiler is not None:
+        profiler.end({
+            'method': request.method,
+            'route': route,
+            'status': status,
+            'duration_seconds': duration,
+            'stages': stages,
+            'time': datetime.now().isoformat(),
+        })
+
+@app.errorhandler(PaginationError)
+def pagination_error(e):
+    return jsonify({'error': str(e)}), 400
+
+class ImageDecodeError(ValueError):
+    pass
+
+def model_ready():
+    # Takasla etkinleştirilen model başlangıç yüklemesinden bağımsızdır (ilk yükleme başarısız
+    # olsa da POST /admin/model ile yüklenen sürüm tahmin yapabilir)
+    return served_model.runtime is not None or model_loader.ready
+
+def multi_worker_unsupported(message):
+    # İşçiye özel durum tutan özellik birden fazla işçide reddedilir, tek işçide None döner
+    if app.config['SERVE_WORKERS'] > 1:
+        return jsonify({'error': message, 'workers': app.config['SERVE_WORKERS']}), 409
+    return None
+
+def model_unavailable():
+    # Model tahmin yapamıyorsa döndürülecek hata yanıtı, yapabiliyorsa None
+    if model_ready():
+        return None
+    if model_loader.failed:
+        return jsonify({'error': 'Model yüklenemedi!'}), 500
+    return jsonify({'error': 'Model henüz yükleniyor, lütfen daha sonra tekrar deneyin.', 'model': model_loader.status()}), 503
+
+def _predict_rows(rows):
+    # Takas sırasında durdurulan eski kuyruğa düşen istek yeni modelle tekrarlanır
+    while True:
+        served = served_model
+        try:
+            with stage(stage_duration, 'model'):
+                return served, served.batcher.predict(rows)
+        except BatcherStopped:
+            continue
+
+def predict_probabilities(source, digest=None, tta=1):
+    # Aynı görüntü daha önce tahmin edildiyse sonuç önbellekten döner
+    # source: görüntü baytları veya diske yazılmış dosyanın yolu (yol için digest verilmeli)
+    # tta: 1'den büyükse görüntünün artırılmış görünümleri tek batch'te tahmin edilip ortalanır
+    # Dönüş: (olasılıklar, tahmini üreten model sürümü)
+    if digest is None:
+        digest = content_hash(source)
+    key = digest if tta == 1 else f'{digest}-tta{tta}'
+    served = served_model
+    prediction = prediction_cache.get(key, served.identity)
+    if prediction is None:
+        try:
+            with stage(stage_duration, 'decode'):
+                img = preprocess_image(source)
+        except Exception as e:
+            raise ImageDecodeError(f'Yüklenen dosya bir resim olarak açılamadı: {str(e)}')
+        served, outputs = _predict_rows(img if tta == 1 else augment_views(img, tta))
+        prediction = outputs.mean(axis=0)
+        prediction_cache.put(key, prediction, served.identity)
+    return prediction, served.version
+
+def parse_tta(value):
+    # ?tta=K parametresi; verilmezse tek görünüm
+    if value in (None, ''):
+        return 1
+    try:
+        views = int(value)
+    except ValueError:
+        views = 0
+    if not 1 <= views <= MAX_VIEWS:
+        raise ValueError(f'tta 1 ile {MAX_VIEWS} arasında bir tam sayı olmalı!')
+    return views
+
+def format_prediction(prediction, model_version=None):
+    result = []
+    for idx, prob in enumerate(prediction):
+        result.append({
+            "class": CLASS_NAMES[idx],
+            "probability": f"{prob * 100:.2f}%"
+        })
+    return {
+        "prediction": result,
+        "predicted_class": CLASS_NAMES[np.argmax(prediction)],
+        "model_version": model_version
+    }
+
+def release_mrimage_file(content_hash, file_path):
+    """Dosyayı kullanan başka MR kaydı kalmadıysa siler (commit'ten sonra çağrılır)."""
+    try:
+        if content_hash:
+            # Kontrol ve silme depo kilidi altında yapılır; aynı içeriği yükleyen eşzamanlı bir
+            # istek kaydını commit edene kadar dosya silinmez
+            content_store.release(file_path, lambda: MRImage.query.filter_by(content_hash=content_hash).first() is not None)
+        # Depodan önceki yüklemeler: yalnızca yükleme klasöründeki dosyalar silinir, Dataset'e dokunulmaz
+        elif file_path and os.path.commonpath([os.path.abspath(UPLOAD_FOLDER), os.path.abspath(file_path)]) == os.path.abspath(UPLOAD_FOLDER):
+            if not MRImage.query.filter_by(file_path=file_path).first() and os.path.exists(file_path):
+                os.remove(file_path)
+    except Exception as e:
+        print(f"Dosya silinemedi ({file_path}): {e}")  # Dosya silinemese de devam et
+
+def record_prediction(predicted_class, patient_id=None, mr_image_id=None, model_version=None):
+    # Hasta id parametresi varsa bildirim oluştur
+    if patient_id:
+        notif = Notification(
+            patient_id=patient_id,
+            message=f"Yapay zeka tahmini sonucu: {predicted_class}",
+            is_read=False
+        )
+        db.session.add(notif)
+    # MR kaydına prediction yaz
+    if mr_image_id:
+        mr = MRImage.query.get(mr_image_id)
+        if mr:
+            mr.prediction = predicted_class
+            mr.model_version = model_version
+    with stage(stage_duration, 'db_commit'):
+        db.session.commit()
+
+def _prediction_job(img_bytes, patient_id, mr_image_id, tta=1):
+    # İşçi thread'inde çalışır; veritabanı yazımı tahmin tamamlandığında yapılır
+    response = format_prediction(*predict_probabilities(img_bytes, tta=tta))
+    with app.app_context():
+        record_prediction(response['predicted_class'], patient_id, mr_image_id, response['model_version'])
+    return response
 
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        if model is None:
-            return jsonify({'error': 'Model yüklenemedi!'}), 500
-        if 'file' not in request.files:
+        unavailable = model_unavailable()
+        if unavailable:
+            return unavailable
+        # Multipart gövde ilk erişimde ayrıştırılır
+        with stage(stage_duration, 'parse'):
+            files = request.files
+        if 'file' not in files:
             return jsonify({'error': 'No file uploaded'}), 400
-        file = request.files['file']
+        file = files['file']
         if not file.mimetype.startswith('image/'):
             return jsonify({'error': 'Lütfen bir resim dosyası yükleyin!'}), 400
-        img_bytes = file.read()
         try:
-            img = preprocess_image(img_bytes)
-        except Exception as e:
-            return jsonify({'error': f'Yüklenen dosya bir resim olarak açılamadı: {str(e)}'}), 400
-        prediction = model.predict(img)[0]
-        result = []
-        for idx, prob in enumerate(prediction):
-            result.append({
-                "class": CLASS_NAMES[idx],
-                "probability": f"{prob * 100:.2f}%"
-            })
-        predicted_class = CLASS_NAMES[np.argmax(prediction)]
-        # Hasta id parametresi varsa bildirim oluştur
+            tta = parse_tta(request.args.get('tta'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        with stage(stage_duration, 'read'):
+            img_bytes = file.read()
         patient_id = request.form.get('patient_id') or (request.json.get('patient_id') if request.is_json else None)
         mr_image_id = request.form.get('mr_image_id') or (request.json.get('mr_image_id') if request.is_json else None)
-        if patient_id:
-            notif = Notification(
-                patient_id=patient_id,
-                message=f"Yapay zeka tahmini sonucu: {predicted_class}",
-                is_read=False
-            )
-            db.session.add(notif)
-        # MR kaydına prediction yaz
-        if mr_image_id:
-            mr = MRImage.query.get(mr_image_id)
-            if mr:
-                mr.prediction = predicted_class
-        db.session.commit()
-        return jsonify({
-            "prediction": result,
-            "predicted_class": predicted_class
-        })
+        # Asenkron mod: iş kimliği hemen döner, sonuç GET /jobs/<id> ile alınır
+        if request.args.get('async') in ('1', 'true'):
+            unsupported = multi_worker_unsupported('Asenkron tahmin çok işçili sunucuda desteklenmez '
+                                                   '(iş durumu işçiye özeldir); async olmadan gönderin.')
+            if unsupported:
+                return unsupported
+            try:
+                job_id = job_queue.submit(_prediction_job, img_bytes, patient_id, mr_image_id, tta)
+            except QueueFull:
+                response = jsonify({'error': 'Sunucu yoğun, lütfen daha sonra tekrar deneyin.', 'jobs': job_queue.stats()})
+                response.headers['Retry-After'] = str(app.config['JOB_RETRY_AFTER'])
+                return response, 429
+            return jsonify({'job_id': job_id, 'status': JobQueue.QUEUED, 'status_url': f'/jobs/{job_id}'}), 202
+        try:
+            response = format_prediction(*predict_probabilities(img_bytes, tta=tta))
+        except ImageDecodeError as e:
+            return jsonify({'error': str(e)}), 400
+        record_prediction(response['predicted_class'], patient_id, mr_image_id, response['model_version'])
+        return jsonify(response)
     except Exception as e:
         print(f"Tahmin sırasında hata oluştu: {e}")
         return jsonify({'error': f'Tahmin sırasında hata oluştu: {str(e)}'}), 500
 
+# Asenkron tahmin işinin durumu ve sonucu
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı!'}), 404
+    return jsonify(job)
+
+# Küçük resim/önizleme önbelleği metrikleri
+@app.route('/mrimages/derivatives/stats', methods=['GET'])
+def derivative_stats():
+    return jsonify(derivative_cache.stats())
+
+# İş kuyruğu metrikleri
+@app.route('/jobs/stats', methods=['GET'])
+def job_stats():
+    return jsonify(job_queue.stats())
+
+# Sunucu ayakta mı (model durumundan bağımsız)
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({'status': 'ok', 'model': model_loader.status()})
+
+# Sunucu tahmin yapmaya hazır mı
+@app.route('/ready', methods=['GET'])
+def ready():
+    status = model_loader.status()
+    if not model_ready():
+        return jsonify({'status': 'not_ready', 'model': status}), 503
+    return jsonify({'status': 'ready', 'model': status})
+
+# Batch kuyruğu metrikleri
+@app.route('/predict/stats', methods=['GET'])
+def predict_stats():
+    return jsonify({**served_model.batcher.stats(), 'model_version': served_model.version})
+
+# Model topluluğu durumu, üye/topluluk gecikmeleri ve (varsa) Dataset/Test değerlendirmesi
+@app.route('/predict/ensemble', methods=['GET'])
+def ensemble_stats():
+    response = {'enabled': bool(ENSEMBLE_PATHS), 'models': ENSEMBLE_PATHS or [MODEL_PATH]}
+    runtime = served_model.runtime or model_loader.model
+    if isinstance(runtime, EnsembleRuntime):
+        response['runtime'] = runtime.stats()
+    report = app.config['ENSEMBLE_REPORT']
+    if report and os.path.exists(report):
+        with open(report) as f:
+            response['evaluation'] = json.load(f)
+    return jsonify(response)
+
+def admin_forbidden():
+    # Yönetim isteği reddedilecekse döndürülecek hata yanıtı, izinliyse None
+    # Belirteç ayarlanmadıysa yönetim endpoint'leri kapalıdır
+    token = app.config['ADMIN_TOKEN']
+    if not token:
+        return jsonify({'error': 'Yönetim endpointleri kapalı (ADMIN_TOKEN ayarlanmamış)!'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'error': 'Yetkisiz istek!'}), 403
+    return None
+
+# Etkin model sürümü, takas durumu ve kayıtlı sürümler
+@app.route('/admin/model', methods=['GET'])
+def get_model_version():
+    forbidden = admin_forbidden()
+    if forbidden:
+        return forbidden
+    return jsonify({
+        'active_version': served_model.version,
+        'swap': swap_loader.status() if swap_loader else None,
+        'versions': model_registry.versions()
+    })
+
+# Kayıtlı bir model sürümünü arka planda yükleyip ısıtır ve kesintisiz olarak etkinleştirir
+@app.route('/admin/model', methods=['POST'])
+def swap_model_version():
+    global swap_loader
+    forbidden = admin_forbidden()
+    if forbidden:
+        return forbidden
+    unsupported = multi_worker_unsupported('Model takası çok işçili sunucuda desteklenmez (her işçi kendi modelini '
+                                           'sunar); model_registry.py activate <sürüm> ve ana işleme SIGHUP kullanın.')
+    if unsupported:
+        return unsupported
+    version = (request.get_json(silent=True) or {}).get('version')
+    if not version:
+        return jsonify({'error': 'Model sürümü gerekli!'}), 400
+    try:
+        metadata = model_registry.get(version)
+        check_compatible(metadata, CLASS_NAMES)
+    except KeyError:
+        return jsonify({'error': f'Model sürümü bulunamadı: {version}'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    with _swap_lock:
+        if swap_loader is not None and swap_loader.state in (ModelLoader.LOADING, ModelLoader.WARMING_UP):
+            return jsonify({'error': 'Başka bir model sürümü yükleniyor!', 'swap': swap_loader.status()}), 409
+        # Isınma her zaman yapılır; ilk istekler yeni modelde grafik oluşturma süresini beklemez
+        swap_loader = ModelLoader(
+            lambda: load_runtime(metadata['artifact_path'], metadata['runtime'], app.config['MODEL_COMPILE'],
+                                 app.config['MODEL_JIT_COMPILE']),
+            _warmup_model,
+            on_ready=lambda runtime: _activate_model(metadata, runtime)
+        )
+        swap_loader.start()
+    return jsonify({'message': 'Model sürümü yükleniyor.', 'version': version, 'status_url': '/admin/model'}), 202
+
+# Prometheus metrikleri
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return app.response_class(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+# En yavaş isteklerin aşama süreleri ve yığın örnekleri; ?format=folded ile flame graph girdisi
+@app.route('/metrics/profiles', methods=['GET'])
+def slow_request_profiles():
+    if profiler is None:
+        return jsonify({'error': 'Profilleyici kapalı (PROFILE_SLOW_REQUESTS ile açılır).'}), 404
+    if request.args.get('format') == 'folded':
+        index = request.args.get('index', type=int)
+        return app.response_class(profiler.folded(index), mimetype='text/plain')
+    return jsonify({**profiler.stats(), 'profiles': profiler.profiles()})
+
+# Tahmin önbelleği metrikleri
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(prediction_cache.stats())
+
 # Hasta kayıt
 @app.route('/register/patient', methods=['POST'])
 def register_patient():
@@ -265,27 +801,30 @@ def get_patient_profile(patient_id):
 # Hastanın randevularını getir
 @app.route('/appointments/patient/<int:patient_id>', methods=['GET'])
 def get_patient_appointments(patient_id):
-    appointments = Appointment.query.filter_by(patient_id=patient_id).all()
-    result = []
-    for a in appointments:
-        doctor = Doctor.query.get(a.doctor_id)
-        result.append({
-            'id': a.id,
-            'date': a.date,
-            'status': a.status,
-            'doctor': f"{doctor.first_name} {doctor.last_name}" if doctor else None
-        })
-    return jsonify(result)
+    # Doktor adı randevularla aynı sorguda join ile alınır (randevu başına ayrı sorgu yapılmaz)
+    query = Appointment.query.outerjoin(Doctor, Appointment.doctor_id == Doctor.id).filter(Appointment.patient_id == patient_id)
+    return paginated_json(query, {
+        'id': Appointment.id,
+        'date': Appointment.date,
+        'status': Appointment.status,
+        'doctor': Doctor.first_name + ' ' + Doctor.last_name
+    }, [(Appointment.id, False)])
 
 # Hastanın MR görüntülerini getir
 @app.route('/mrimages/patient/<int:patient_id>', methods=['GET'])
 def get_patient_mrimages(patient_id):
-    images = MRImage.query.filter_by(patient_id=patient_id).all()
-    def image_url(img):
-        return request.host_url.rstrip('/') + '/mrimages/file?path=' + img.file_path.replace('\\', '/').replace(' ', '%20')
-    return jsonify([
-        {'id': img.id, 'file_url': image_url(img), 'prediction': img.prediction, 'uploaded_at': img.uploaded_at} for img in images
-    ])
+    base_url = request.host_url.rstrip('/') + '/mrimages/file?path='
+    def image_url(file_path):
+        return base_url + file_path.replace('\\', '/').replace(' ', '%20')
+    def thumbnail_url(file_path):
+        return base_url + quote(file_path.replace('\\', '/'), safe='/:') + '&size=thumb'
+    return paginated_json(MRImage.query.filter_by(patient_id=patient_id), {
+        'id': MRImage.id,
+        'file_url': (MRImage.file_path, image_url),
+        'thumbnail_url': (MRImage.file_path, thumbnail_url),
+        'prediction': MRImage.prediction,
+        'uploaded_at': MRImage.uploaded_at
+    }, [(MRImage.id, False)])
 
 # Doktor profilini getir
 @app.route('/profile/doctor/<int:doctor_id>', methods=['GET'])
@@ -306,27 +845,27 @@ def get_doctor_profile(doctor_id):
 # Doktorun randevularını getir
 @app.route('/appointments/doctor/<int:doctor_id>', methods=['GET'])
 def get_doctor_appointments(doctor_id):
-    appointments = Appointment.query.filter_by(doctor_id=doctor_id).all()
-    result = []
-    for a in appointments:
-        patient = Patient.query.get(a.patient_id)
-        result.append({
-            'id': a.id,
-            'date': a.date,
-            'status': a.status,
-            'patient': f"{patient.first_name} {patient.last_name}" if patient else None
-        })
-    return jsonify(result)
+    query = Appointment.query.outerjoin(Patient, Appointment.patient_id == Patient.id).filter(Appointment.doctor_id == doctor_id)
+    return paginated_json(query, {
+        'id': Appointment.id,
+        'date': Appointment.date,
+        'status': Appointment.status,
+        'patient': Patient.first_name + ' ' + Patient.last_name
+    }, [(Appointment.id, False)])
 
 # Doktorun hastalarını getir
 @app.route('/patients/doctor/<int:doctor_id>', methods=['GET'])
 def get_doctor_patients(doctor_id):
-    appointments = Appointment.query.filter_by(doctor_id=doctor_id).all()
-    patient_ids = set(a.patient_id for a in appointments)
-    patients = Patient.query.filter(Patient.id.in_(patient_ids)).all()
-    return jsonify([
-        {'id': p.id, 'first_name': p.first_name, 'last_name': p.last_name, 'email': p.email, 'gender': p.gender, 'city': p.city} for p in patients
-    ])
+    # Randevular belleğe alınmadan, hasta kümesi alt sorguyla tek seferde bulunur
+    patient_ids = db.session.query(Appointment.patient_id).filter_by(doctor_id=doctor_id)
+    return paginated_json(Patient.query.filter(Patient.id.in_(patient_ids)), {
+        'id': Patient.id,
+        'first_name': Patient.first_name,
+        'last_name': Patient.last_name,
+        'email': Patient.email,
+        'gender': Patient.gender,
+        'city': Patient.city
+    }, [(Patient.id, False)])
 
 # Randevu ekle
 @app.route('/appointments', methods=['POST'])
@@ -347,22 +886,81 @@ def add_appointment():
 def upload_mrimage():
     patient_id = request.form.get('patient_id')
     prediction = request.form.get('prediction')
+    model_version = request.form.get('model_version') if prediction else None
     file = request.files.get('file')
     if not file or not patient_id:
         return jsonify({'error': 'Dosya ve hasta ID gerekli!'}), 400
-    filename = secure_filename(file.filename)
-    save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(save_path)
-    mr = MRImage(
-        file_path=save_path,
-        patient_id=patient_id,
-        prediction=prediction,
-        uploaded_at=datetime.now()
-    )
-    db.session.add(mr)
-    db.session.commit()
+    # Aynı içerik daha önce yüklendiyse yeni dosya oluşturulmaz; kayıt depo kilidi altında commit
+    # edilir (eşzamanlı bir silme, kayıt yazılmadan dosyayı kaldıramaz)
+    with stage(stage_duration, 'store'), content_store.put_stream(file.stream, file.filename) as (digest, save_path, _):
+        # Aynı görüntü daha önce tahmin edildiyse sonucu önbellekten veya önceki kayıttan al
+        if not prediction:
+            served = served_model
+            cached = prediction_cache.get(digest, served.identity)
+            if cached is not None:
+                prediction, model_version = CLASS_NAMES[int(np.argmax(cached))], served.version
+            else:
+                previous = MRImage.query.filter(MRImage.content_hash == digest, MRImage.prediction.isnot(None)).first()
+                if previous:
+                    prediction, model_version = previous.prediction, previous.model_version
+        mr = MRImage(
+            file_path=save_path,
+            patient_id=patient_id,
+            prediction=prediction,
+            uploaded_at=datetime.now(),
+            content_hash=digest,
+            model_version=model_version
+        )
+        db.session.add(mr)
+        db.session.commit()
     return jsonify({'message': 'MR görüntüsü yüklendi!', 'id': mr.id})
 
+# MR görüntüsünü tek istekte yükle, tahmin et ve kaydet
+# multipart/form-data (file, patient_id) veya ham görüntü gövdesi (?patient_id=..&filename=..) kabul edilir
+@app.route('/mrimages/ingest', methods=['POST'])
+def ingest_mrimage():
+    unavailable = model_unavailable()
+    if unavailable:
+        return unavailable
+    if request.mimetype.startswith('image/'):
+        # Ham gövde form ayrıştırıcısından geçmeden doğrudan diske akar
+        patient_id = request.args.get('patient_id')
+        filename = request.args.get('filename') or 'mr_image' + (mimetypes.guess_extension(request.mimetype) or '')
+        stream = request.stream
+    else:
+        patient_id = request.form.get('patient_id')
+        file = request.files.get('file')
+        if not file:
+            return jsonify({'error': 'Dosya ve hasta ID gerekli!'}), 400
+        if not file.mimetype.startswith('image/'):
+            return jsonify({'error': 'Lütfen bir resim dosyası yükleyin!'}), 400
+        filename = file.filename
+        stream = file.stream
+    if not patient_id:
+        return jsonify({'error': 'Dosya ve hasta ID gerekli!'}), 400
+    with stage(stage_duration, 'store'), content_store.stage(stream, filename) as staged:
+        # Görüntü bir kez, depo kilidi alınmadan geçici dosyadan çözülüp tahmin edilir
+        try:
+            response = format_prediction(*predict_probabilities(staged.tmp_path, staged.digest))
+        except ImageDecodeError:
+            return jsonify({'error': 'Yüklenen dosya bir resim olarak açılamadı!'}), 400
+        except Exception as e:
+            return jsonify({'error': f'Tahmin sırasında hata oluştu: {str(e)}'}), 500
+        # Dosya depo kilidi altında taşınır; MR kaydı, tahmin ve bildirim tek commit ile yazılır
+        # (commit hata verirse yeni dosya silinir, eşzamanlı bir silme dosyayı kaldıramaz)
+        with content_store.publish(staged):
+            mr = MRImage(
+                file_path=staged.path,
+                patient_id=patient_id,
+                prediction=response['predicted_class'],
+                uploaded_at=datetime.now(),
+                content_hash=staged.digest,
+                model_version=response['model_version']
+            )
+            db.session.add(mr)
+            record_prediction(response['predicted_class'], patient_id)
+    return jsonify({'message': 'MR görüntüsü yüklendi!', 'id': mr.id, **response})
+
 # Hasta profil güncelle
 @app.route('/profile/patient/<int:patient_id>', methods=['PUT'])
 @cross_origin()
@@ -401,8 +999,27 @@ def get_mrimage_file():
     path = unquote(path)
     if not os.path.exists(path):
         return jsonify({'error': 'Dosya bulunamadı!'}), 404
-    mime_type, _ = mimetypes.guess_type(path)
-    return send_file(path, mimetype=mime_type or 'application/octet-stream')
+    size = request.args.get('size', 'original')
+    if size == 'original':
+        mime_type, _ = mimetypes.guess_type(path)
+        response = send_file(path, mimetype=mime_type or 'application/octet-stream', conditional=True, etag=True)
+    else:
+        # Küçültülmüş kopya; biçim verilmezse tarayıcı destekliyorsa WebP seçilir
+        fmt = request.args.get('format') or ('webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg')
+        try:
+            derivative = derivative_cache.get(path, size, fmt)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except OSError:
+            return jsonify({'error': 'Görüntü işlenemedi!'}), 422
+        response = send_file(derivative, mimetype=FORMATS[fmt][1], conditional=True, etag=True)
+        if not request.args.get('format'):
+            response.vary.add('Accept')
+    # Hasta görüntüleri yalnızca tarayıcıda önbelleğe alınır (paylaşılan önbelleklerde değil)
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = app.config['MRIMAGE_CACHE_MAX_AGE']
+    return response
 
 # Randevu durumunu güncelle
 @app.route('/appointments/<int:appointment_id>/status', methods=['PUT'])
@@ -424,53 +1041,49 @@ def delete_patient(patient_id):
     patient = Patient.query.get(patient_id)
     if not patient:
         return jsonify({'error': 'Hasta bulunamadı!'}), 404
+    # Silinen kayıtların dosyaları, başka kayıt kullanmıyorsa commit'ten sonra silinir
+    files = MRImage.query.with_entities(MRImage.content_hash, MRImage.file_path).filter_by(patient_id=patient_id).all()
     # İlgili MRImage ve Appointment kayıtlarını da sil
     MRImage.query.filter_by(patient_id=patient_id).delete()
     Appointment.query.filter_by(patient_id=patient_id).delete()
     db.session.delete(patient)
     db.session.commit()
+    for content_hash, file_path in set(files):
+        release_mrimage_file(content_hash, file_path)
     return jsonify({'message': 'Hasta ve ilişkili veriler silindi.'})
 
 # Tüm doktorları döndüren endpoint
 @app.route('/doctors', methods=['GET'])
 def get_all_doctors():
-    doctors = Doctor.query.all()
-    return jsonify([
-        {
-            'id': d.id,
-            'first_name': d.first_name,
-            'last_name': d.last_name,
-            'title': d.title,
-            'specialty': d.specialty
-        } for d in doctors
-    ])
+    return paginated_json(Doctor.query, {
+        'id': Doctor.id,
+        'first_name': Doctor.first_name,
+        'last_name': Doctor.last_name,
+        'title': Doctor.title,
+        'specialty': Doctor.specialty
+    }, [(Doctor.id, False)])
 
 # Hastanın bildirimlerini dönen endpoint
 @app.route('/notifications/patient/<int:patient_id>', methods=['GET'])
 def get_patient_notifications(patient_id):
-    notifs = Notification.query.filter_by(patient_id=patient_id).order_by(Notification.created_at.desc()).all()
-    return jsonify([
-        {
-            'id': n.id,
-            'message': n.message,
-            'is_read': n.is_read,
-            'created_at': n.created_at
-        } for n in notifs
-    ])
+    # En yeni bildirim önce; aynı zamanlı kayıtlar id ile sıralanır
+    return paginated_json(Notification.query.filter_by(patient_id=patient_id), {
+        'id': Notification.id,
+        'message': Notification.message,
+        'is_read': Notification.is_read,
+        'created_at': Notification.created_at
+    }, [(Notification.created_at, True), (Notification.id, True)])
 
 @app.route('/mrimages/<int:mr_id>', methods=['DELETE'])
 def delete_mrimage(mr_id):
     mr = MRImage.query.get(mr_id)
     if not mr:
         return jsonify({'error': 'MR görüntüsü bulunamadı!'}), 404
-    # Dosyayı sil
-    try:
-        if os.path.exists(mr.file_path):
-            os.remove(mr.file_path)
-    except Exception as e:
-        pass  # Dosya silinemese de devam et
+    content_hash, file_path = mr.content_hash, mr.file_path
     db.session.delete(mr)
     db.session.commit()
+    # Aynı dosyayı kullanan başka kayıt yoksa dosyayı sil
+    release_mrimage_file(content_hash, file_path)
     return jsonify({'message': 'MR görüntüsü silindi.'})
 
 if __name__ == '__main__':
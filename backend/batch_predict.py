@@ -0,0 +1,295 @@
+"""
+Toplu (çevrimdışı) tahmin aracı.
+
+Bir klasör ağacındaki görüntüleri veya `prediction` alanı boş olan MRImage kayıtlarını akış
+halinde okur; görüntüleri paralel çözer, batch'ler halinde modele verir ve sonuçları toplu
+transaction'larla veritabanına ya da bir CSV/Parquet dosyasına yazar. Yarıda kalan bir çalışma
+tekrar başlatıldığında işlenmiş görüntüler atlanır.
+
+Kullanım:
+    python batch_predict.py --db
+    python batch_predict.py --dir /arsiv/mr --output sonuclar.csv
+"""
+import argparse
+import csv
+import glob
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Sunucu modeli arka planda yüklemesin; model bu araç tarafından yüklenir
+os.environ.setdefault('MODEL_AUTOLOAD', '0')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app import app, db, MRImage, CLASS_NAMES, MODEL_PATH, MODEL_VERSION  # noqa: E402
+from preprocessing import IMAGE_EXTENSIONS, BatchBuffer, decode_into  # noqa: E402
+from runtimes import load_runtime  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+
+RESULT_FIELDS = ['id', 'path', 'predicted_class'] + CLASS_NAMES + ['error']
+
+
+def iter_directory(root_dir, done=()):
+    """Klasör ağacındaki görüntü yollarını (alfabetik sırayla) akış halinde döndürür."""
+    for folder, dirs, files in os.walk(root_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(folder, name)
+                if path not in done:
+                    yield None, path
+
+
+def iter_pending_rows(chunk_size=1000, done=()):
+    """
+    Tahmini olmayan MRImage kayıtlarını id sırasıyla parça parça döndürür.
+
+    Kayıtlar sayfalanırken son id'den devam edilir (keyset); bu sayede yazılan tahminler
+    sonraki sayfaları kaydırmaz ve okunamayan görüntüler aynı çalışmada tekrar denenmez.
+    """
+    last_id = 0
+    while True:
+        rows = (db.session.query(MRImage.id, MRImage.file_path)
+                .filter(MRImage.prediction.is_(None), MRImage.id > last_id)
+                .order_by(MRImage.id)
+                .limit(chunk_size)
+                .all())
+        if not rows:
+            return
+        for row_id, path in rows:
+            if path not in done:
+                yield row_id, path
+        last_id = rows[-1][0]
+
+
+def batched(items, batch_size):
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _decode_batch(items, buffer, executor):
+    # Okunamayan görüntüler batch'i düşürmez; hata mesajıyla birlikte sonuca yazılır
+    n = len(items)
+    buffer.ensure(n)
+
+    def decode(i):
+        try:
+            decode_into(items[i][1], buffer.raw[i])
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+    errors = list(executor.map(decode, range(n)))
+    ok = [i for i, error in enumerate(errors) if error is None]
+    out = buffer.out[:len(ok)]
+    if len(ok) == n:
+        np.copyto(out, buffer.raw[:n], casting='unsafe')
+    elif ok:
+        np.copyto(out, buffer.raw[ok], casting='unsafe')
+    return items, ok, errors, out
+
+
+def _results(items, ok, errors, probs):
+    rows = []
+    for i, (row_id, path) in enumerate(items):
+        rows.append({'id': row_id, 'path': path, 'error': errors[i]})
+    for i, p in zip(ok, probs):
+        rows[i]['predicted_class'] = CLASS_NAMES[int(np.argmax(p))]
+        rows[i].update({name: float(value) for name, value in zip(CLASS_NAMES, p)})
+    return rows
+
+
+class DatabaseWriter:
+    """Tahminleri (ve model sürümünü) MRImage tablosuna `commit_every` satırlık toplu transaction'larla yazar."""
+
+    def __init__(self, commit_every=1000, model_version=None):
+        self.commit_every = commit_every
+        self.model_version = model_version
+        self.pending = []
+
+    def done(self):
+        return set()
+
+    def write(self, rows):
+        self.pending.extend({'id': r['id'], 'prediction': r['predicted_class'], 'model_version': self.model_version}
+                            for r in rows if not r['error'])
+        if len(self.pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            db.session.bulk_update_mappings(MRImage, self.pending)
+            db.session.commit()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+
+
+class CSVWriter:
+    """Sonuçları CSV dosyasına ekler; dosyada zaten bulunan yollar tekrar işlenmez."""
+
+    def __init__(self, path):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+        if not exists:
+            self.writer.writeheader()
+
+    def done(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return {row['path'] for row in csv.DictReader(f)}
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Sonuçları bir klasördeki Parquet parçalarına (part-00000.parquet, ...) yazar. Her parça
+    kapandığında kalıcıdır; yarıda kalan çalışma mevcut parçalardaki yolları atlar.
+    """
+
+    def __init__(self, path, rows_per_part=50000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Parquet çıktısı için pyarrow kurulmalı (pip install pyarrow)')
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self.pending = []
+        os.makedirs(path, exist_ok=True)
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+
+    def done(self):
+        done = set()
+        for part in self._parts():
+            done.update(self.pq.read_table(part, columns=['path']).column('path').to_pylist())
+        return done
+
+    def write(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.rows_per_part:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        columns = {field: [r.get(field) for r in self.pending] for field in RESULT_FIELDS}
+        part = os.path.join(self.path, f'part-{len(self._parts()):05d}.parquet')
+        self.pq.write_table(self.pa.table(columns), part + '.tmp')
+        os.replace(part + '.tmp', part)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+
+def make_writer(output, commit_every, model_version=None):
+    if not output:
+        return DatabaseWriter(commit_every, model_version)
+    if output.endswith('.csv'):
+        return CSVWriter(output)
+    if output.endswith('.parquet'):
+        return ParquetWriter(output, commit_every)
+    raise ValueError(f"Desteklenmeyen çıktı biçimi: {output} (.csv veya .parquet olmalı)")
+
+
+def run(items, predict_fn, writer, batch_size=64, workers=None, log_every=10.0):
+    """
+    Görüntüleri batch'ler halinde tahmin eder. Bir batch model üzerindeyken sonraki batch
+    arka planda çözülür; iki tampon dönüşümlü kullanılır.
+
+    Returns:
+        dict: İşlenen görüntü sayısı, hata sayısı, süre ve görüntü/sn
+    """
+    buffers = [BatchBuffer(batch_size), BatchBuffer(batch_size)]
+    started = last_log = time.perf_counter()
+    processed = failed = 0
+
+    def handle(decoded):
+        nonlocal processed, failed, last_log
+        batch_items, ok, errors, batch = decoded
+        probs = np.asarray(predict_fn(batch)) if ok else []
+        writer.write(_results(batch_items, ok, errors, probs))
+        processed += len(batch_items)
+        failed += len(batch_items) - len(ok)
+        now = time.perf_counter()
+        if now - last_log >= log_every:
+            last_log = now
+            print(f"{processed} görüntü işlendi ({processed / (now - started):.1f} görüntü/sn, {failed} hata)", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as decoder, \
+            ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = None
+        for k, batch_items in enumerate(batched(items, batch_size)):
+            future = prefetcher.submit(_decode_batch, batch_items, buffers[k % 2], decoder)
+            if pending is not None:
+                handle(pending.result())
+            pending = future
+        if pending is not None:
+            handle(pending.result())
+    writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'processed': processed,
+        'failed': failed,
+        'seconds': elapsed,
+        'images_per_second': processed / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Görüntüleri toplu olarak tahmin eder')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--dir', help='Taranacak klasör ağacı')
+    source.add_argument('--db', action='store_true', help='Tahmini olmayan MRImage kayıtları')
+    parser.add_argument('--output', default=None,
+                        help='.csv dosyası veya .parquet klasörü (--db ile verilmezse sonuçlar veritabanına yazılır)')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--runtime', default=app.config['MODEL_RUNTIME'])
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=None, help='Paralel çözme thread sayısı')
+    parser.add_argument('--commit-every', type=int, default=1000, help='Toplu yazma başına satır sayısı')
+    parser.add_argument('--limit', type=int, default=None, help='En fazla bu kadar görüntü işle')
+    args = parser.parse_args()
+    if args.dir and not args.output:
+        parser.error('--dir ile --output verilmelidir')
+
+    runtime = load_runtime(args.model, args.runtime)
+    print(f"Model yüklendi ({runtime.name}): {args.model}")
+    with app.app_context():
+        db.create_all()
+        apply_migrations(db)
+        # Sunucunun modeliyle çalışılıyorsa sunucudaki sürüm adı, aksi halde model dosyasının adı yazılır
+        model_version = MODEL_VERSION if args.model == MODEL_PATH else os.path.basename(os.path.normpath(args.model))
+        writer = make_writer(args.output, args.commit_every, model_version)
+        done = writer.done()
+        if done:
+            print(f"{len(done)} görüntü daha önce işlenmiş, atlanıyor")
+        items = iter_directory(args.dir, done) if args.dir else iter_pending_rows(args.commit_every, done)
+        if args.limit:
+            items = itertools.islice(items, args.limit)
+        summary = run(items, runtime.predict, writer, args.batch_size, args.workers)
+    print(f"Tamamlandı: {summary['processed']} görüntü, {summary['failed']} hata, "
+          f"{summary['seconds']:.1f} sn ({summary['images_per_second']:.1f} görüntü/sn)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatcherStopped(RuntimeError):
+    """Durdurulmuş kuyruğa istek gönderildi (ör. model takasından sonra eski kuyruk)."""
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı tahmin isteklerini toplayıp tek bir ileri geçişte (forward pass) çalıştırır.
+
+    Her istek bir veya daha fazla satırlık bir dizi gönderir. Arka plandaki işçi thread,
+    toplam satır sayısı `max_batch_size` değerine ulaşana ya da ilk istekten bu yana
+    `max_wait_ms` geçene kadar bekler, ardından `predict_fn` fonksiyonunu bir kez çağırır
+    ve sonuç satırlarını ilgili isteklere geri dağıtır.
+
+    Args:
+        predict_fn (callable): (N, ...) boyutlu diziyi alıp (N, ...) boyutlu sonuç döndüren fonksiyon
+        max_batch_size (int): Bir ileri geçişteki en fazla satır sayısı
+        max_wait_ms (float): İlk istekten sonra batch'in dolması için beklenecek en uzun süre
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        # Metrikler
+        self._requests_total = 0
+        self._batches_total = 0
+        self._rows_total = 0
+        self._errors_total = 0
+        self._batch_size_counts = {}
+        self._inference_seconds_total = 0.0
+        self._last_batch_size = 0
+
+    def _start_locked(self):
+        # Durdurulan kuyruk bir daha başlatılmaz (takastan sonra eski modele istek gitmemeli)
+        if self._stopped:
+            raise BatcherStopped('MicroBatcher durduruldu')
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+
+    def start(self):
+        with self._cond:
+            self._start_locked()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, batch):
+        """Satırları kuyruğa ekler ve sonuçları taşıyacak bir Future döndürür."""
+        batch = np.asarray(batch)
+        if batch.ndim == 0 or batch.shape[0] == 0:
+            raise ValueError('Boş batch gönderilemez')
+        future = Future()
+        with self._cond:
+            self._start_locked()
+            self._queue.append((batch, future, time.perf_counter()))
+            self._requests_total += 1
+            self._cond.notify()
+        return future
+
+    def predict(self, batch, timeout=None):
+        return self.submit(batch).result(timeout=timeout)
+
+    def _collect(self):
+        """Bir sonraki batch için kuyruktan istekleri alır (kilit tutulurken çağrılır)."""
+        while not self._queue and not self._stopped:
+            self._cond.wait()
+        if self._stopped and not self._queue:
+            return []
+        deadline = self._queue[0][2] + self.max_wait
+        while True:
+            rows = sum(item[0].shape[0] for item in self._queue)
+            remaining = deadline - time.perf_counter()
+            if rows >= self.max_batch_size or remaining <= 0 or self._stopped:
+                break
+            self._cond.wait(remaining)
+        items = [self._queue.popleft()]
+        rows = items[0][0].shape[0]
+        # Sığmayan istek bir sonraki batch'e kalır (tek başına büyük istekler yine de tek seferde işlenir)
+        while self._queue and rows + self._queue[0][0].shape[0] <= self.max_batch_size:
+            item = self._queue.popleft()
+            rows += item[0].shape[0]
+            items.append(item)
+        return items
+
+    def _run(self):
+        while True:
+            with self._cond:
+                items = self._collect()
+            if not items:
+                return
+            futures = [item[1] for item in items]
+            try:
+                if len(items) == 1:
+                    inputs = items[0][0]
+                else:
+                    inputs = np.concatenate([item[0] for item in items], axis=0)
+                started = time.perf_counter()
+                outputs = np.asarray(self.predict_fn(inputs))
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                with self._cond:
+                    self._errors_total += 1
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            size = inputs.shape[0]
+            with self._cond:
+                self._batches_total += 1
+                self._rows_total += size
+                self._last_batch_size = size
+                self._batch_size_counts[size] = self._batch_size_counts.get(size, 0) + 1
+                self._inference_seconds_total += elapsed
+            offset = 0
+            for batch, future, _ in items:
+                n = batch.shape[0]
+                future.set_result(outputs[offset:offset + n])
+                offset += n
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': len(self._queue),
+                'queued_rows': sum(item[0].shape[0] for item in self._queue),
+                'requests_total': self._requests_total,
+                'batches_total': self._batches_total,
+                'rows_total': self._rows_total,
+                'errors_total': self._errors_total,
+                'last_batch_size': self._last_batch_size,
+                'avg_batch_size': (self._rows_total / self._batches_total) if self._batches_total else 0.0,
+                'batch_size_counts': dict(sorted(self._batch_size_counts.items())),
+                'inference_seconds_total': self._inference_seconds_total,
+            }
@@ -0,0 +1,59 @@
+"""
+Veritabanı bağlantı ayarları.
+
+`DATABASE_URL` ile SQLite dışında bir veritabanı (ör. PostgreSQL) kullanılabilir. SQLite
+bağlantılarında WAL günlük modu, `synchronous` ve `busy_timeout` ayarları her yeni bağlantıda
+uygulanır; böylece eşzamanlı yazmalar "database is locked" hatası vermek yerine sırasını bekler
+ve okumalar yazmaları engellemez.
+"""
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def is_sqlite_memory(url):
+    return url.startswith('sqlite') and (url.rstrip('/') in ('sqlite:', 'sqlite:/') or ':memory:' in url)
+
+
+def engine_options(url, pool_size=5, max_overflow=10, pool_recycle=1800, pre_ping=True):
+    """SQLALCHEMY_ENGINE_OPTIONS için havuz ayarlarını döndürür."""
+    options = {'pool_pre_ping': pre_ping}
+    # Bellek içi SQLite tek bağlantılı havuz kullanır; boyut ayarları ona uygulanmaz
+    if not is_sqlite_memory(url):
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_recycle=pool_recycle)
+    return options
+
+
+def register_sqlite_pragmas(journal_mode='WAL', synchronous='NORMAL', busy_timeout_ms=5000):
+    """
+    Yeni açılan her SQLite bağlantısına PRAGMA ayarlarını uygular (diğer veritabanları etkilenmez).
+
+    Args:
+        journal_mode (str): 'WAL' önerilir; boş bırakılırsa dokunulmaz
+        synchronous (str): WAL ile 'NORMAL' güvenlidir ve her commit'te fsync yapılmaz
+        busy_timeout_ms (int): Kilitli veritabanında hata vermeden önce beklenecek süre
+    """
+    journal_mode = (journal_mode or '').upper()
+    synchronous = (synchronous or '').upper()
+    if journal_mode and journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Geçersiz SQLITE_JOURNAL_MODE: {journal_mode}")
+    if synchronous and synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Geçersiz SQLITE_SYNCHRONOUS: {synchronous}")
+
+    @event.listens_for(Engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+        if journal_mode:
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+        if synchronous:
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+        cursor.close()
+
+    return set_sqlite_pragmas
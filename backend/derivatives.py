@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+
+from PIL import Image
+
+# Boyut adı -> en uzun kenar (piksel)
+SIZES = {
+    'thumb': 160,
+    'preview': 1024,
+}
+
+# Biçim adı -> (PIL biçimi, MIME türü, dosya uzantısı)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', '.webp'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+}
+
+
+class DerivativeCache:
+    """
+    MR görüntülerinin küçültülmüş kopyalarını (küçük resim, önizleme) ilk istendiğinde üretip
+    diskte saklar.
+
+    Anahtar kaynak dosyanın yolu, boyutu ve değiştirilme zamanından üretilir; kaynak dosya
+    değişirse yeni kopya üretilir. Dosyalar geçici adla yazılıp yeniden adlandırıldığı için
+    yarım kalmış bir kopya asla sunulmaz.
+
+    Args:
+        cache_dir (str): Kopyaların saklanacağı klasör
+        quality (int): WebP/JPEG kalite değeri
+    """
+
+    def __init__(self, cache_dir, quality=80):
+        self.cache_dir = cache_dir
+        self.quality = int(quality)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    def path_for(self, source_path, size, fmt):
+        stat = os.stat(source_path)
+        key = hashlib.sha256(f'{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f'{key}_{size}{FORMATS[fmt][2]}')
+
+    def get(self, source_path, size, fmt):
+        """
+        İstenen kopyanın yolunu döndürür, yoksa üretir.
+
+        Args:
+            size (str): SIZES içindeki boyut adı
+            fmt (str): FORMATS içindeki biçim adı
+
+        Returns:
+            str: Kopyanın dosya yolu
+        """
+        if size not in SIZES:
+            raise ValueError(f"Geçersiz boyut: {size} ({', '.join(SIZES)})")
+        if fmt not in FORMATS:
+            raise ValueError(f"Geçersiz biçim: {fmt} ({', '.join(FORMATS)})")
+        path = self.path_for(source_path, size, fmt)
+        if os.path.exists(path):
+            with self._lock:
+                self._hits += 1
+            return path
+        try:
+            self._render(source_path, path, SIZES[size], fmt)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        with self._lock:
+            self._misses += 1
+        return path
+
+    def _render(self, source_path, path, max_side, fmt):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with Image.open(source_path) as image:
+            # JPEG'lerde çözme sırasında küçültme (tam çözünürlüklü görüntü belleğe alınmaz)
+            if image.format == 'JPEG':
+                image.draft('RGB', (max_side, max_side))
+            image = image.convert('RGB')
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            image.save(tmp_path, FORMATS[fmt][0], quality=self.quality)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'errors': self._errors,
+                'cache_dir': self.cache_dir,
+            }
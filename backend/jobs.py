@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+import traceback
+import uuid
+
+
+class QueueFull(Exception):
+    """İş kuyruğu dolu; istemci daha sonra tekrar denemeli."""
+
+
+class JobQueue:
+    """
+    Harici bir mesaj kuyruğu gerektirmeyen, sınırlı boyutlu iş kuyruğu ve thread havuzu.
+
+    İşler gönderildiği anda bir kimlik alır ve arka plandaki işçilerden biri tarafından
+    çalıştırılır. Kuyruk doluysa `submit` QueueFull fırlatır (sunucu 429 döner); böylece
+    biriken arka plan işleri etkileşimli isteklerin gecikmesini büyütmez. Tamamlanan işlerin
+    sonuçları `result_ttl` saniye boyunca bellekte tutulur.
+
+    Args:
+        workers (int): Aynı anda çalışacak iş sayısı
+        max_queue (int): Bekleyebilecek en fazla iş sayısı
+        result_ttl (float): Tamamlanan işin sonucunun saklanma süresi (saniye)
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, workers=2, max_queue=64, result_ttl=3600.0):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.result_ttl = float(result_ttl)
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        # Metrikler
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._completed_total = 0
+        self._failed_total = 0
+
+    def start(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs):
+        """İşi kuyruğa ekler ve iş kimliğini döndürür."""
+        self.start()
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': self.QUEUED,
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, fn, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+                self._rejected_total += 1
+            raise QueueFull(f'İş kuyruğu dolu ({self.max_queue})')
+        with self._lock:
+            self._submitted_total += 1
+        return job_id
+
+    def get(self, job_id):
+        """İşin durumunu döndürür (bilinmeyen veya süresi dolmuş işlerde None)."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(job)
+
+    def _prune(self):
+        # Süresi dolan tamamlanmış işleri sil (kilit tutulurken çağrılır)
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self):
+        while True:
+            job_id, fn, args, kwargs = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job['status'] = self.RUNNING
+                    job['started_at'] = time.time()
+            try:
+                result = fn(*args, **kwargs)
+                status, error = self.DONE, None
+            except Exception as e:
+                traceback.print_exc()
+                result, status, error = None, self.FAILED, str(e)
+            with self._lock:
+                if job is not None:
+                    job.update(status=status, result=result, error=error, finished_at=time.time())
+                if status == self.DONE:
+                    self._completed_total += 1
+                else:
+                    self._failed_total += 1
+            self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            counts = {self.QUEUED: 0, self.RUNNING: 0, self.DONE: 0, self.FAILED: 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queue.qsize(),
+                'jobs': counts,
+                'submitted_total': self._submitted_total,
+                'rejected_total': self._rejected_total,
+                'completed_total': self._completed_total,
+                'failed_total': self._failed_total,
+            }
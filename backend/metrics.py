@@ -0,0 +1,287 @@
+"""
+Sunucu metrikleri (Prometheus metin biçimi) ve isteğe bağlı yavaş istek profilleyicisi.
+
+Harici bir kütüphane gerektirmez. Metrikler kilitli sözlüklerde tutulur; bir gözlemin maliyeti
+birkaç mikro saniyedir. Profilleyici kapalıyken hiçbir thread çalışmaz.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# İsteği işleyen thread'e ait aşama süreleri (profil kayıtlarına eklenir)
+_local = threading.local()
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        for name, labels, value in self._samples():
+            lines.append(f'{name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Yalnızca artan sayaç."""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Anlık değer. `fn` verilirse değer her okumada fonksiyondan alınır (ör. kuyruk derinliği).
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, description, labelnames=(), fn=None):
+        super().__init__(name, description, labelnames)
+        self.fn = fn
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def _samples(self):
+        if self.fn is None:
+            return super()._samples()
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        return [(self.name, (), value)] if value is not None else []
+
+
+class Histogram(Metric):
+    """Kova (bucket) sayılarıyla dağılım; süreler saniye cinsindendir."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            items = [(labels, list(counts), total, count) for labels, (counts, total, count) in sorted(self._values.items())]
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                samples.append((f'{self.name}_bucket', labels, cumulative, (('le', _format_value(float(bound))),)))
+            samples.append((f'{self.name}_sum', labels, total, ()))
+            samples.append((f'{self.name}_count', labels, count, ()))
+        return samples
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+        for name, labels, value, extra in self._samples():
+            lines.append(f'{name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Tüm metrikleri Prometheus metin biçiminde (0.0.4) döndürür."""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+def begin_stages():
+    _local.stages = {}
+
+
+def end_stages():
+    stages = getattr(_local, 'stages', None)
+    _local.stages = None
+    return stages or {}
+
+
+@contextmanager
+def stage(histogram, name):
+    """
+    Bir istek aşamasının süresini ölçer: histograma yazılır ve istek profil kaydı için saklanır.
+
+    Args:
+        histogram (Histogram): `stage` etiketli süre histogramı
+        name (str): Aşama adı (ör. decode, model, db_commit)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, name)
+        stages = getattr(_local, 'stages', None)
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+
+class SlowRequestProfiler:
+    """
+    Örnekleyen (sampling) profilleyici: istek işleyen thread'lerin yığınlarını `interval_ms`
+    aralıklarla okur ve en yavaş `keep` isteğin yığınlarını flame graph için katlanmış
+    (collapsed/folded: "dosya:fonksiyon;...;dosya:fonksiyon sayı") biçimde saklar.
+
+    Örnekleme tek bir arka plan thread'inde yapılır ve yalnızca profilleyici açıkken çalışır.
+
+    Args:
+        keep (int): Saklanacak en yavaş istek sayısı
+        interval_ms (float): Örnekleme aralığı
+        max_depth (int): Yığında tutulacak en fazla çerçeve
+    """
+
+    def __init__(self, keep=10, interval_ms=5.0, max_depth=64):
+        self.keep = max(1, int(keep))
+        self.interval = max(0.5, float(interval_ms)) / 1000.0
+        self.max_depth = max_depth
+        self._active = {}
+        self._slowest = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._samples_total = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+                self._thread.start()
+
+    def begin(self):
+        """Geçerli thread'i örneklemeye ekler."""
+        self.start()
+        with self._lock:
+            self._active[threading.get_ident()] = {}
+
+    def end(self, info):
+        """
+        Geçerli thread'in örneklemesini bitirir; istek en yavaşlar arasındaysa saklanır.
+
+        Args:
+            info (dict): İstek bilgisi; en az 'duration_seconds' içermelidir
+        """
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), None)
+            if stacks is None:
+                return
+            if len(self._slowest) >= self.keep and info['duration_seconds'] <= self._slowest[-1]['duration_seconds']:
+                return
+            self._slowest.append({**info, 'samples': sum(stacks.values()), 'stacks': stacks})
+            self._slowest.sort(key=lambda entry: entry['duration_seconds'], reverse=True)
+            del self._slowest[self.keep:]
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                thread_ids = list(self._active)
+            frames = sys._current_frames()
+            collapsed = [(tid, self._collapse(frames[tid])) for tid in thread_ids if tid in frames]
+            with self._lock:
+                for tid, stack in collapsed:
+                    stacks = self._active.get(tid)
+                    if stacks is not None:
+                        stacks[stack] = stacks.get(stack, 0) + 1
+                        self._samples_total += 1
+
+    def profiles(self):
+        with self._lock:
+            return [dict(entry) for entry in self._slowest]
+
+    def folded(self, index=None):
+        """Katlanmış yığınları metin olarak döndürür (flamegraph.pl veya speedscope ile açılabilir)."""
+        entries = self.profiles()
+        if index is not None:
+            entries = entries[index:index + 1]
+        merged = {}
+        for entry in entries:
+            for stack, count in entry['stacks'].items():
+                merged[stack] = merged.get(stack, 0) + count
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(merged.items()))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keep': self.keep,
+                'interval_ms': self.interval * 1000.0,
+                'active_requests': len(self._active),
+                'samples_total': self._samples_total,
+                'stored': len(self._slowest),
+            }
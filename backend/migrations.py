@@ -0,0 +1,73 @@
+"""
+Mevcut veritabanı dosyalarını (hospital.db) güncel şemaya getirir.
+
+`db.create_all()` yalnızca eksik tabloları oluşturur; var olan tablolara indeks veya sütun
+eklemez. Buradaki migration'lar sırayla ve bir kez uygulanır, uygulananlar
+`schema_migrations` tablosunda tutulur.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+
+def _create_indexes(*names):
+    def migrate(db, conn):
+        indexes = {index.name: index for table in db.metadata.sorted_tables for index in table.indexes}
+        for name in names:
+            indexes[name].create(bind=conn, checkfirst=True)
+    return migrate
+
+
+def _add_column(table_name, column_name):
+    # Sütun tanımı modeldeki haliyle eklenir; yeni veritabanlarında create_all zaten oluşturur
+    def migrate(db, conn):
+        if column_name in {c['name'] for c in inspect(conn).get_columns(table_name)}:
+            return
+        column = db.metadata.tables[table_name].c[column_name]
+        conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(conn.dialect)}'))
+    return migrate
+
+
+def _chain(*steps):
+    def migrate(db, conn):
+        for step in steps:
+            step(db, conn)
+    return migrate
+
+
+# (sürüm, açıklama, fonksiyon)
+MIGRATIONS = [
+    (1, 'Randevu, MR görüntüsü ve bildirim sorguları için indeksler', _create_indexes(
+        'ix_appointment_patient_doctor',
+        'ix_appointment_doctor_patient',
+        'ix_mr_image_patient_uploaded',
+        'ix_notification_patient_created',
+    )),
+    (2, 'MR görüntüleri için içerik özeti (content_hash) sütunu', _chain(
+        _add_column('mr_image', 'content_hash'),
+        _create_indexes('ix_mr_image_content_hash'),
+    )),
+    (3, 'MR tahminini üreten model sürümü (model_version) sütunu', _add_column('mr_image', 'model_version')),
+]
+
+
+def apply_migrations(db):
+    """Uygulanmamış migration'ları tek transaction içinde uygular ve uygulanan sürümleri döndürür."""
+    applied_now = []
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_migrations ('
+            'version INTEGER PRIMARY KEY, description VARCHAR(200), applied_at DATETIME)'
+        ))
+        applied = {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+        for version, description, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            migrate(db, conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)'),
+                {'v': version, 'd': description, 't': datetime.now()}
+            )
+            print(f"Veritabanı güncellendi (migration {version}): {description}")
+            applied_now.append(version)
+    return applied_now
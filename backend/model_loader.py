@@ -0,0 +1,97 @@
+import threading
+import time
+import traceback
+
+
+class ModelLoader:
+    """
+    Modeli arka plandaki bir thread'de yükler ve hazır olup olmadığını bildirir.
+
+    Sunucu model yüklenirken de model gerektirmeyen istekleri karşılayabilir. Yükleme bittikten
+    sonra isteğe bağlı `warmup_fn` bir kez çalıştırılır; böylece ilk gerçek tahmin grafik
+    oluşturma (tracing) maliyetini ödemez.
+
+    Args:
+        load_fn (callable): Modeli yükleyip döndüren fonksiyon
+        warmup_fn (callable): Yüklenen modeli alıp örnek bir tahmin çalıştıran fonksiyon (isteğe bağlı)
+        on_ready (callable): Isınmadan sonra, model hazır sayılmadan önce modelle çağrılır (isteğe bağlı)
+    """
+
+    IDLE = 'idle'
+    LOADING = 'loading'
+    WARMING_UP = 'warming_up'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, load_fn, warmup_fn=None, on_ready=None):
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.on_ready = on_ready
+        self.model = None
+        self.state = self.IDLE
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.state == self.READY
+
+    @property
+    def failed(self):
+        return self.state == self.FAILED
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = self.LOADING
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='model-loader', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Yükleme bitene kadar bekler; model hazırsa True döner."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def _run(self):
+        try:
+            started = time.perf_counter()
+            model = self.load_fn()
+            self.load_seconds = time.perf_counter() - started
+            print(f"Model {self.load_seconds:.1f} saniyede yüklendi")
+            if self.warmup_fn is not None:
+                self.state = self.WARMING_UP
+                started = time.perf_counter()
+                self.warmup_fn(model)
+                self.warmup_seconds = time.perf_counter() - started
+                print(f"Model ısınma tahmini {self.warmup_seconds:.1f} saniye sürdü")
+            if self.on_ready is not None:
+                self.on_ready(model)
+            self.model = model
+            self.ready_at = time.time()
+            self.state = self.READY
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Model yüklenirken hata oluştu: {e}")
+            self.error = str(e)
+            self.state = self.FAILED
+        finally:
+            self._done.set()
+
+    def status(self):
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'error': self.error,
+            'started_at': self.started_at,
+            'ready_at': self.ready_at,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+        }
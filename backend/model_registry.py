@@ -0,0 +1,190 @@
+"""
+Yerel model kayıt deposu (registry).
+
+Her sürüm kendi klasöründe model dosyası (veya SavedModel klasörü) ve `metadata.json` ile
+saklanır; etkin sürümün adı `ACTIVE` dosyasında tutulur:
+
+    model_registry/
+        ACTIVE
+        v20250601_065654/
+            metadata.json
+            brain_tumor_model_fold10_20250601_065654.keras
+
+Kullanım:
+    python model_registry.py register ../brain_tumor_model_fold10_20250601_065654.keras --activate
+    python model_registry.py list
+    python model_registry.py activate v20250601_065654
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+from preprocessing import IMG_SIZE
+
+# Sunucunun beklediği sınıf sırası ve ön işleme (app.py, kod.py ile aynı)
+DEFAULT_CLASS_NAMES = ["glioma_tumor", "meningioma_tumor", "no_tumor", "pituitary_tumor"]
+# RGB, en yakın komşu yeniden boyutlandırma, [0, 255] float32 (EfficientNet normalizasyonu modelin içindedir)
+DEFAULT_PREPROCESSING = 'efficientnet_rgb_0_255'
+VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$')
+# Kayıt sırasında sürüm bu ekle kopyalanır; yarıda kalan bir kayıt sürüm olarak görünmez
+STAGING_SUFFIX = '.tmp'
+
+
+class ModelRegistry:
+    """
+    Sürümlü model dosyalarını ve meta verilerini yöneten yerel depo.
+
+    Args:
+        root (str): Deponun kök klasörü
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    @staticmethod
+    def valid_version(version):
+        """Sürüm adı geçerli mi (kayıt sırasındaki geçici klasör adları sürüm sayılmaz)."""
+        return bool(VERSION_PATTERN.match(version or '')) and not version.endswith(STAGING_SUFFIX)
+
+    def _version_dir(self, version):
+        if not self.valid_version(version):
+            raise ValueError(f"Geçersiz model sürümü: {version}")
+        return os.path.join(self.root, version)
+
+    def versions(self):
+        """Kayıtlı sürümlerin meta verilerini sürüm adına göre sıralı döndürür."""
+        if not os.path.isdir(self.root):
+            return []
+        result = []
+        for name in sorted(os.listdir(self.root)):
+            # Yalnızca kaydı tamamlanmış (geçici klasörden taşınmış) sürümler listelenir
+            if self.valid_version(name) and os.path.exists(os.path.join(self.root, name, 'metadata.json')):
+                result.append(self.get(name))
+        return result
+
+    def get(self, version):
+        """
+        Sürümün meta verisini döndürür; `artifact_path` model dosyasının tam yoludur.
+
+        Raises:
+            KeyError: Sürüm kayıtlı değilse
+        """
+        version_dir = self._version_dir(version)
+        try:
+            with open(os.path.join(version_dir, 'metadata.json'), encoding='utf-8') as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Model sürümü bulunamadı: {version}")
+        metadata['artifact_path'] = os.path.join(version_dir, metadata['artifact'])
+        return metadata
+
+    def register(self, artifact, version=None, runtime='auto', class_names=None, input_size=IMG_SIZE,
+                 preprocessing=DEFAULT_PREPROCESSING, metrics=None, activate=False):
+        """
+        Model dosyasını yeni bir sürüm olarak depoya kopyalar.
+
+        Args:
+            artifact (str): .keras/.h5/.tflite dosyası veya SavedModel klasörü
+            version (str): Sürüm adı (None ise zamana göre üretilir)
+            metrics (dict): İsteğe bağlı değerlendirme sonuçları (ör. test doğruluğu)
+
+        Returns:
+            dict: Yeni sürümün meta verisi
+        """
+        version = version or datetime.now().strftime('v%Y%m%d_%H%M%S')
+        version_dir = self._version_dir(version)
+        if os.path.exists(version_dir):
+            raise ValueError(f"Model sürümü zaten kayıtlı: {version}")
+        name = os.path.basename(os.path.normpath(artifact))
+        tmp_dir = version_dir + STAGING_SUFFIX
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        if os.path.isdir(artifact):
+            shutil.copytree(artifact, os.path.join(tmp_dir, name))
+        else:
+            shutil.copy2(artifact, os.path.join(tmp_dir, name))
+        metadata = {
+            'version': version,
+            'artifact': name,
+            'runtime': runtime,
+            'class_names': list(class_names or DEFAULT_CLASS_NAMES),
+            'input_size': int(input_size),
+            'preprocessing': preprocessing,
+            'metrics': metrics or {},
+            'source': os.path.abspath(artifact),
+            'created_at': datetime.now().isoformat(),
+        }
+        with open(os.path.join(tmp_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        # Yarım kopyalanmış bir sürüm hiçbir zaman görünmez
+        os.replace(tmp_dir, version_dir)
+        if activate:
+            self.set_active(version)
+        return self.get(version)
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.root, 'ACTIVE'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_active(self, version):
+        """Etkin sürümü kaydeder; sunucu yeniden başlatıldığında bu sürüm yüklenir."""
+        self.get(version)
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, 'ACTIVE')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(path + '.tmp', path)
+
+
+def check_compatible(metadata, class_names, input_size=IMG_SIZE, preprocessing=DEFAULT_PREPROCESSING):
+    """Sürüm sunucunun sınıf sırası ve ön işlemesiyle uyumlu değilse ValueError fırlatır."""
+    if list(metadata.get('class_names', [])) != list(class_names):
+        raise ValueError(f"Sınıf sırası uyumsuz: {metadata.get('class_names')}")
+    if int(metadata.get('input_size', 0)) != int(input_size):
+        raise ValueError(f"Girdi boyutu uyumsuz: {metadata.get('input_size')} (beklenen {input_size})")
+    if metadata.get('preprocessing') != preprocessing:
+        raise ValueError(f"Ön işleme uyumsuz: {metadata.get('preprocessing')} (beklenen {preprocessing})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Yerel model kayıt deposu')
+    parser.add_argument('--root', default=os.environ.get('MODEL_REGISTRY_DIR') or
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model_registry'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    register = commands.add_parser('register', help='Model dosyasını yeni sürüm olarak ekle')
+    register.add_argument('artifact')
+    register.add_argument('--version', default=None)
+    register.add_argument('--runtime', default='auto')
+    register.add_argument('--metrics', default=None, help='Değerlendirme sonuçlarını içeren JSON dosyası')
+    register.add_argument('--activate', action='store_true', help='Sunucu yeniden başlatıldığında bu sürüm yüklensin')
+    commands.add_parser('list', help='Kayıtlı sürümleri listele')
+    activate = commands.add_parser('activate', help='Etkin sürümü değiştir (çalışan sunucu için POST /admin/model veya serve.py ana işlemine SIGHUP)')
+    activate.add_argument('version')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'register':
+        metrics = None
+        if args.metrics:
+            with open(args.metrics, encoding='utf-8') as f:
+                metrics = json.load(f)
+        metadata = registry.register(args.artifact, args.version, args.runtime, metrics=metrics, activate=args.activate)
+        print(f"Model sürümü kaydedildi: {metadata['version']} ({metadata['artifact_path']})")
+    elif args.command == 'list':
+        active = registry.active_version()
+        for metadata in registry.versions():
+            marker = '*' if metadata['version'] == active else ' '
+            print(f"{marker} {metadata['version']:<24} {metadata['artifact']:<50} {metadata['created_at']}")
+    else:
+        registry.set_active(args.version)
+        print(f"Etkin model sürümü: {args.version}")
+
+
+if __name__ == '__main__':
+    main()
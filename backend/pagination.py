@@ -0,0 +1,153 @@
+"""
+Liste endpoint'leri için imleçli (keyset) sayfalama, alan seçimi ve akışlı JSON yanıtları.
+
+İstek parametreleri:
+    limit:  Sayfa başına en fazla kayıt (verilmezse tüm liste akış halinde döner)
+    cursor: Önceki yanıtın `X-Next-Cursor` başlığındaki değer
+    fields: Virgülle ayrılmış alan listesi (ör. `fields=id,date`); yalnızca bu sütunlar sorgulanır
+
+Yanıt gövdesi her zaman bir JSON dizisidir; sonraki sayfa varsa imleci `X-Next-Cursor`
+başlığında döner.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import and_, or_
+
+MAX_LIMIT = 500
+STREAM_CHUNK_ROWS = 200
+
+
+class PaginationError(ValueError):
+    """Geçersiz `limit`, `cursor` veya `fields` parametresi."""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, count):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError):
+        raise PaginationError('Geçersiz cursor!')
+    if len(values) != count:
+        raise PaginationError('Geçersiz cursor!')
+    return values
+
+
+def parse_limit(value):
+    if value in (None, ''):
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('limit bir tam sayı olmalı!')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise PaginationError(f'limit 1 ile {MAX_LIMIT} arasında olmalı!')
+    return limit
+
+
+def parse_fields(value, fields):
+    if not value:
+        return list(fields)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in fields]
+    if unknown or not names:
+        raise PaginationError(f"Bilinmeyen alan: {', '.join(unknown)}. Geçerli alanlar: {', '.join(fields)}")
+    return names
+
+
+def _after(order, values):
+    # (a, b) > (x, y)  =>  a > x OR (a = x AND b > y); azalan sıralamada karşılaştırma tersine döner
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        compare = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[order[j][0] == values[j] for j in range(i)], compare))
+    return or_(*clauses)
+
+
+def paginated_json(query, fields, order):
+    """
+    Sorguyu isteğin `limit`, `cursor` ve `fields` parametrelerine göre çalıştırıp akışlı bir
+    JSON dizisi yanıtı döndürür.
+
+    Args:
+        query: Filtreleri ve join'leri uygulanmış temel sorgu
+        fields (dict): Alan adı -> sütun ifadesi veya (sütun ifadesi, dönüştürme fonksiyonu)
+        order (list): (sütun, azalan mı) çiftleri; son sütun benzersiz olmalı (ör. id)
+
+    Returns:
+        flask.Response
+    """
+    names = parse_fields(request.args.get('fields'), fields)
+    limit = parse_limit(request.args.get('limit'))
+    columns, converters = [], {}
+    for name in names:
+        column = fields[name]
+        if isinstance(column, tuple):
+            column, converters[name] = column
+        columns.append(column.label(name))
+    keys = [f'_k{i}' for i in range(len(order))]
+    columns += [column.label(key) for (column, _), key in zip(order, keys)]
+
+    query = query.with_entities(*columns)
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.filter(_after(order, decode_cursor(cursor, len(order))))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+
+    next_cursor = None
+    if limit:
+        # Sayfa sınırlı olduğu için bir fazlası okunur; fazlası varsa sonraki sayfa vardır
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]._mapping[key] for key in keys])
+    else:
+        rows = query.yield_per(STREAM_CHUNK_ROWS)
+
+    def serialize(row):
+        item = {}
+        for name in names:
+            value = row._mapping[name]
+            item[name] = converters[name](value) if name in converters else value
+        return item
+
+    def generate():
+        dumps = current_app.json.dumps
+        chunk, first = ['['], True
+        try:
+            for row in rows:
+                chunk.append(('' if first else ',') + dumps(serialize(row)))
+                first = False
+                if len(chunk) >= STREAM_CHUNK_ROWS:
+                    yield ''.join(chunk)
+                    chunk = []
+            chunk.append(']')
+            yield ''.join(chunk)
+        finally:
+            # Akış, isteğin oturumu kapatıldıktan sonra da sürebilir; yield_per'in açtığı
+            # bağlantı havuza burada geri verilir (aksi halde yük altında havuz tükenir)
+            query.session.close()
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def content_hash(data):
+    """Görüntü baytlarının SHA-256 özetini döndürür."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def model_identity(model_path):
+    """
+    Model dosyasının kimliğini döndürür (yol, boyut ve değişiklik zamanı).
+    Aynı yola farklı bir model kopyalandığında kimlik de değişir. Yol listesi verilirse
+    (model topluluğu) üyelerin kimliklerinden tek bir kimlik üretilir.
+    """
+    if isinstance(model_path, (list, tuple)):
+        raw = '|'.join(model_identity(path) for path in model_path)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    path = os.path.abspath(model_path)
+    try:
+        st = os.stat(path)
+        raw = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        raw = path
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    İçerik adresli tahmin önbelleği.
+
+    Anahtar, görüntü baytlarının özeti ile yüklü modelin kimliğidir. Bellekteki LRU katmanı
+    `max_entries` ve `ttl_seconds` ile sınırlanır; `disk_dir` verilirse olasılıklar diske de
+    yazılır ve sunucu yeniden başlatıldığında tekrar kullanılır. Model değiştiğinde
+    (`set_model_identity`) eski kayıtlar geçersiz sayılır.
+
+    Args:
+        max_entries (int): Bellekte tutulacak en fazla kayıt (0 ise bellek katmanı kapalı)
+        ttl_seconds (float): Kaydın geçerlilik süresi (0 veya None ise süresiz)
+        disk_dir (str): Disk katmanının klasörü (None ise disk katmanı kapalı)
+        model_identity (str): Yüklü modelin kimliği
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=86400, disk_dir=None, model_identity=''):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self.disk_dir = disk_dir
+        self.model_identity = model_identity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def set_model_identity(self, identity):
+        """Model değiştiğinde bellekteki kayıtları temizler; disk kayıtları kimliğe göre ayrıldığı için kendiliğinden geçersizleşir."""
+        with self._lock:
+            if identity == self.model_identity:
+                return
+            self.model_identity = identity
+            self._entries.clear()
+            self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, digest, identity):
+        return os.path.join(self.disk_dir, identity or 'default', digest[:2], f"{digest}.npy")
+
+    def get(self, digest, identity=None):
+        """
+        Önbellekteki olasılık vektörünü döndürür, yoksa None.
+
+        `identity` verilir ve etkin model kimliğinden farklıysa (model takası sırasında eski
+        modelle çalışan istekler) bellek katmanı kullanılmaz, yalnızca o kimliğin disk kaydına bakılır.
+        """
+        with self._lock:
+            if identity is not None and identity != self.model_identity:
+                entry = None
+            else:
+                identity = self.model_identity
+                entry = self._entries.get(digest)
+            if entry is not None:
+                probs, stored_at = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(digest)
+                    self._hits += 1
+                    return probs
+                del self._entries[digest]
+                self._evictions += 1
+        probs = self._disk_get(digest, identity)
+        with self._lock:
+            if probs is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            if identity == self.model_identity:
+                self._store(digest, probs)
+        return probs
+
+    def put(self, digest, probs, identity=None):
+        probs = np.array(probs, dtype=np.float32)
+        with self._lock:
+            if identity is None or identity == self.model_identity:
+                identity = self.model_identity
+                self._store(digest, probs)
+        self._disk_put(digest, probs, identity)
+
+    def _store(self, digest, probs):
+        if self.max_entries == 0:
+            return
+        self._entries[digest] = (probs, time.time())
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _disk_get(self, digest, identity):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(digest, identity)
+        try:
+            if self._expired(os.path.getmtime(path)):
+                os.remove(path)
+                return None
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, digest, probs, identity):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(digest, identity)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, probs)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Tahmin önbelleği diske yazılamadı: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                'model_identity': self.model_identity,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'disk_enabled': bool(self.disk_dir),
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_ratio': ((self._hits + self._disk_hits) / lookups) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
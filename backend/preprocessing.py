@@ -0,0 +1,128 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Eğitim (kod.py) ve sunucu (app.py) aynı ön işlemeyi kullanır; çıktılar bit düzeyinde aynıdır.
+IMG_SIZE = 224
+# Mevcut checkpoint'ler Keras load_img (ImageDataGenerator) varsayılanıyla, en yakın komşu
+# yeniden boyutlandırmayla eğitildi; çıktı load_img + img_to_array ile bit düzeyinde aynıdır
+RESAMPLE = Image.NEAREST
+# Piksel başına renk dönüşümü ile en yakın komşu örneklemenin sırası sonucu değiştirmez: bu
+# modlarda önce küçültülüp sonra RGB'ye çevrilir (gri taramalarda dönüşüm 224x224 üzerinde yapılır)
+RESIZE_FIRST_MODES = ('L', 'P', 'RGB', 'RGBA', 'LA', 'CMYK')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _open(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def decode_into(source, out, size=IMG_SIZE):
+    """
+    Görüntüyü çözüp (size, size, 3) boyutlu `out` dizisine yazar.
+
+    Args:
+        source: Dosya yolu, bayt dizisi veya dosya nesnesi
+        out (np.ndarray): Yazılacak dizi (uint8 veya float32)
+    """
+    with _open(source) as image:
+        if image.mode not in RESIZE_FIRST_MODES:
+            image = image.convert('RGB')
+        if image.size != (size, size):
+            image = image.resize((size, size), RESAMPLE)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        out[...] = np.asarray(image)
+    return out
+
+
+class BatchBuffer:
+    """
+    Tekrar kullanılabilen batch tamponu. Görüntüler uint8 tampona çözülür, ardından tek
+    vektörel işlemle float32 model girdisine kopyalanır.
+    """
+
+    def __init__(self, capacity, size=IMG_SIZE):
+        self.size = size
+        self.raw = np.empty((0, size, size, 3), dtype=np.uint8)
+        self.out = np.empty((0, size, size, 3), dtype=np.float32)
+        self.ensure(capacity)
+
+    def ensure(self, capacity):
+        if capacity > self.raw.shape[0]:
+            self.raw = np.empty((capacity, self.size, self.size, 3), dtype=np.uint8)
+            self.out = np.empty((capacity, self.size, self.size, 3), dtype=np.float32)
+
+
+def preprocess_batch(sources, buffer=None, size=IMG_SIZE, executor=None):
+    """
+    Bir görüntü listesini tek seferde model girdisine dönüştürür.
+
+    EfficientNet'in `preprocess_input` fonksiyonu girdiyi değiştirmez (normalizasyon modelin
+    içindedir); bu yüzden çıktı [0, 255] aralığında float32 değerlerdir.
+
+    Args:
+        sources (list): Dosya yolları veya bayt dizileri
+        buffer (BatchBuffer): Tekrar kullanılacak tampon (None ise yeni tampon ayrılır)
+        executor (ThreadPoolExecutor): Verilirse görüntüler paralel çözülür
+
+    Returns:
+        np.ndarray: (len(sources), size, size, 3) boyutlu float32 dizi (tamponun bir görünümü)
+    """
+    n = len(sources)
+    if buffer is None:
+        buffer = BatchBuffer(n, size)
+    else:
+        buffer.ensure(n)
+    raw = buffer.raw[:n]
+    if executor is not None and n > 1:
+        list(executor.map(lambda i: decode_into(sources[i], raw[i], size), range(n)))
+    else:
+        for i, source in enumerate(sources):
+            decode_into(source, raw[i], size)
+    out = buffer.out[:n]
+    np.copyto(out, raw, casting='unsafe')
+    return out
+
+
+def preprocess_image(source, size=IMG_SIZE):
+    """Tek bir görüntüyü (1, size, size, 3) boyutlu yeni bir float32 diziye dönüştürür."""
+    out = np.empty((1, size, size, 3), dtype=np.float32)
+    return decode_into(source, out[0], size)[np.newaxis]
+
+
+def list_images(root_dir):
+    """Sınıf klasörlerindeki görüntü yollarını ve etiketlerini (alfabetik sınıf sırası) döndürür."""
+    class_dirs = sorted(d for d in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, d)))
+    paths, labels = [], []
+    for label, class_dir in enumerate(class_dirs):
+        folder = os.path.join(root_dir, class_dir)
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(folder, name))
+                labels.append(label)
+    return paths, np.array(labels, dtype=np.int64), class_dirs
+
+
+def load_images(paths, size=IMG_SIZE, workers=None):
+    """Görüntüleri önceden ayrılmış tek bir uint8 diziye paralel olarak çözer."""
+    images = np.empty((len(paths), size, size, 3), dtype=np.uint8)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        list(executor.map(lambda i: decode_into(paths[i], images[i], size), range(len(paths))))
+    return images
+
+
+def load_directory(root_dir, size=IMG_SIZE, workers=None):
+    """
+    Sınıf klasörlerinden oluşan bir veri setini belleğe yükler.
+
+    Returns:
+        tuple: (uint8 görüntüler, etiketler, sınıf isimleri, dosya yolları)
+    """
+    paths, labels, class_names = list_images(root_dir)
+    return load_images(paths, size, workers), labels, class_names, paths
@@ -0,0 +1,349 @@
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+# Derlenmiş çıkarımda batch'ler bu boyutlara doldurulur; XLA her farklı boyut için yeniden
+# derlediğinden derleme sayısı sınırlı kalır
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def bucket_size(n, buckets=BATCH_BUCKETS):
+    """n satırın doldurulacağı batch boyutu (en büyük kovadan büyükse onun katına yuvarlanır)."""
+    for size in buckets:
+        if n <= size:
+            return size
+    return -(-n // buckets[-1]) * buckets[-1]
+
+
+class CompiledPredictor:
+    """
+    Keras modelini sabit girdi imzalı bir tf.function ile çalıştırır.
+
+    model.predict her çağrıda veri adaptörü ve yürütme döngüsü kurar; tek görüntülük isteklerde
+    bu ek yük modelin kendisiyle kıyaslanabilir. Burada grafik bir kez oluşturulur (batch boyutu
+    serbest). `jit_compile` açıksa XLA her girdi boyutu için ayrı derlediğinden batch kovalara
+    doldurulur ve her kova bir kez derlenir.
+
+    Args:
+        model: Keras modeli (tek veya çok çıkışlı)
+        jit_compile (bool): XLA ile derle
+        buckets (tuple): Batch'in doldurulacağı boyutlar
+    """
+
+    def __init__(self, model, jit_compile=False, buckets=BATCH_BUCKETS):
+        import tensorflow as tf
+        self._tf = tf
+        self.model = model
+        self.jit_compile = jit_compile
+        self.buckets = tuple(buckets) if jit_compile else (1,)
+        signature = [tf.TensorSpec([None, *model.input_shape[1:]], tf.float32)]
+        self._fn = tf.function(lambda x: model(x, training=False), input_signature=signature,
+                               jit_compile=jit_compile)
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        n = len(batch)
+        size = bucket_size(n, self.buckets) if self.jit_compile else n
+        if size != n:
+            batch = np.concatenate([batch, np.zeros((size - n, *batch.shape[1:]), dtype=np.float32)])
+        outputs = self._fn(self._tf.constant(batch))
+        if isinstance(outputs, (list, tuple)):
+            return [np.asarray(o)[:n] for o in outputs]
+        return np.asarray(outputs)[:n]
+
+
+class KerasRuntime:
+    """
+    Eğitimde kaydedilen .keras / .h5 modelini çalıştırır.
+
+    Args:
+        compiled (bool): model.predict yerine CompiledPredictor kullan
+        jit_compile (bool): Derlenmiş fonksiyonu XLA ile derle
+    """
+
+    name = 'keras'
+
+    def __init__(self, path, compiled=True, jit_compile=False):
+        from tensorflow import keras
+        self.path = path
+        self.model = keras.models.load_model(path, compile=False)
+        self.compiled = compiled
+        self._predictor = CompiledPredictor(self.model, jit_compile) if compiled else None
+        # Isınmada derlenecek batch boyutları
+        self.buckets = self._predictor.buckets if compiled else (1,)
+
+    def predict(self, batch):
+        if self._predictor is not None:
+            return self._predictor(batch)
+        return self.model.predict(batch, verbose=0)
+
+
+class SavedModelRuntime:
+    """export_model.py ile dışa aktarılan SavedModel klasörünü çalıştırır."""
+
+    name = 'savedmodel'
+
+    def __init__(self, path):
+        import tensorflow as tf
+        self._tf = tf
+        self.path = path
+        self.model = tf.saved_model.load(path)
+        self._fn = self.model.signatures['serving_default']
+        self._input_name = list(self._fn.structured_input_signature[1].keys())[0]
+
+    def predict(self, batch):
+        outputs = self._fn(**{self._input_name: self._tf.constant(batch, dtype=self._tf.float32)})
+        return next(iter(outputs.values())).numpy()
+
+
+class TFLiteRuntime:
+    """
+    export_model.py ile üretilen .tflite modelini çalıştırır (float32, float16 veya int8).
+    Nicemlenmiş (quantized) giriş/çıkış tensörleri otomatik olarak dönüştürülür.
+
+    `model_content` verilirse model dosyası yeniden okunmaz; interpreter bu baytları kopyalamadan
+    kullanır (serve.py ana işlemde bir kez okur, işçiler aynı bellek sayfalarını paylaşır).
+    """
+
+    name = 'tflite'
+
+    def __init__(self, path, num_threads=None, model_content=None):
+        import tensorflow as tf
+        self.path = path
+        if model_content is not None:
+            self.interpreter = tf.lite.Interpreter(model_content=model_content, num_threads=num_threads)
+        else:
+            self.interpreter = tf.lite.Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        # Interpreter thread-safe değildir
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], [batch.shape[0], *batch.shape[1:]])
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+                self._batch_size = batch.shape[0]
+            scale, zero_point = self._input['quantization']
+            if self._input['dtype'] != np.float32 and scale:
+                info = np.iinfo(self._input['dtype'])
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+            self.interpreter.set_tensor(self._input['index'], batch.astype(self._input['dtype']))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output['index'])
+            scale, zero_point = self._output['quantization']
+            if self._output['dtype'] != np.float32 and scale:
+                output = (output.astype(np.float32) - zero_point) * scale
+            return output
+
+
+class StubRuntime:
+    """
+    Yük testleri için gerçek modelin yerine geçen sahte model (TensorFlow gerektirmez).
+
+    Olasılıklar görüntü içeriğinden sabit bir projeksiyonla üretilir; aynı görüntü her zaman
+    aynı sonucu verir. Modelin süresi `latency_ms` (çağrı başına) ve `row_latency_ms`
+    (görüntü başına) ile taklit edilir. Yol kullanılmaz.
+    """
+
+    name = 'stub'
+
+    def __init__(self, path=None, latency_ms=0.0, row_latency_ms=0.0, num_classes=4):
+        self.path = path
+        self.latency = float(latency_ms) / 1000.0
+        self.row_latency = float(row_latency_ms) / 1000.0
+        self._weights = np.random.default_rng(0).normal(size=(12, num_classes)).astype(np.float32)
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        delay = self.latency + self.row_latency * len(batch)
+        if delay > 0:
+            time.sleep(delay)
+        # 2x2 bölge x 3 kanal ortalamaları -> sınıf skorları
+        h, w = batch.shape[1] // 2, batch.shape[2] // 2
+        features = np.concatenate([batch[:, y:y + h, x:x + w].mean(axis=(1, 2))
+                                   for y in (0, h) for x in (0, w)], axis=1) / 255.0
+        logits = (features - 0.5) @ self._weights * 4.0
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+RUNTIMES = {
+    KerasRuntime.name: KerasRuntime,
+    SavedModelRuntime.name: SavedModelRuntime,
+    TFLiteRuntime.name: TFLiteRuntime,
+    StubRuntime.name: StubRuntime,
+}
+
+
+class EnsembleRuntime:
+    """
+    Birden fazla modelin (ör. k-fold checkpoint'leri) olasılıklarının ortalamasını döndürür.
+
+    Tüm üyeler aynı ön işlenmiş batch'i alır. Üyeler ilk tahminde (veya `load` çağrıldığında)
+    yüklenir. Tüm üyeler Keras modeliyse ve `merge` açıksa tek bir çok çıkışlı grafikte
+    birleştirilir; böylece her batch için modeller ayrı ayrı değil tek çağrıda çalışır.
+    `subset` aynı yüklenmiş üyeleri paylaşan daha küçük bir topluluk döndürür.
+
+    Args:
+        paths (list): Üye model yolları
+        kind (str): Üyelerin çalışma ortamı ('auto' ise her yoldan ayrı tahmin edilir)
+        merge (bool): Keras üyeleri tek grafikte birleştirilsin mi
+    """
+
+    name = 'ensemble'
+
+    def __init__(self, paths, kind=None, merge=True, compiled=True, jit_compile=False):
+        self.paths = list(paths)
+        if not self.paths:
+            raise ValueError('Topluluk (ensemble) için en az bir model gerekli')
+        self.kind = kind
+        self.merge = merge
+        self.compiled = compiled
+        self.jit_compile = jit_compile
+        self.buckets = BATCH_BUCKETS if compiled and jit_compile else (1,)
+        self.members = [None] * len(self.paths)
+        self._merged = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Metrikler
+        self._calls = 0
+        self._rows = 0
+        self._seconds = 0.0
+        self._member_seconds = [0.0] * len(self.paths)
+
+    def load(self):
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            for i, path in enumerate(self.paths):
+                if self.members[i] is None:
+                    self.members[i] = load_runtime(path, self.kind, self.compiled, self.jit_compile)
+            if self.merge and len(self.members) > 1 and all(m.name == KerasRuntime.name for m in self.members):
+                merged = self._merge([m.model for m in self.members])
+                self._merged = CompiledPredictor(merged, self.jit_compile) if self.compiled else \
+                    (lambda batch: merged.predict(batch, verbose=0))
+            self._loaded = True
+        return self
+
+    @staticmethod
+    def _merge(models):
+        from tensorflow import keras
+        inputs = keras.Input(shape=models[0].input_shape[1:])
+        outputs = []
+        for i, model in enumerate(models):
+            # Aynı isimli alt modeller tek grafikte bulunamaz
+            model.name = f'member_{i}'
+            outputs.append(model(inputs))
+        return keras.Model(inputs, outputs, name='ensemble')
+
+    def subset(self, indices):
+        """Seçilen üyelerden, yüklenmiş modelleri paylaşan yeni bir topluluk oluşturur."""
+        self.load()
+        ensemble = EnsembleRuntime([self.paths[i] for i in indices], self.kind, self.merge, self.compiled, self.jit_compile)
+        ensemble.members = [self.members[i] for i in indices]
+        return ensemble
+
+    def predict_members(self, batch):
+        """Her üyenin olasılıklarını (üye sayısı, N, sınıf sayısı) boyutunda döndürür."""
+        self.load()
+        started = time.perf_counter()
+        member_seconds = [0.0] * len(self.members)
+        if self._merged is not None:
+            outputs = np.stack([np.asarray(o) for o in self._merged(batch)])
+        else:
+            results = []
+            for i, member in enumerate(self.members):
+                member_started = time.perf_counter()
+                results.append(np.asarray(member.predict(batch), dtype=np.float32))
+                member_seconds[i] = time.perf_counter() - member_started
+            outputs = np.stack(results)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._calls += 1
+            self._rows += len(batch)
+            self._seconds += elapsed
+            for i, seconds in enumerate(member_seconds):
+                self._member_seconds[i] += seconds
+        return outputs
+
+    def predict(self, batch):
+        return self.predict_members(batch).mean(axis=0)
+
+    def stats(self):
+        with self._lock:
+            calls = self._calls
+            return {
+                'members': [{
+                    'path': path,
+                    'runtime': member.name if member is not None else None,
+                    'loaded': member is not None,
+                    # Birleştirilmiş grafikte üyeler ayrı ölçülemez
+                    'avg_ms': (self._member_seconds[i] / calls * 1000) if calls and self._merged is None else None,
+                } for i, (path, member) in enumerate(zip(self.paths, self.members))],
+                'merged': self._merged is not None,
+                'calls': calls,
+                'rows': self._rows,
+                'avg_ms': (self._seconds / calls * 1000) if calls else None,
+            }
+
+
+def resolve_model_paths(spec, base_dir='.'):
+    """
+    Virgülle ayrılmış model yollarını veya glob desenlerini (ör. brain_tumor_model_fold*.keras)
+    sıralı ve tekrarsız bir yol listesine çevirir. Göreli yollar base_dir'e göre çözülür.
+    """
+    paths = []
+    for item in (part.strip() for part in (spec or '').split(',')):
+        if not item:
+            continue
+        if not os.path.isabs(item):
+            item = os.path.join(base_dir, item)
+        matches = sorted(glob.glob(item)) if any(c in item for c in '*?[') else [item]
+        if not matches:
+            raise ValueError(f"Desene uyan model bulunamadı: {item}")
+        for match in matches:
+            match = os.path.normpath(match)
+            if match not in paths:
+                paths.append(match)
+    return paths
+
+
+def detect_runtime(path):
+    """Model yolundan uygun çalışma ortamını tahmin eder."""
+    if os.path.isdir(path):
+        return SavedModelRuntime.name
+    if path.endswith('.tflite'):
+        return TFLiteRuntime.name
+    return KerasRuntime.name
+
+
+def load_runtime(path, kind=None, compiled=True, jit_compile=False, **kwargs):
+    """
+    Modeli seçilen çalışma ortamıyla yükler.
+
+    Args:
+        path (str): Model dosyası veya SavedModel klasörü
+        kind (str): 'keras', 'savedmodel', 'tflite', 'stub' veya None/'auto' (yoldan tahmin edilir)
+        compiled (bool): Keras modeli sabit imzalı tf.function ile çalıştırılsın
+        jit_compile (bool): Keras modeli XLA ile derlensin
+    """
+    if not kind or kind == 'auto':
+        kind = detect_runtime(path)
+    if kind not in RUNTIMES:
+        raise ValueError(f"Bilinmeyen model çalışma ortamı: {kind}")
+    if kind == KerasRuntime.name:
+        kwargs.update(compiled=compiled, jit_compile=jit_compile)
+    return RUNTIMES[kind](path, **kwargs)
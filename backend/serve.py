@@ -0,0 +1,378 @@
+"""
+Üretim sunucusu: ön yüklemeli (prefork) çok işçili WSGI sunucusu.
+
+Ana işlem uygulamayı (ve TensorFlow'u) bir kez içe aktarır, veritabanını hazırlar, dinleme
+soketini açar ve N işçi çatallar (fork). İşçiler aynı soketten bağlantı kabul eder ve ana
+işlemde yüklenen sayfaları yazmadıkları sürece kopyalamadan (copy-on-write) paylaşır.
+
+- TFLite modeli (export_model.py) ana işlemde bir kez belleğe okunur; tüm işçilerin
+  interpreter'ları aynı model baytlarını kullanır, ağırlıklar N kez kopyalanmaz.
+- Keras/SavedModel modelleri (ve topluluklar) her işçide fork'tan sonra yüklenir: TensorFlow
+  çalışma ortamı fork'a dayanıklı değildir. Bellek işçi sayısıyla arttığı için bu modellerle
+  birden fazla işçi yalnızca --allow-model-copies ile başlatılır; üretimde TFLite önerilir.
+- Her işçi kendi çekirdek grubuna sabitlenir (Linux) ve TensorFlow intra-op/inter-op thread
+  sayıları çekirdek grubunun boyutuna göre ayarlanır; işçiler birbirinin thread havuzuyla yarışmaz.
+
+İşçi yenileme:
+- --max-requests: işçi bu kadar istekten sonra yeni bağlantı almayı bırakır, elindeki istekleri
+  bitirip çıkar; yerine yenisi çatallanır.
+- SIGHUP: işçiler sırayla yenilenir; yeni işçinin modeli hazır olmadan eskisi durdurulmaz.
+  Ana işlem model depodaki etkin sürümü yeniden seçer; sürüm değiştirmek için
+  `model_registry.py activate <sürüm>` ardından SIGHUP gönderilir.
+- Her işçinin kendi iş kuyruğu, sunulan modeli ve metrikleri vardır: birden fazla işçide
+  asenkron tahmin (?async=1) ve POST /admin/model takası reddedilir (409); GET /metrics
+  isteği karşılayan işçinin metriklerini döndürür.
+- SIGTERM/SIGINT: işçiler elindeki istekleri bitirip kapanır (--graceful-timeout).
+
+Kullanım:
+    MODEL_PATH=../exported/model_float16.tflite python serve.py --bind 0.0.0.0:5000 --workers 8
+    MODEL_PATH=../exported/model_float16.tflite python serve.py --workers 8 --max-requests 5000
+    python serve.py --workers 2 --allow-model-copies     # Keras modeli her işçide ayrı yüklenir
+"""
+import argparse
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import ClosingIterator
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_cpus(slot, cpus, threads):
+    """İşçinin sabitleneceği çekirdekler; çekirdek işçi sayısından azsa gruplar paylaşılır."""
+    start = (slot * threads) % len(cpus)
+    return [cpus[(start + i) % len(cpus)] for i in range(min(threads, len(cpus)))]
+
+
+def configure_threads(intra_op, inter_op, cpus):
+    """
+    İşçinin thread sayılarını ve çekirdek sabitlemesini ayarlar. TensorFlow çalışma ortamı
+    başlamadan (ilk işlemden önce) çağrılmalıdır.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(intra_op)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op)
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    if 'tensorflow' in sys.modules:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Her istek için erişim günlüğü yazmaz (--access-log ile açılır)."""
+
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+class CountingApp:
+    """
+    İşlenmekte olan istekleri sayar ve istek sınırına ulaşılınca `limit_reached` olayını tetikler.
+    Akışlı yanıtlar gövde gönderilip kapatılana kadar işlenmekte sayılır.
+    """
+
+    def __init__(self, app, max_requests=0):
+        self.app = app
+        self.max_requests = max_requests
+        self.handled = 0
+        self.in_flight = 0
+        self.limit_reached = threading.Event()
+        self._lock = threading.Lock()
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.in_flight += 1
+            self.handled += 1
+            if self.max_requests and self.handled >= self.max_requests:
+                self.limit_reached.set()
+        try:
+            return ClosingIterator(self.app(environ, start_response), self._finished)
+        except BaseException:
+            self._finished()
+            raise
+
+    def drain(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self.in_flight <= 0:
+                    return True
+            time.sleep(0.05)
+        return False
+
+
+def run_worker(backend, listener, slot, args, cpus, ready_fd, wait_for_model, autoload):
+    """İşçi işleminin ana fonksiyonu; geri dönmez."""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    configure_threads(args.threads, args.inter_op_threads, cpus if args.pin else None)
+    if 'model_content' in backend.model_runtime_options:
+        backend.model_runtime_options['num_threads'] = args.threads
+    # Ana işlemden kalan bağlantılar kullanılmaz; her işçi kendi havuzunu açar
+    with backend.app.app_context():
+        backend.db.engine.dispose(close=False)
+
+    if autoload:
+        backend.model_loader.start()
+        # Yenilenen işçiler model hazır olmadan bağlantı almaz; istekleri diğer işçiler karşılar
+        if wait_for_model:
+            backend.model_loader.wait()
+
+    def notify_ready():
+        ready = backend.model_loader.wait() if autoload else True
+        os.write(ready_fd, b'1' if ready else b'0')
+        os.close(ready_fd)
+    threading.Thread(target=notify_ready, daemon=True).start()
+
+    max_requests = args.max_requests + random.randint(0, args.max_requests_jitter) if args.max_requests else 0
+    counting = CountingApp(backend.app, max_requests)
+    handler = WSGIRequestHandler if args.access_log else QuietRequestHandler
+    host, port = listener.getsockname()[:2]
+    server = ThreadedWSGIServer(host, port, counting, handler=handler, fd=listener.fileno())
+
+    def watch():
+        while not stop.is_set() and not counting.limit_reached.is_set():
+            stop.wait(0.2)
+        if counting.limit_reached.is_set() and not stop.is_set():
+            print(f"[işçi {os.getpid()}] {counting.handled} istek işlendi, yenileniyor", flush=True)
+        server.shutdown()
+    threading.Thread(target=watch, daemon=True).start()
+
+    print(f"[işçi {os.getpid()}] başladı (çekirdekler: {cpus if args.pin else 'tümü'}, "
+          f"intra-op: {args.threads}, inter-op: {args.inter_op_threads})", flush=True)
+    server.serve_forever(poll_interval=0.2)
+    if not counting.drain(args.graceful_timeout):
+        print(f"[işçi {os.getpid()}] bekleyen istekler {args.graceful_timeout} sn içinde bitmedi", flush=True)
+    sys.stdout.flush()
+    os._exit(0)
+
+
+class Master:
+    """İşçileri çatallayan, izleyen ve yenileyen ana işlem."""
+
+    def __init__(self, backend, listener, args, autoload):
+        self.backend = backend
+        self.listener = listener
+        self.args = args
+        self.autoload = autoload
+        self.cpus = available_cpus()
+        self.workers = {}  # pid -> (slot, hazır bildirimi okuma ucu)
+        self.stopping = False
+        self.reload_requested = False
+        self.last_spawn = {}
+
+    def spawn(self, slot, wait_for_model=False):
+        cpus = worker_cpus(slot, self.cpus, self.args.threads)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            for _, other_fd in self.workers.values():
+                os.close(other_fd)
+            try:
+                run_worker(self.backend, self.listener, slot, self.args, cpus, write_fd, wait_for_model, self.autoload)
+            finally:
+                os._exit(1)
+        os.close(write_fd)
+        self.workers[pid] = (slot, read_fd)
+        self.last_spawn[slot] = time.monotonic()
+        return pid
+
+    def wait_ready(self, pid, timeout):
+        """İşçinin modeli hazır olana (veya işçi çıkana) kadar bekler."""
+        read_fd = self.workers[pid][1]
+        ready, _, _ = select.select([read_fd], [], [], timeout)
+        return bool(ready) and os.read(read_fd, 1) == b'1'
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot, read_fd = self.workers.pop(pid, (None, None))
+            if read_fd is not None:
+                os.close(read_fd)
+            if slot is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0:
+                print(f"İşçi {pid} beklenmedik şekilde çıktı (kod {code}), yeniden başlatılıyor", flush=True)
+                # Sürekli çöken işçi için hızlı döngüye girilmez
+                if time.monotonic() - self.last_spawn.get(slot, 0) < 5:
+                    time.sleep(1)
+            if slot not in (s for s, _ in self.workers.values()):
+                self.spawn(slot, wait_for_model=True)
+
+    def rolling_restart(self):
+        print("SIGHUP: işçiler sırayla yenileniyor", flush=True)
+        # Depoda etkinleştirilen sürüm (model_registry.py activate) yeni işçilerde yüklenir
+        try:
+            self.backend.reselect_model(lambda path, runtime: check_model_copies(self.backend, self.args, path, runtime))
+            preload_model(self.backend)
+        except Exception as e:
+            print(f"Model sürümü seçilemedi, işçiler önceki modelle yenileniyor: {e}", flush=True)
+        print(f"Sunulacak model sürümü: {self.backend.MODEL_VERSION}", flush=True)
+        for pid, (slot, _) in list(self.workers.items()):
+            if self.stopping:
+                return
+            new_pid = self.spawn(slot, wait_for_model=True)
+            if not self.wait_ready(new_pid, self.args.ready_timeout):
+                print(f"Yeni işçi {new_pid} hazır olmadı; eski işçi {pid} çalışmaya devam ediyor", flush=True)
+                os.kill(new_pid, signal.SIGTERM)
+                continue
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def stop(self):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stopping', True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, 'stopping', True))
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, 'reload_requested', True))
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+        host, port = self.listener.getsockname()[:2]
+        print(f"Sunucu http://{host}:{port} adresinde {self.args.workers} işçiyle çalışıyor (ana işlem {os.getpid()})", flush=True)
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.rolling_restart()
+            self.reap()
+            time.sleep(0.2)
+        self.stop()
+        print("Sunucu durduruldu", flush=True)
+
+
+def copied_model_kind(backend, path, runtime):
+    """İşçiler arasında paylaşılamayan (her işçide ayrı yüklenen) model türü; paylaşılıyorsa None."""
+    from runtimes import StubRuntime, TFLiteRuntime, detect_runtime
+    if backend.ENSEMBLE_PATHS:
+        return 'ensemble'
+    if runtime in (None, '', 'auto'):
+        runtime = detect_runtime(path)
+    return None if runtime in (TFLiteRuntime.name, StubRuntime.name) else runtime
+
+
+def check_model_copies(backend, args, path, runtime):
+    """Her işçide ayrı yüklenen model, --allow-model-copies verilmedikçe tek işçiyle çalışır."""
+    kind = copied_model_kind(backend, path, runtime)
+    if kind and args.workers > 1 and not args.allow_model_copies:
+        raise ValueError(f"{kind} modeli her işçide ayrı yüklenir (bellekte {args.workers} kopya). Modeli "
+                         f"TFLite'a dışa aktarın (export_model.py) veya --allow-model-copies verin")
+
+
+def preload_model(backend):
+    """TFLite modelini ana işlemde belleğe okur; işçiler aynı sayfaları paylaşır."""
+    backend.model_runtime_options.pop('model_content', None)
+    kind = copied_model_kind(backend, backend.MODEL_PATH, backend.app.config['MODEL_RUNTIME'])
+    if kind:
+        print(f"{kind} modeli her işçide ayrı yüklenir; ağırlıkları paylaşmak için TFLite'a dışa aktarın "
+              f"(export_model.py)", flush=True)
+        return
+    if backend.app.config['MODEL_RUNTIME'] == 'stub':
+        return
+    with open(backend.MODEL_PATH, 'rb') as f:
+        backend.model_runtime_options['model_content'] = f.read()
+    size = len(backend.model_runtime_options['model_content']) / 1024 ** 2
+    print(f"TFLite modeli ana işlemde yüklendi ({size:.1f} MB), işçiler arasında paylaşılacak", flush=True)
+
+
+def main():
+    cpus = available_cpus()
+    parser = argparse.ArgumentParser(description='Çok işçili (prefork) üretim sunucusu')
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:5000'), help='host:port')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', len(cpus))))
+    parser.add_argument('--threads', type=int, default=None,
+                        help='İşçi başına TensorFlow intra-op thread sayısı (varsayılan: çekirdek / işçi)')
+    parser.add_argument('--inter-op-threads', type=int, default=1)
+    parser.add_argument('--no-pin', dest='pin', action='store_false', help='İşçileri çekirdeklere sabitleme')
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('MAX_REQUESTS', 0)),
+                        help='İşçi bu kadar istekten sonra yenilenir (0: sınırsız)')
+    parser.add_argument('--max-requests-jitter', type=int, default=0,
+                        help='İşçilerin aynı anda yenilenmemesi için sınıra eklenen rastgele pay')
+    parser.add_argument('--graceful-timeout', type=float, default=30.0,
+                        help='Durdurulan işçinin bekleyen istekleri bitirmesi için süre (sn)')
+    parser.add_argument('--ready-timeout', type=float, default=300.0,
+                        help='SIGHUP yenilemesinde yeni işçinin modelinin hazır olması için süre (sn)')
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--no-preload-tensorflow', dest='preload_tensorflow', action='store_false',
+                        help='TensorFlow ana işlemde içe aktarılmasın')
+    parser.add_argument('--access-log', action='store_true')
+    parser.add_argument('--allow-model-copies', action='store_true',
+                        help='Keras/SavedModel/topluluk modeli birden fazla işçide ayrı ayrı yüklensin')
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    if args.threads is None:
+        args.threads = max(1, len(cpus) // args.workers)
+
+    # Model işçilerde yüklenir; ana işlemde TensorFlow çalışma ortamı başlatılmamalıdır
+    autoload = os.environ.get('MODEL_AUTOLOAD', '1') != '0'
+    os.environ['MODEL_AUTOLOAD'] = '0'
+    import app as backend
+    # Asenkron işler ve POST /admin/model takası işçiye özeldir; birden fazla işçide reddedilir
+    backend.app.config['SERVE_WORKERS'] = args.workers
+    try:
+        check_model_copies(backend, args, backend.MODEL_PATH, backend.app.config['MODEL_RUNTIME'])
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.preload_tensorflow and backend.app.config['MODEL_RUNTIME'] != 'stub':
+        # Yalnızca içe aktarma; hiçbir TensorFlow işlemi çalıştırılmaz (fork güvenli kalır)
+        started = time.perf_counter()
+        import tensorflow  # noqa: F401
+        print(f"TensorFlow ana işlemde içe aktarıldı ({time.perf_counter() - started:.1f} sn)", flush=True)
+    preload_model(backend)
+    # Tablolar ve migration'lar işçiler aynı anda denemesin diye ana işlemde bir kez uygulanır
+    with backend.app.app_context():
+        backend.init_db()
+        backend.db.engine.dispose()
+
+    host, _, port = args.bind.rpartition(':')
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host.strip('[]') or '0.0.0.0', int(port)))
+    listener.listen(args.backlog)
+    Master(backend, listener, args, autoload).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import threading
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yalnızca işlem içinde geçerlidir
+    fcntl = None
+
+# PIL biçimi -> dosya uzantısı (uzantı içerikten belirlenir, böylece aynı içerik tek dosyadır)
+EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'BMP': '.bmp',
+    'GIF': '.gif',
+    'TIFF': '.tif',
+    'WEBP': '.webp',
+}
+
+# Depoya taşınmayı bekleyen geçici dosya
+StagedFile = namedtuple('StagedFile', ['tmp_path', 'digest', 'path'])
+
+
+class ContentStore:
+    """
+    Dosyaları içeriklerinin SHA-256 özetiyle saklayan depo.
+
+    Dosyalar `root/ab/cd/<özet><uzantı>` yoluna yazılır; aynı içerik ikinci kez yüklendiğinde
+    yeni dosya oluşturulmaz. Özet, tahmin önbelleğinin (content_hash) anahtarıyla aynıdır.
+    Dosyaların kaç kayıt tarafından kullanıldığını depo bilmez; silme kararı MRImage
+    satırlarına göre verilir. Yükleme (dosyayı depoya koyup kaydı commit etme) ile silme
+    (kullanan kayıt var mı kontrolü ve dosyayı silme) aynı depo kilidi altında yapılır; böylece
+    aynı içeriğin eşzamanlı yüklemesi, kaydı commit edilmeden önce dosyasını kaybetmez.
+
+    Args:
+        root (str): Deponun kök klasörü
+        chunk_size (int): Yazma sırasında okunacak parça boyutu
+    """
+
+    def __init__(self, root, chunk_size=1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.chunk_size = int(chunk_size)
+        os.makedirs(os.path.join(self.root, 'tmp'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._lock_path = os.path.join(self.root, '.lock')
+
+    def path_for(self, digest, extension=''):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + extension)
+
+    def contains(self, path):
+        """Yol deponun içinde mi (depo dışındaki dosyalar, ör. Dataset, asla silinmez)."""
+        return os.path.commonpath([self.root, os.path.abspath(path)]) == self.root
+
+    @contextmanager
+    def lock(self):
+        """
+        Depo kilidi: işlem içindeki thread'ler ve (fcntl varsa) aynı depoyu kullanan diğer
+        işlemler (serve.py işçileri) arasında geçerlidir.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def put_stream(self, stream, filename=''):
+        """
+        Akışı parça parça geçici dosyaya yazar ve özetini hesaplar (kilitsiz); ardından depo
+        kilidini alıp dosyayı depoya taşır. Dosyayı kullanacak kayıt `with` bloğu içinde commit
+        edilmelidir; blok bitene kadar aynı dosya `release` ile silinemez. Blok hata verirse ve
+        dosya bu çağrıyla oluşturulduysa kilit bırakılmadan silinir.
+
+        Yields:
+            tuple: (özet, dosya yolu, yeni dosya oluşturuldu mu)
+        """
+        with self.stage(stream, filename) as staged:
+            with self.publish(staged) as created:
+                yield staged.digest, staged.path, created
+
+    @contextmanager
+    def stage(self, stream, filename=''):
+        """
+        Akışı depo kilidi almadan geçici dosyaya yazar ve özetini hesaplar. Dosya depoya
+        `publish` ile taşınmadıysa blok sonunda silinir; bu arada geçici dosya okunabilir
+        (ör. tahmin için).
+
+        Yields:
+            StagedFile: Geçici dosya yolu, özet ve depodaki hedef yol
+        """
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(self.root, 'tmp', uuid.uuid4().hex + '.part')
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    f.write(chunk)
+            digest = hasher.hexdigest()
+            yield StagedFile(tmp_path, digest, self.path_for(digest, self._extension(tmp_path, filename)))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @contextmanager
+    def publish(self, staged):
+        """
+        Depo kilidini alıp geçici dosyayı depodaki yerine taşır (aynı içerik varsa taşımaz).
+        Kilit `with` bloğu bitene kadar tutulur; blok hata verirse ve dosya bu çağrıyla
+        oluşturulduysa kilit bırakılmadan silinir.
+
+        Yields:
+            bool: Yeni dosya oluşturuldu mu
+        """
+        with self.lock():
+            created = not os.path.exists(staged.path)
+            if created:
+                os.makedirs(os.path.dirname(staged.path), exist_ok=True)
+                os.replace(staged.tmp_path, staged.path)
+            try:
+                yield created
+            except BaseException:
+                # Kayıt commit edilemedi: bu yüklemenin oluşturduğu dosya sahipsiz kalmasın
+                if created:
+                    self.remove(staged.path)
+                raise
+
+    def _extension(self, path, filename):
+        try:
+            with Image.open(path) as image:
+                if image.format in EXTENSIONS:
+                    return EXTENSIONS[image.format]
+        except Exception:
+            pass
+        return os.path.splitext(filename)[1].lower()
+
+    def release(self, path, in_use):
+        """
+        Dosyayı kullanan kayıt kalmadıysa depo kilidi altında siler.
+
+        Args:
+            path (str): Depodaki dosya
+            in_use (callable): Dosyayı kullanan (commit edilmiş) kayıt var mı; kilit tutulurken çağrılır
+
+        Returns:
+            bool: Dosya silindi mi
+        """
+        with self.lock():
+            if in_use():
+                return False
+            return self.remove(path)
+
+    def remove(self, path):
+        """Depodaki dosyayı siler; depo dışındaki yollara dokunmaz (kullanımı kontrol etmez, bkz. `release`)."""
+        if not self.contains(path):
+            return False
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
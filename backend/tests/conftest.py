@@ -0,0 +1,24 @@
+"""
+Testlerin ortak ayarları: uygulama içe aktarılmadan önce ortam değişkenleri ayarlanır.
+
+Çalıştırma:
+    python -m pytest backend/tests
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Uygulama ayarları içe aktarılırken okunur; testler geçici klasörlerde, model yüklenmeden çalışır
+TMP_DIR = tempfile.mkdtemp(prefix='mri-test-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}",
+    'MRIMAGE_STORE_DIR': os.path.join(TMP_DIR, 'objects'),
+    'MRIMAGE_DERIVATIVE_DIR': os.path.join(TMP_DIR, 'derivatives'),
+    'MODEL_REGISTRY_DIR': os.path.join(TMP_DIR, 'model_registry'),
+    'MODEL_PATH': os.path.join(TMP_DIR, 'stub.keras'),
+    'MODEL_RUNTIME': 'stub',
+    'MODEL_AUTOLOAD': '0',
+})
@@ -0,0 +1,36 @@
+"""
+Yönetim endpoint'leri: ADMIN_TOKEN ayarlanmadıysa kapalıdır; işçiye özel özellikler çok işçide reddedilir.
+
+Çalıştırma:
+    python -m pytest backend/tests
+"""
+import io
+
+import app as backend
+
+
+def test_admin_closed_without_token(monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'ADMIN_TOKEN', None)
+    client = backend.app.test_client()
+    assert client.get('/admin/model').status_code == 403
+    assert client.post('/admin/model', json={'version': 'v1'}).status_code == 403
+
+
+def test_admin_requires_matching_token(monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'ADMIN_TOKEN', 'gizli')
+    client = backend.app.test_client()
+    assert client.get('/admin/model').status_code == 403
+    assert client.get('/admin/model', headers={'X-Admin-Token': 'yanlis'}).status_code == 403
+    assert client.get('/admin/model', headers={'X-Admin-Token': 'gizli'}).status_code == 200
+
+
+def test_per_worker_features_refused_with_multiple_workers(monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'ADMIN_TOKEN', 'gizli')
+    monkeypatch.setitem(backend.app.config, 'SERVE_WORKERS', 2)
+    monkeypatch.setattr(backend, 'model_unavailable', lambda: None)
+    client = backend.app.test_client()
+    response = client.post('/admin/model', json={'version': 'v1'}, headers={'X-Admin-Token': 'gizli'})
+    assert response.status_code == 409
+    response = client.post('/predict?async=1', data={'file': (io.BytesIO(b'x'), 'mr.png', 'image/png')})
+    assert response.status_code == 409
+    assert client.get('/admin/model', headers={'X-Admin-Token': 'gizli'}).status_code == 200
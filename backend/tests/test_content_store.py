@@ -0,0 +1,170 @@
+"""
+İçerik adresli MR deposu: eşzamanlı silme ve aynı içeriğin yüklenmesi.
+
+Çalıştırma:
+    python -m pytest backend/tests
+"""
+import io
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+import app as backend
+from storage import ContentStore
+
+
+def _png(value):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), (value, value, value)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+IMAGE_BYTES = _png(0)
+
+
+def _client():
+    client = backend.app.test_client()
+    client.get('/doctors')  # Veritabanı ilk istekte hazırlanır
+    return client
+
+
+def _patient(client, email):
+    response = client.post('/register/patient', json={
+        'first_name': 'Test', 'last_name': 'Hasta', 'email': email, 'password': 'x'})
+    return response.get_json()['id']
+
+
+def _upload(client, patient_id, data=IMAGE_BYTES):
+    response = client.post('/mrimages/upload', data={
+        'patient_id': str(patient_id), 'file': (io.BytesIO(data), 'mr.png')})
+    assert response.status_code == 200
+    return response.get_json()['id']
+
+
+def _file_path(mr_id):
+    with backend.app.app_context():
+        return backend.db.session.get(backend.MRImage, mr_id).file_path
+
+
+def test_release_waits_for_open_put(tmp_path):
+    store = ContentStore(str(tmp_path))
+    released = []
+    with store.put_stream(io.BytesIO(b'abc'), 'a.bin') as (_, path, created):
+        assert created
+        # Kaydı henüz commit edilmemiş dosyayı silmeye çalışan thread kilidi bekler
+        thread = threading.Thread(target=lambda: released.append(store.release(path, lambda: False)))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive() and os.path.exists(path)
+    thread.join()
+    assert released == [True] and not os.path.exists(path)
+
+
+def test_delete_keeps_file_of_concurrent_duplicate_upload(monkeypatch):
+    client = _client()
+    patient_id = _patient(client, 'race@example.com')
+    old_id = _upload(client, patient_id)
+    path = _file_path(old_id)
+
+    # Yükleme dosyayı depoya koyduktan sonra, kaydını commit etmeden önce silme isteği gelir
+    stored = threading.Event()
+    original_get = backend.prediction_cache.get
+
+    def slow_get(*args, **kwargs):
+        stored.set()
+        threading.Event().wait(0.3)
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(backend.prediction_cache, 'get', slow_get)
+    deleted = []
+
+    def delete_old():
+        stored.wait(5)
+        deleted.append(backend.app.test_client().delete(f'/mrimages/{old_id}').status_code)
+
+    thread = threading.Thread(target=delete_old)
+    thread.start()
+    new_id = _upload(client, patient_id)
+    thread.join()
+
+    assert deleted == [200]
+    assert _file_path(new_id) == path
+    assert os.path.exists(path)
+
+
+def test_delete_removes_unreferenced_file():
+    client = _client()
+    patient_id = _patient(client, 'delete@example.com')
+    mr_id = _upload(client, patient_id, _png(255))
+    path = _file_path(mr_id)
+    assert client.delete(f'/mrimages/{mr_id}').status_code == 200
+    assert not os.path.exists(path)
+
+
+def test_put_removes_new_file_when_commit_fails(tmp_path):
+    store = ContentStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with store.put_stream(io.BytesIO(b'orphan'), 'a.bin') as (_, path, created):
+            assert created and os.path.exists(path)
+            raise RuntimeError('commit başarısız')
+    assert not os.path.exists(path)
+
+    # Dosya önceden varsa (başka kayıt kullanıyor) silinmez
+    with store.put_stream(io.BytesIO(b'shared'), 'a.bin') as (_, path, _):
+        pass
+    with pytest.raises(RuntimeError):
+        with store.put_stream(io.BytesIO(b'shared'), 'a.bin') as (_, _, created):
+            assert not created
+            raise RuntimeError('commit başarısız')
+    assert os.path.exists(path)
+
+
+def _ingest(client, patient_id, data):
+    return client.post('/mrimages/ingest', data={
+        'patient_id': str(patient_id), 'file': (io.BytesIO(data), 'mr.png', 'image/png')})
+
+
+def test_ingest_writes_row_prediction_and_notification_in_one_commit(monkeypatch):
+    client = _client()
+    patient_id = _patient(client, 'ingest@example.com')
+    monkeypatch.setattr(backend, 'model_unavailable', lambda: None)
+    monkeypatch.setattr(backend, 'predict_probabilities',
+                        lambda source, digest=None, tta=1: ([0.1, 0.7, 0.1, 0.1], 'v-test'))
+    commits = []
+    original_commit = backend.db.session.commit
+
+    def counting_commit():
+        commits.append(1)
+        return original_commit()
+
+    monkeypatch.setattr(backend.db.session, 'commit', counting_commit)
+
+    response = _ingest(client, patient_id, _png(100))
+    assert response.status_code == 200
+    assert len(commits) == 1
+    mr_id = response.get_json()['id']
+    with backend.app.app_context():
+        mr = backend.db.session.get(backend.MRImage, mr_id)
+        assert mr.prediction == response.get_json()['predicted_class'] and mr.model_version == 'v-test'
+        assert backend.Notification.query.filter_by(patient_id=patient_id).count() == 1
+    assert os.path.exists(mr.file_path)
+
+
+def test_ingest_prediction_error_leaves_no_row_or_file(monkeypatch):
+    client = _client()
+    patient_id = _patient(client, 'ingest-error@example.com')
+    monkeypatch.setattr(backend, 'model_unavailable', lambda: None)
+
+    def failing_predict(source, digest=None, tta=1):
+        raise RuntimeError('model çöktü')
+
+    monkeypatch.setattr(backend, 'predict_probabilities', failing_predict)
+    data = _png(150)
+    response = _ingest(client, patient_id, data)
+    assert response.status_code == 500 and 'error' in response.get_json()
+    with backend.app.app_context():
+        assert backend.MRImage.query.filter_by(patient_id=patient_id).count() == 0
+    digest = backend.content_hash(data)
+    assert not os.path.exists(backend.content_store.path_for(digest, '.png'))
@@ -0,0 +1,86 @@
+"""
+Liste endpoint'lerinin veritabanı sorgu sayıları (N+1 regresyon kontrolü).
+
+Az ve çok kayıtlı iki hasta/doktor için her endpoint'in sorgu sayısı veri boyutundan bağımsız
+ve beklenen üst sınırın altında olmalıdır.
+
+Çalıştırma:
+    python -m pytest backend/tests
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import app as backend
+from app import Appointment, Doctor, MRImage, Notification, Patient, db
+
+# Endpoint -> izin verilen en fazla sorgu sayısı
+ENDPOINTS = {
+    '/doctors': 1,
+    '/appointments/patient/{patient_id}': 1,
+    '/appointments/doctor/{doctor_id}': 1,
+    '/patients/doctor/{doctor_id}': 1,
+    '/mrimages/patient/{patient_id}': 1,
+    '/notifications/patient/{patient_id}': 1,
+}
+
+
+def seed(appointments, patients):
+    """Yeni bir doktora ve ilk hastasına `appointments` adet randevu, MR ve bildirim ekler."""
+    tag = uuid.uuid4().hex[:8]
+    doctor = Doctor(first_name='Test', last_name='Doktor', email=f'doktor-{tag}@example.com', password='x')
+    other = Doctor(first_name='Diğer', last_name='Doktor', email=f'diger-{tag}@example.com', password='x')
+    db.session.add_all([doctor, other])
+    people = [Patient(first_name=f'Hasta{i}', last_name='Test', email=f'hasta{i}-{tag}@example.com', password='x')
+              for i in range(patients)]
+    db.session.add_all(people)
+    db.session.flush()
+    now = datetime.now()
+    rows = []
+    for i in range(appointments):
+        rows.append(Appointment(patient_id=people[i % patients].id, doctor_id=doctor.id, date=f'2025-{i % 12 + 1:02d}-01', status='Bekliyor'))
+        rows.append(Appointment(patient_id=people[0].id, doctor_id=(doctor.id, other.id)[i % 2], date='2025-01-01', status='Bekliyor'))
+        rows.append(MRImage(file_path=f'/tmp/mr_{tag}_{i}.jpg', patient_id=people[0].id, prediction='no_tumor', uploaded_at=now - timedelta(minutes=i)))
+        rows.append(Notification(patient_id=people[0].id, message=f'Bildirim {i}', created_at=now - timedelta(minutes=i)))
+    db.session.add_all(rows)
+    db.session.commit()
+    return {'patient_id': people[0].id, 'doctor_id': doctor.id}
+
+
+def count_queries(client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with backend.app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url)
+        # Yanıtlar akışlı olduğu için sorgular gövde okunurken çalışır
+        rows = len(response.get_json())
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(statements), rows
+
+
+@pytest.fixture(scope='module')
+def sizes():
+    client = backend.app.test_client()
+    client.get('/doctors')  # Tablolar ve migration'lar ilk istekte hazırlanır
+    with backend.app.app_context():
+        return client, seed(3, 3), seed(300, 50)
+
+
+@pytest.mark.parametrize('template', list(ENDPOINTS))
+def test_query_count_does_not_grow_with_rows(sizes, template):
+    client, small, large = sizes
+    small_queries, _ = count_queries(client, template.format(**small))
+    large_queries, rows = count_queries(client, template.format(**large))
+    assert rows > 0
+    assert large_queries == small_queries
+    assert large_queries <= ENDPOINTS[template]
@@ -0,0 +1,100 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Döndürme açıları ve parlaklık çarpanları eğitimdeki veri artırma aralıklarının içindedir
+# (data_pipeline.AUGMENTATION: ±45°, yatay/dikey çevirme, parlaklık 0.6-1.4)
+ROTATION_DEGREES = 15.0
+BRIGHTNESS_FACTORS = (0.85, 1.15)
+
+
+@lru_cache(maxsize=8)
+def _rotation_sampler(size, degrees):
+    """
+    Merkez etrafında döndürme için örnekleme indekslerini ve bilinear ağırlıkları bir kez hesaplar.
+    Görüntü dışına düşen pikseller en yakın kenar pikseliyle doldurulur (fill_mode='nearest').
+    """
+    theta = np.deg2rad(degrees)
+    center = (size - 1) / 2.0
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+    yy -= center
+    xx -= center
+    # data_pipeline.affine_transform ile aynı yön (çıktı -> girdi eşlemesi)
+    y = np.clip(np.cos(theta) * yy + np.sin(theta) * xx + center, 0, size - 1)
+    x = np.clip(-np.sin(theta) * yy + np.cos(theta) * xx + center, 0, size - 1)
+    y0 = np.floor(y).astype(np.intp)
+    x0 = np.floor(x).astype(np.intp)
+    y1 = np.minimum(y0 + 1, size - 1)
+    x1 = np.minimum(x0 + 1, size - 1)
+    wy = (y - y0).astype(np.float32)[..., np.newaxis]
+    wx = (x - x0).astype(np.float32)[..., np.newaxis]
+    return y0, x0, y1, x1, wy, wx
+
+
+def _rotate(image, out, degrees):
+    y0, x0, y1, x1, wy, wx = _rotation_sampler(image.shape[0], degrees)
+    top = image[y0, x0] * (1 - wx) + image[y0, x1] * wx
+    bottom = image[y1, x0] * (1 - wx) + image[y1, x1] * wx
+    out[...] = top * (1 - wy) + bottom * wy
+
+
+def _brightness(image, out, factor):
+    # Eğitimdeki gibi: uint8 değer aralığında kesmeli çarpım
+    np.multiply(image, factor, out=out)
+    np.clip(out, 0.0, 255.0, out=out)
+    np.floor(out, out=out)
+
+
+# (görünüm adı, fonksiyon); ilk K görünüm kullanılır, bu yüzden sıra önemlidir
+VIEWS = (
+    ('original', lambda image, out: np.copyto(out, image)),
+    ('hflip', lambda image, out: np.copyto(out, image[:, ::-1])),
+    ('vflip', lambda image, out: np.copyto(out, image[::-1])),
+    ('rotate+15', lambda image, out: _rotate(image, out, ROTATION_DEGREES)),
+    ('rotate-15', lambda image, out: _rotate(image, out, -ROTATION_DEGREES)),
+    ('darker', lambda image, out: _brightness(image, out, BRIGHTNESS_FACTORS[0])),
+    ('brighter', lambda image, out: _brightness(image, out, BRIGHTNESS_FACTORS[1])),
+    ('hvflip', lambda image, out: np.copyto(out, image[::-1, ::-1])),
+)
+MAX_VIEWS = len(VIEWS)
+
+
+def augment_views(image, views):
+    """
+    Tek bir görüntüden `views` adet artırılmış görünüm üretir.
+
+    Görünümler önceden ayrılmış tek bir diziye yazılır; döndürme örnekleme tabloları bir kez
+    hesaplanıp tekrar kullanılır. Sonuç tek ileri geçişte modele verilebilir.
+
+    Args:
+        image (np.ndarray): (size, size, 3) veya (1, size, size, 3) boyutlu float32 model girdisi
+        views (int): 1 ile MAX_VIEWS arasında görünüm sayısı
+
+    Returns:
+        np.ndarray: (views, size, size, 3) boyutlu float32 dizi
+    """
+    if not 1 <= views <= MAX_VIEWS:
+        raise ValueError(f"TTA görünüm sayısı 1 ile {MAX_VIEWS} arasında olmalı: {views}")
+    image = np.asarray(image, dtype=np.float32)
+    if image.ndim == 4:
+        image = image[0]
+    out = np.empty((views, *image.shape), dtype=np.float32)
+    for i in range(views):
+        VIEWS[i][1](image, out[i])
+    return out
+
+
+def predict_tta(predict_fn, image, views):
+    """
+    Görünümleri tek batch olarak tahmin eder ve olasılıkların ortalamasını döndürür.
+
+    Args:
+        predict_fn (callable): (N, ...) girdiyi alıp (N, sınıf sayısı) olasılık döndüren fonksiyon
+        image (np.ndarray): Ön işlenmiş görüntü
+        views (int): Görünüm sayısı
+
+    Returns:
+        np.ndarray: (sınıf sayısı,) boyutlu ortalama olasılık vektörü
+    """
+    probabilities = np.asarray(predict_fn(augment_views(image, views)), dtype=np.float32)
+    return probabilities.mean(axis=0)
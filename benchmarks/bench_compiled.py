@@ -0,0 +1,160 @@
+"""
+Derlenmiş çıkarım ve eğitim adımları benchmark'ı (CPU).
+
+Çıkarım (batch boyutu başına gecikme):
+    predict   -> model.predict (sunucunun önceki yolu; her çağrıda veri adaptörü kurulur)
+    eager     -> model(x, training=False)
+    function  -> runtimes.CompiledPredictor (sabit imzalı tf.function)
+    xla       -> runtimes.CompiledPredictor(jit_compile=True)
+
+Eğitim (train_on_batch ile saniyedeki adım sayısı):
+    eager     -> model.compile(run_eagerly=True)
+    function  -> model.compile() (Keras'ın varsayılan tf.function adımı)
+    xla       -> model.compile(jit_compile=True) (kod.py'de jit_compile = True)
+
+Model varsayılan olarak kod.py'deki mimariyle (EfficientNetB4 + başlık, rastgele ağırlıklar)
+kurulur; --model verilirse çıkarım ölçümleri o modelle yapılır. İlk çağrı (grafik oluşturma /
+XLA derlemesi) ayrıca raporlanır.
+
+Kullanım:
+    python benchmarks/bench_compiled.py --batch-sizes 1,8 --train-steps 10 --output compiled.json
+    python benchmarks/bench_compiled.py --model brain_tumor_model_fold10_20250601_065654.keras --skip-training
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from runtimes import CompiledPredictor  # noqa: E402
+
+INFERENCE_MODES = ('predict', 'eager', 'function', 'xla')
+TRAINING_MODES = ('eager', 'function', 'xla')
+
+
+def build_model(img_size, num_classes):
+    """kod.py'deki eğitim modeli (ImageNet ağırlıkları indirilmez)."""
+    import kod
+    from tensorflow.keras.applications import EfficientNetB4
+    kod.img_size = img_size
+    base = EfficientNetB4(weights=None, include_top=False, input_shape=(img_size, img_size, 3))
+    return kod.build_model(base.get_weights(), num_classes)
+
+
+def inference_fn(model, mode):
+    if mode == 'predict':
+        return lambda batch: model.predict(batch, verbose=0)
+    if mode == 'eager':
+        return lambda batch: np.asarray(model(batch, training=False))
+    return CompiledPredictor(model, jit_compile=(mode == 'xla'))
+
+
+def bench_inference(model, modes, batch_sizes, iterations, img_size):
+    results = []
+    rng = np.random.default_rng(0)
+    for mode in modes:
+        fn = inference_fn(model, mode)
+        for batch_size in batch_sizes:
+            batch = (rng.random((batch_size, img_size, img_size, 3)) * 255).astype(np.float32)
+            started = time.perf_counter()
+            fn(batch)
+            first_ms = (time.perf_counter() - started) * 1000
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                fn(batch)
+                latencies.append(time.perf_counter() - started)
+            latencies = np.asarray(latencies) * 1000
+            result = {
+                'mode': mode,
+                'batch_size': batch_size,
+                'first_call_ms': first_ms,
+                'p50_ms': float(np.percentile(latencies, 50)),
+                'p95_ms': float(np.percentile(latencies, 95)),
+                'images_per_sec': batch_size / float(np.median(latencies)) * 1000,
+            }
+            results.append(result)
+            print(f"çıkarım {mode:<9} batch={batch_size:<3} ilk çağrı={first_ms:>9.1f} ms  "
+                  f"p50={result['p50_ms']:>8.2f} ms  p95={result['p95_ms']:>8.2f} ms")
+    return results
+
+
+def bench_training(modes, steps, warmup_steps, batch_size, img_size, num_classes):
+    from tensorflow.keras.backend import clear_session
+    from tensorflow.keras.optimizers import Adam
+    rng = np.random.default_rng(0)
+    images = (rng.random((batch_size, img_size, img_size, 3)) * 255).astype(np.float32)
+    labels = np.eye(num_classes, dtype=np.float32)[rng.integers(num_classes, size=batch_size)]
+    results = []
+    for mode in modes:
+        clear_session()
+        model = build_model(img_size, num_classes)
+        model.compile(optimizer=Adam(learning_rate=0.0001), loss='categorical_crossentropy', metrics=['accuracy'],
+                      run_eagerly=(mode == 'eager'), jit_compile=(mode == 'xla'))
+        started = time.perf_counter()
+        model.train_on_batch(images, labels)
+        first_ms = (time.perf_counter() - started) * 1000
+        for _ in range(warmup_steps):
+            model.train_on_batch(images, labels)
+        started = time.perf_counter()
+        for _ in range(steps):
+            model.train_on_batch(images, labels)
+        elapsed = time.perf_counter() - started
+        result = {
+            'mode': mode,
+            'batch_size': batch_size,
+            'first_step_ms': first_ms,
+            'steps_per_sec': steps / elapsed,
+            'ms_per_step': elapsed / steps * 1000,
+        }
+        results.append(result)
+        print(f"eğitim  {mode:<9} ilk adım={first_ms:>9.1f} ms  {result['steps_per_sec']:.2f} adım/sn "
+              f"({result['ms_per_step']:.1f} ms/adım)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Eager / tf.function / XLA karşılaştırması')
+    parser.add_argument('--model', default=None, help='Çıkarım için .keras modeli (verilmezse kod.py mimarisi)')
+    parser.add_argument('--img-size', type=int, default=224)
+    parser.add_argument('--num-classes', type=int, default=4)
+    parser.add_argument('--batch-sizes', default='1,8', help='Çıkarım batch boyutları')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--inference-modes', default=','.join(INFERENCE_MODES))
+    parser.add_argument('--training-modes', default=','.join(TRAINING_MODES))
+    parser.add_argument('--train-batch-size', type=int, default=16)
+    parser.add_argument('--train-steps', type=int, default=10)
+    parser.add_argument('--warmup-steps', type=int, default=2)
+    parser.add_argument('--skip-training', action='store_true')
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    if args.model:
+        model = tf.keras.models.load_model(args.model, compile=False)
+        img_size = model.input_shape[1]
+    else:
+        model = build_model(args.img_size, args.num_classes)
+        img_size = args.img_size
+    report = {
+        'tensorflow': tf.__version__,
+        'cpus': os.cpu_count(),
+        'model': args.model or f'EfficientNetB4 ({img_size}x{img_size}, kod.py başlığı)',
+        'inference': bench_inference(model, args.inference_modes.split(','),
+                                     [int(b) for b in args.batch_sizes.split(',')], args.iterations, img_size),
+    }
+    if not args.skip_training:
+        report['training'] = bench_training(args.training_modes.split(','), args.train_steps, args.warmup_steps,
+                                            args.train_batch_size, args.img_size, args.num_classes)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Girdi hattı benchmark'ı: eski ImageDataGenerator.flow_from_directory ile data_pipeline.make_dataset
+(ilk epoch: çözme + önbelleğe yazma, sonraki epoch: önbellekten okuma) saniyedeki adım sayısı.
+
+Kullanım:
+    python benchmarks/bench_input_pipeline.py --steps 50 --batch-size 16
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from data_pipeline import make_dataset  # noqa: E402
+from preprocessing import list_images  # noqa: E402
+
+
+def legacy_generator(train_dir, img_size, batch_size):
+    # kod.py'deki eski veri artırma ayarları
+    from tensorflow.keras.applications.efficientnet import preprocess_input
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+    datagen = ImageDataGenerator(
+        preprocessing_function=preprocess_input,
+        rotation_range=45,
+        width_shift_range=0.2,
+        height_shift_range=0.2,
+        shear_range=0.2,
+        zoom_range=0.2,
+        horizontal_flip=True,
+        vertical_flip=True,
+        fill_mode='nearest',
+        brightness_range=[0.6, 1.4],
+        channel_shift_range=50.0,
+        validation_split=0.1
+    )
+    return datagen.flow_from_directory(
+        train_dir,
+        target_size=(img_size, img_size),
+        batch_size=batch_size,
+        class_mode='categorical',
+        subset='training',
+        shuffle=True
+    )
+
+
+def measure(name, iterator, steps):
+    next(iterator)  # ısınma
+    started = time.perf_counter()
+    for _ in range(steps):
+        next(iterator)
+    elapsed = time.perf_counter() - started
+    result = {'name': name, 'steps': steps, 'seconds': elapsed, 'steps_per_second': steps / elapsed}
+    print(f"{name:<36} {result['steps_per_second']:>8.2f} adım/sn")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Eğitim girdi hattı hız karşılaştırması')
+    parser.add_argument('--train-dir', default=os.path.join(BASE_DIR, 'Dataset', 'Train'))
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--img-size', type=int, default=224)
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    paths, labels, class_names = list_images(args.train_dir)
+    results = [measure('ImageDataGenerator', iter(legacy_generator(args.train_dir, args.img_size, args.batch_size)), args.steps)]
+
+    # Önbellek bir epoch tamamlandığında dolar; ilk epoch'u bitirip ikinci epoch'u ölç
+    ds = make_dataset(paths, labels, len(class_names), args.batch_size, training=True, cache='')
+    epoch = iter(ds)
+    results.append(measure('tf.data (ilk epoch, çözme)', epoch, args.steps))
+    for _ in epoch:
+        pass
+    results.append(measure('tf.data (önbellekten)', iter(ds), args.steps))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Ön işleme mikro benchmark'ı: eski app.py / kod.py yolları ile backend/preprocessing.py karşılaştırması.
+
+Yeni ön işlemenin çıktısı eski kod.py yolu (load_img, eğitimde kullanılan en yakın komşu
+yeniden boyutlandırma) ile piksel piksel karşılaştırılır. --model verilirse aynı checkpoint'in
+--data-dir doğruluğu iki ön işlemeyle ayrı ayrı hesaplanır.
+
+Kullanım:
+    python benchmarks/bench_preprocessing.py --limit 256 --batch-size 32
+    python benchmarks/bench_preprocessing.py --limit 0 --model brain_tumor_model_fold10_20250601_065654.keras
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from preprocessing import BatchBuffer, list_images, preprocess_batch, preprocess_image  # noqa: E402
+
+
+def legacy_app(image_bytes):
+    # backend/app.py içindeki eski preprocess_image
+    from tensorflow.keras.applications.efficientnet import preprocess_input
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    image = image.resize((224, 224))
+    img_array = np.array(image)
+    img_array = np.expand_dims(img_array, axis=0)
+    return preprocess_input(img_array)
+
+
+def legacy_kod(path):
+    # kod.py içindeki eski predict_tumor_type ön işlemesi
+    from tensorflow.keras.applications.efficientnet import preprocess_input
+    from tensorflow.keras.preprocessing.image import img_to_array, load_img
+    img = load_img(path, target_size=(224, 224))
+    img_array = img_to_array(img)
+    img_array = np.expand_dims(img_array, axis=0)
+    return preprocess_input(img_array)
+
+
+def compare_accuracy(model_path, paths, labels, batch_size):
+    """Aynı modelin eski (load_img) ve yeni ön işlemeyle doğruluğu ve farklı tahmin sayısı."""
+    from tensorflow.keras.models import load_model
+    model = load_model(model_path, compile=False)
+    predictions = {}
+    for name, prepare in (('eski kod.py load_img', lambda chunk: np.concatenate([legacy_kod(p) for p in chunk])),
+                          ('preprocess_batch', lambda chunk: preprocess_batch(chunk))):
+        outputs = [model.predict(prepare(paths[start:start + batch_size]), verbose=0)
+                   for start in range(0, len(paths), batch_size)]
+        predictions[name] = np.argmax(np.concatenate(outputs), axis=1)
+    result = {name: float(np.mean(pred == labels)) for name, pred in predictions.items()}
+    result['different_predictions'] = int(np.sum(predictions['eski kod.py load_img'] != predictions['preprocess_batch']))
+    for name, pred in predictions.items():
+        print(f"{name:<32} doğruluk {result[name]:.4f}")
+    print(f"Farklı tahmin: {result['different_predictions']}/{len(paths)}")
+    return result
+
+
+def measure(name, fn, count, repeats):
+    fn()  # ısınma
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    result = {'name': name, 'images': count, 'seconds': best, 'images_per_second': count / best}
+    print(f"{name:<32} {result['images_per_second']:>10.1f} görüntü/sn")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ön işleme hız karşılaştırması')
+    parser.add_argument('--data-dir', default=os.path.join(BASE_DIR, 'Dataset', 'Test'))
+    parser.add_argument('--limit', type=int, default=256, help='Kullanılacak görüntü sayısı (0 ise tümü)')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--model', default=None, help='Doğruluk karşılaştırması için .keras checkpoint')
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    paths, labels, _ = list_images(args.data_dir)
+    if args.limit:
+        paths, labels = paths[:args.limit], labels[:args.limit]
+    blobs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+    n = len(paths)
+    buffer = BatchBuffer(args.batch_size)
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+
+    def batched(pool):
+        for start in range(0, n, args.batch_size):
+            preprocess_batch(blobs[start:start + args.batch_size], buffer, executor=pool)
+
+    # Eğitim ve sunucu yolu aynı çıktıyı vermeli
+    for blob in blobs[:16]:
+        single = preprocess_image(blob)
+        batch = preprocess_batch([blob], BatchBuffer(1))
+        assert np.array_equal(single, batch), 'Tekli ve batch ön işleme farklı sonuç verdi'
+    # Checkpoint'ler eski kod.py ön işlemesiyle eğitildi; model girdisi değişmemeli
+    mismatches = sum(not np.array_equal(preprocess_image(blob), legacy_kod(path)) for blob, path in zip(blobs, paths))
+    print(f"Eski kod.py load_img çıktısından farklı görüntü: {mismatches}/{n}")
+
+    results = [
+        measure('eski app.py preprocess_image', lambda: [legacy_app(b) for b in blobs], n, args.repeats),
+        measure('eski kod.py load_img', lambda: [legacy_kod(p) for p in paths], n, args.repeats),
+        measure('preprocess_image', lambda: [preprocess_image(b) for b in blobs], n, args.repeats),
+        measure('preprocess_batch (tek thread)', lambda: batched(None), n, args.repeats),
+        measure(f'preprocess_batch ({args.workers} thread)', lambda: batched(executor), n, args.repeats),
+    ]
+    report = {'legacy_kod_mismatches': mismatches, 'throughput': results}
+    if args.model:
+        report['accuracy'] = compare_accuracy(args.model, paths, labels, args.batch_size)
+    executor.shutdown()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Fold modellerinden oluşan topluluğun (ensemble) Dataset/Test değerlendirmesi.
+
+1. Her fold modeli sırayla yüklenir, test setinin olasılıkları ve tek görüntülük gecikmesi
+   ölçülür, ardından model bellekten çıkarılır (aynı anda tek model bellekte tutulur).
+2. Modeller tek başlarına doğruluğa göre sıralanır; en iyi k modelin (k = 1..M) olasılık
+   ortalamasının doğruluğu saklanan olasılıklardan hesaplanır (modeller yeniden çalıştırılmaz).
+3. --measure-latency verilirse tüm modeller bir kez yüklenir ve her k için sunucudaki
+   EnsembleRuntime (aynı üyeleri paylaşan alt topluluk) ile gerçek gecikme ölçülür.
+
+Çıktı JSON'u ENSEMBLE_REPORT ile sunucuya verilirse GET /predict/ensemble yanıtında görünür.
+
+Kullanım:
+    python benchmarks/eval_ensemble.py --models "brain_tumor_model_fold*.keras" --measure-latency --output ensemble_report.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from preprocessing import load_directory  # noqa: E402
+from runtimes import EnsembleRuntime, load_runtime, resolve_model_paths  # noqa: E402
+
+
+def predict_all(predict_fn, images, batch_size):
+    outputs = [np.asarray(predict_fn(images[start:start + batch_size].astype(np.float32)))
+               for start in range(0, len(images), batch_size)]
+    return np.concatenate(outputs)
+
+
+def single_image_latency(predict_fn, images, samples):
+    """Sunucudaki gibi tek görüntülük tahminlerin gecikmesi (ms)."""
+    predict_fn(images[:1].astype(np.float32))  # ısınma
+    latencies = []
+    for i in range(min(samples, len(images))):
+        batch = images[i:i + 1].astype(np.float32)
+        started = time.perf_counter()
+        predict_fn(batch)
+        latencies.append(time.perf_counter() - started)
+    latencies = np.asarray(latencies) * 1000
+    return {'p50_ms': float(np.percentile(latencies, 50)), 'p95_ms': float(np.percentile(latencies, 95))}
+
+
+def release_model():
+    gc.collect()
+    try:
+        from tensorflow.keras.backend import clear_session
+        clear_session()
+    except ImportError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Model topluluğu doğruluk / gecikme karşılaştırması')
+    parser.add_argument('--models', default='brain_tumor_model_fold*.keras',
+                        help='Virgülle ayrılmış model yolları veya glob deseni (proje klasörüne göre)')
+    parser.add_argument('--runtime', default='auto')
+    parser.add_argument('--data-dir', default=os.path.join(BASE_DIR, 'Dataset', 'Test'))
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--latency-samples', type=int, default=50)
+    parser.add_argument('--measure-latency', action='store_true',
+                        help='Her k için topluluk gecikmesini ölç (tüm modeller aynı anda belleğe alınır)')
+    parser.add_argument('--no-merge', action='store_true', help='Keras modellerini tek grafikte birleştirme')
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    paths = resolve_model_paths(args.models, BASE_DIR)
+    images, labels, class_names, _ = load_directory(args.data_dir)
+    if args.limit and args.limit < len(labels):
+        keep = np.sort(np.random.default_rng(0).choice(len(labels), args.limit, replace=False))
+        images, labels = images[keep], labels[keep]
+    print(f"{len(paths)} model, {len(labels)} görüntü")
+
+    members, probabilities = [], []
+    for path in paths:
+        runtime = load_runtime(path, args.runtime)
+        probs = predict_all(runtime.predict, images, args.batch_size)
+        member = {
+            'path': path,
+            'runtime': runtime.name,
+            'accuracy': float((probs.argmax(axis=1) == labels).mean()),
+            **single_image_latency(runtime.predict, images, args.latency_samples),
+        }
+        members.append(member)
+        probabilities.append(probs)
+        print(f"{os.path.basename(path):<50} doğruluk={member['accuracy']:.4f} p50={member['p50_ms']:>7.1f} ms")
+        del runtime
+        release_model()
+
+    # En iyi k model (tek başına doğruluğa göre)
+    order = sorted(range(len(paths)), key=lambda i: -members[i]['accuracy'])
+    probabilities = np.stack(probabilities)
+    ensembles = []
+    for k in range(1, len(paths) + 1):
+        chosen = order[:k]
+        averaged = probabilities[chosen].mean(axis=0)
+        ensembles.append({
+            'k': k,
+            'models': [paths[i] for i in chosen],
+            'accuracy': float((averaged.argmax(axis=1) == labels).mean()),
+            # Birleştirilmemiş topluluğun gecikme tahmini: üyelerin toplamı
+            'estimated_p50_ms': float(sum(members[i]['p50_ms'] for i in chosen)),
+        })
+
+    if args.measure_latency:
+        full = EnsembleRuntime(paths, args.runtime, merge=not args.no_merge).load()
+        for ensemble in ensembles:
+            subset = full.subset(order[:ensemble['k']])
+            ensemble.update(single_image_latency(subset.predict, images, args.latency_samples))
+            ensemble['merged'] = subset.stats()['merged']
+
+    for e in ensembles:
+        latency = f"p50={e['p50_ms']:>7.1f} ms" if 'p50_ms' in e else f"tahmini p50={e['estimated_p50_ms']:>7.1f} ms"
+        print(f"en iyi {e['k']:>2} model: doğruluk={e['accuracy']:.4f} {latency}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'images': int(len(labels)), 'class_names': class_names,
+                       'members': members, 'ensembles': ensembles}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
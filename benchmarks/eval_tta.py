@@ -0,0 +1,97 @@
+"""
+Test zamanı veri artırma (TTA) değerlendirmesi: her K görünüm sayısı için Dataset/Test
+üzerindeki doğruluk ile görüntü başına gecikme (görünümlerin üretimi + tek ileri geçiş).
+
+Sunucudaki /predict?tta=K ile aynı kod yolu (backend/tta.py) ve aynı model çalışma ortamı
+kullanılır; görüntüler sunucudaki gibi tek tek tahmin edilir.
+
+Kullanım:
+    python benchmarks/eval_tta.py --model brain_tumor_model.keras --views 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from preprocessing import load_directory  # noqa: E402
+from runtimes import load_runtime  # noqa: E402
+from tta import MAX_VIEWS, VIEWS, predict_tta  # noqa: E402
+
+DEFAULT_MODEL = os.path.join(BASE_DIR, 'brain_tumor_model_fold10_20250601_065654.keras')
+
+
+def evaluate(runtime, images, labels, views):
+    """
+    Görüntüleri tek tek K görünümle tahmin eder.
+
+    Returns:
+        dict: Doğruluk, sınıf bazında doğruluk ve gecikme yüzdelikleri
+    """
+    # Isınma (ilk çağrıdaki grafik oluşturma süresi ölçüme girmesin)
+    predict_tta(runtime.predict, images[0], views)
+    latencies = np.empty(len(images))
+    predicted = np.empty(len(images), dtype=np.int64)
+    for i in range(len(images)):
+        started = time.perf_counter()
+        probabilities = predict_tta(runtime.predict, images[i].astype(np.float32), views)
+        latencies[i] = time.perf_counter() - started
+        predicted[i] = int(np.argmax(probabilities))
+    correct = predicted == labels
+    return {
+        'views': views,
+        'view_names': [name for name, _ in VIEWS[:views]],
+        'accuracy': float(correct.mean()),
+        'per_class_accuracy': [float(correct[labels == c].mean()) for c in np.unique(labels)],
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'mean_ms': float(latencies.mean() * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TTA doğruluk / gecikme karşılaştırması')
+    parser.add_argument('--model', default=os.environ.get('MODEL_PATH') or DEFAULT_MODEL)
+    parser.add_argument('--runtime', default='auto', help='keras, savedmodel, tflite veya auto')
+    parser.add_argument('--data-dir', default=os.path.join(BASE_DIR, 'Dataset', 'Test'))
+    parser.add_argument('--views', type=int, nargs='*', default=[1, 2, 4, MAX_VIEWS])
+    parser.add_argument('--limit', type=int, default=None, help='Değerlendirilecek en fazla görüntü (sınıflar karışık seçilir)')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Verilirse p95 gecikmesi bu sınırın altındaki en iyi K önerilir')
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    images, labels, class_names, _ = load_directory(args.data_dir)
+    if args.limit and args.limit < len(labels):
+        # Tüm sınıflardan örnek alınsın diye sabit tohumlu rastgele alt küme
+        keep = np.sort(np.random.default_rng(0).choice(len(labels), args.limit, replace=False))
+        images, labels = images[keep], labels[keep]
+    runtime = load_runtime(args.model, args.runtime)
+    print(f"Model: {args.model} ({runtime.name}), {len(labels)} görüntü, sınıflar: {', '.join(class_names)}")
+
+    results = []
+    for views in args.views:
+        result = evaluate(runtime, images, labels, views)
+        results.append(result)
+        print(f"K={views:<2} doğruluk={result['accuracy']:.4f} p50={result['p50_ms']:>7.1f} ms "
+              f"p95={result['p95_ms']:>7.1f} ms")
+
+    if args.budget_ms is not None:
+        fitting = [r for r in results if r['p95_ms'] <= args.budget_ms]
+        if fitting:
+            best = max(fitting, key=lambda r: (r['accuracy'], -r['views']))
+            print(f"{args.budget_ms:.0f} ms sınırına uyan en iyi seçim: K={best['views']} (doğruluk {best['accuracy']:.4f})")
+        else:
+            print(f"Hiçbir K değeri {args.budget_ms:.0f} ms sınırına uymuyor")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'model': args.model, 'runtime': runtime.name, 'images': int(len(labels)),
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
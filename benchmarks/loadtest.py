@@ -0,0 +1,427 @@
+"""
+Flask API yük testi.
+
+1. Geçici bir klasörde SQLite veritabanı oluşturulur ve istenen ölçekte sentetik hasta, doktor,
+   randevu, bildirim ve MR görüntüsü kayıtlarıyla doldurulur.
+2. backend/app.py bu veritabanıyla ayrı bir işlemde başlatılır (--stub ile gerçek model yerine
+   sahte model kullanılır) ve model hazır olana kadar beklenir.
+3. Her senaryo için `--concurrency` istemci thread'i `--duration` saniye boyunca kapalı döngüde
+   istek gönderir: /predict (Dataset/Test görüntüleriyle), randevu ve bildirim listeleri,
+   MR yüklemeleri ve bunların karışımı (mixed).
+4. Senaryo başına p50/p95/p99 gecikme, throughput, hata sayıları ve sunucunun (alt işlemleri
+   dahil) bellek kullanımı (RSS ve paylaşılan sayfaları bir kez sayan PSS) JSON olarak yazılır.
+   --baseline verilirse önceki çıktıyla karşılaştırılır.
+
+Yük üreteci sunucuyla aynı makinede çalışır; sonuçlar yalnızca aynı makinede alınmış
+çıktılarla karşılaştırılmalıdır.
+
+Kullanım:
+    python benchmarks/loadtest.py --stub --output baseline.json
+    python benchmarks/loadtest.py --stub --baseline baseline.json --server-env BATCH_MAX_SIZE=32
+    python benchmarks/loadtest.py --server-command "{python} serve.py --bind {host}:{port} --workers 4 --allow-model-copies"
+"""
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(BASE_DIR, 'backend')
+
+SCENARIOS = ('predict', 'appointments', 'notifications', 'upload', 'mixed')
+# mixed senaryosunda istek türlerinin ağırlıkları
+MIX = {'predict': 0.2, 'appointments': 0.35, 'notifications': 0.35, 'upload': 0.1}
+CLASS_NAMES = ["glioma_tumor", "meningioma_tumor", "no_tumor", "pituitary_tumor"]
+SERVER_COMMAND = '{python} -c "import sys, app; app.app.run(host=sys.argv[1], port=int(sys.argv[2]), threaded=True)" {host} {port}'
+
+
+def list_images(data_dir, limit, seed):
+    paths = sorted(os.path.join(root, name) for root, _, names in os.walk(data_dir)
+                   for name in names if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+    if not paths:
+        raise SystemExit(f"Görüntü bulunamadı: {data_dir}")
+    if limit and limit < len(paths):
+        keep = np.random.default_rng(seed).choice(len(paths), limit, replace=False)
+        paths = [paths[i] for i in sorted(keep)]
+    return paths
+
+
+def _seed(env, args, images):
+    """Sentetik kayıtları ayrı bir işlemde yazar (sunucu ile aynı şema ve migration'lar)."""
+    os.environ.update(env)
+    os.environ['MODEL_AUTOLOAD'] = '0'
+    sys.path.insert(0, BACKEND_DIR)
+    import app as backend
+    from migrations import apply_migrations
+    from werkzeug.security import generate_password_hash
+
+    rng = np.random.default_rng(args.seed)
+    password = generate_password_hash('1234')
+    started = datetime(2025, 1, 1)
+    with backend.app.app_context():
+        backend.db.create_all()
+        apply_migrations(backend.db)
+        session = backend.db.session
+        doctors = [backend.Doctor(first_name=f'Doktor{i}', last_name='Test', title='Dr.', email=f'doktor{i}@example.com',
+                                  specialty='Radyoloji', password=password) for i in range(args.doctors)]
+        patients = [backend.Patient(first_name=f'Hasta{i}', last_name='Test', gender='Kadın' if i % 2 else 'Erkek',
+                                    email=f'hasta{i}@example.com', city='İstanbul', password=password)
+                    for i in range(args.patients)]
+        session.add_all(doctors + patients)
+        session.flush()
+        rows = []
+        for patient in patients:
+            for j in range(args.appointments):
+                rows.append(backend.Appointment(patient_id=patient.id, doctor_id=doctors[int(rng.integers(len(doctors)))].id,
+                                                date=(started + timedelta(days=int(rng.integers(365)))).strftime('%Y-%m-%d'),
+                                                status='Onaylandı' if j % 2 else 'Bekliyor'))
+            for j in range(args.notifications):
+                rows.append(backend.Notification(patient_id=patient.id, message=f'Bildirim {j}', is_read=bool(j % 3),
+                                                 created_at=started + timedelta(minutes=int(rng.integers(500000)))))
+            for j in range(args.mrimages):
+                rows.append(backend.MRImage(file_path=images[int(rng.integers(len(images)))], patient_id=patient.id,
+                                            prediction=CLASS_NAMES[int(rng.integers(len(CLASS_NAMES)))],
+                                            uploaded_at=started + timedelta(days=int(rng.integers(365)))))
+        session.add_all(rows)
+        session.commit()
+
+
+def _multipart(fields, file_field, filename, content, mimetype='image/jpeg'):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f'Content-Type: {mimetype}\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+class Traffic:
+    """Senaryo adına göre rastgele (tohumlu) istek üretir: (yöntem, yol, gövde, başlıklar)."""
+
+    def __init__(self, args, images):
+        self.patients = args.patients
+        self.doctors = args.doctors
+        self.images = [(os.path.basename(path), open(path, 'rb').read()) for path in images]
+
+    def request(self, scenario, rng):
+        if scenario == 'mixed':
+            scenario = rng.choice(list(MIX), p=list(MIX.values()))
+        if scenario == 'predict':
+            name, content = self.images[int(rng.integers(len(self.images)))]
+            body, headers = _multipart({}, 'file', name, content)
+            return 'predict', 'POST', '/predict', body, headers
+        if scenario == 'appointments':
+            if rng.random() < 0.5:
+                return scenario, 'GET', f'/appointments/patient/{int(rng.integers(self.patients)) + 1}', None, {}
+            return scenario, 'GET', f'/appointments/doctor/{int(rng.integers(self.doctors)) + 1}', None, {}
+        if scenario == 'notifications':
+            return scenario, 'GET', f'/notifications/patient/{int(rng.integers(self.patients)) + 1}', None, {}
+        if scenario == 'upload':
+            name, content = self.images[int(rng.integers(len(self.images)))]
+            body, headers = _multipart({'patient_id': int(rng.integers(self.patients)) + 1}, 'file', name, content)
+            return scenario, 'POST', '/mrimages/upload', body, headers
+        raise ValueError(f"Bilinmeyen senaryo: {scenario}")
+
+
+def _process_tree(pid):
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def _sum_field(pids, filename, field):
+    total = 0
+    for current in pids:
+        try:
+            with open(f'/proc/{current}/{filename}') as f:
+                for line in f:
+                    if line.startswith(field):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return total / 1024.0
+
+
+def process_tree_rss_mb(pid):
+    """İşlemin ve alt işlemlerinin (ör. prefork işçileri) toplam RSS'i (MB); /proc gerektirir."""
+    return _sum_field(_process_tree(pid), 'status', 'VmRSS:')
+
+
+def process_tree_pss_mb(pid):
+    """
+    Toplam PSS (MB): işlemler arasında paylaşılan sayfalar paylaşan işlem sayısına bölünür.
+    Çok işçili sunucuda RSS toplamı paylaşılan ağırlıkları her işçi için tekrar sayar, PSS saymaz.
+    """
+    return _sum_field(_process_tree(pid), 'smaps_rollup', 'Pss:')
+
+
+class RssSampler:
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss_mb(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_scenario(host, port, traffic, scenario, concurrency, duration, warmup, seed):
+    """
+    Senaryoyu kapalı döngüde çalıştırır; ısınma süresindeki istekler ölçüme katılmaz.
+
+    Returns:
+        dict: İstek türüne göre (gecikme, durum kodu) listeleri ve ölçüm süresi
+    """
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+    results = []
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = np.random.default_rng([seed, index])
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        local = []
+        while True:
+            kind, method, path, body, headers = traffic.request(scenario, rng)
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status = 0
+            if started >= measure_from:
+                local.append((kind, time.perf_counter() - started, status))
+        conn.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, duration
+
+
+def summarize(results, duration):
+    latencies = np.asarray([r[1] for r in results]) * 1000
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary = {
+        'requests': len(results),
+        'errors': sum(1 for r in results if r[2] == 0 or r[2] >= 500),
+        'status_counts': statuses,
+        'throughput_rps': len(results) / duration,
+    }
+    if len(latencies):
+        summary.update({
+            'mean_ms': float(latencies.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+        })
+    return summary
+
+
+def wait_ready(host, port, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request('GET', '/ready')
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Sunucu {timeout} saniyede hazır olmadı")
+
+
+def free_port(host):
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def compare(report, baseline):
+    print("\nÖnceki çıktıyla karşılaştırma (p95 ve throughput değişimi):")
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or 'p95_ms' not in current or 'p95_ms' not in previous:
+            continue
+        p95 = (current['p95_ms'] / previous['p95_ms'] - 1) * 100
+        rps = (current['throughput_rps'] / previous['throughput_rps'] - 1) * 100 if previous['throughput_rps'] else 0.0
+        print(f"{name:<14} p95 {previous['p95_ms']:>8.1f} -> {current['p95_ms']:>8.1f} ms ({p95:+.1f}%)  "
+              f"throughput {previous['throughput_rps']:>7.1f} -> {current['throughput_rps']:>7.1f} istek/sn ({rps:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flask API yük testi')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Virgülle ayrılmış: {', '.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='Senaryo başına ölçüm süresi (sn)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Ölçüme katılmayan ısınma süresi (sn)')
+    parser.add_argument('--patients', type=int, default=500)
+    parser.add_argument('--doctors', type=int, default=20)
+    parser.add_argument('--appointments', type=int, default=5, help='Hasta başına randevu')
+    parser.add_argument('--notifications', type=int, default=20, help='Hasta başına bildirim')
+    parser.add_argument('--mrimages', type=int, default=3, help='Hasta başına MR görüntüsü')
+    parser.add_argument('--data-dir', default=os.path.join(BASE_DIR, 'Dataset', 'Test'))
+    parser.add_argument('--images', type=int, default=100, help='Kullanılacak test görüntüsü sayısı')
+    parser.add_argument('--stub', action='store_true', help='Gerçek model yerine sahte model (MODEL_RUNTIME=stub)')
+    parser.add_argument('--stub-latency-ms', type=float, default=20.0, help='Sahte modelin batch başına süresi')
+    parser.add_argument('--stub-row-latency-ms', type=float, default=2.0, help='Sahte modelin görüntü başına süresi')
+    parser.add_argument('--model-path', default=None, help='MODEL_PATH (verilmezse sunucu varsayılanı)')
+    parser.add_argument('--prediction-cache', action='store_true',
+                        help='Tahmin önbelleğini açık bırak (varsayılan kapalı; aynı görüntüler tekrar gönderilir)')
+    parser.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Sunucuya verilecek ek ortam değişkeni (tekrarlanabilir)')
+    parser.add_argument('--server-command', default=SERVER_COMMAND,
+                        help='Sunucu başlatma komutu; {python}, {host}, {port} yer tutucuları doldurulur')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--ready-timeout', type=float, default=300.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep-dir', action='store_true', help='Geçici klasörü (veritabanı, sunucu günlüğü) silme')
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    parser.add_argument('--baseline', default=None, help='Karşılaştırılacak önceki JSON çıktısı')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise SystemExit(f"Bilinmeyen senaryo: {name}")
+    images = list_images(args.data_dir, args.images, args.seed)
+    work_dir = tempfile.mkdtemp(prefix='mri_loadtest_')
+    env = {
+        'DATABASE_URL': 'sqlite:///' + os.path.join(work_dir, 'loadtest.db'),
+        'MRIMAGE_STORE_DIR': os.path.join(work_dir, 'objects'),
+        'MRIMAGE_DERIVATIVE_DIR': os.path.join(work_dir, 'derivatives'),
+        'MODEL_REGISTRY_DIR': os.path.join(work_dir, 'model_registry'),
+        'PREDICTION_CACHE_DIR': '',
+    }
+    if not args.prediction_cache:
+        env['PREDICTION_CACHE_SIZE'] = '0'
+    if args.stub:
+        env.update({'MODEL_RUNTIME': 'stub', 'STUB_MODEL_LATENCY_MS': str(args.stub_latency_ms),
+                    'STUB_MODEL_ROW_LATENCY_MS': str(args.stub_row_latency_ms)})
+    if args.model_path:
+        env['MODEL_PATH'] = os.path.abspath(args.model_path)
+    for item in args.server_env:
+        key, _, value = item.partition('=')
+        env[key] = value
+
+    server = None
+    try:
+        started = time.perf_counter()
+        seeder = mp.Process(target=_seed, args=(env, args, images))
+        seeder.start()
+        seeder.join()
+        if seeder.exitcode != 0:
+            raise SystemExit("Veritabanı hazırlanamadı")
+        print(f"Veritabanı hazırlandı ({args.patients} hasta, {args.doctors} doktor): "
+              f"{time.perf_counter() - started:.1f} sn")
+
+        port = free_port(args.host)
+        command = args.server_command.format(python=sys.executable, host=args.host, port=port)
+        log = open(os.path.join(work_dir, 'server.log'), 'wb')
+        server = subprocess.Popen(command, shell=True, cwd=BACKEND_DIR, env={**os.environ, **env},
+                                  stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        started = time.perf_counter()
+        wait_ready(args.host, port, server, args.ready_timeout)
+        print(f"Sunucu hazır ({port}): {time.perf_counter() - started:.1f} sn, RSS {process_tree_rss_mb(server.pid):.0f} MB")
+
+        traffic = Traffic(args, images)
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+            'server_env': env,
+            'scenarios': {},
+        }
+        for i, scenario in enumerate(scenarios):
+            with RssSampler(server.pid) as sampler:
+                results, duration = run_scenario(args.host, port, traffic, scenario, args.concurrency,
+                                                 args.duration, args.warmup, [args.seed, i])
+            summary = summarize(results, duration)
+            summary.update({'rss_mb': process_tree_rss_mb(server.pid), 'rss_peak_mb': sampler.peak,
+                            'pss_mb': process_tree_pss_mb(server.pid)})
+            if scenario == 'mixed':
+                summary['by_request'] = {kind: summarize([r for r in results if r[0] == kind], duration)
+                                         for kind in MIX}
+            report['scenarios'][scenario] = summary
+            print(f"{scenario:<14} {summary['requests']:>6} istek  {summary['throughput_rps']:>7.1f} istek/sn  "
+                  f"p50={summary.get('p50_ms', 0):>7.1f}  p95={summary.get('p95_ms', 0):>7.1f}  "
+                  f"p99={summary.get('p99_ms', 0):>7.1f} ms  hata={summary['errors']}  RSS={summary['rss_mb']:.0f} MB  "
+                  f"PSS={summary['pss_mb']:.0f} MB")
+    finally:
+        if server is not None:
+            try:
+                os.killpg(server.pid, 15)
+            except ProcessLookupError:
+                pass
+            server.wait()
+        if args.keep_dir:
+            print(f"Geçici klasör: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+SQLite eşzamanlı yazma yük testi.
+
+Birden fazla işlem (çoklu sunucu işçisi gibi) /predict'in veritabanı kısmını taklit eder: her
+yinelemede bir Notification ekler, bir MRImage kaydının tahminini günceller ve commit eder.
+Ayrı okuyucu işlemler aynı anda bildirim listesini okur. Test önce eski ayarlarla (rollback
+günlüğü, synchronous=FULL), sonra WAL ayarlarıyla geçici veritabanlarında çalıştırılır.
+
+Kullanım:
+    python benchmarks/sqlite_write_contention.py --writers 8 --readers 4 --iterations 200
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = {
+    # app.py'nin önceki davranışı: varsayılan günlük modu ve pysqlite'ın 5 sn'lik beklemesi
+    'legacy': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT_MS': '5000'},
+    'wal': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL', 'SQLITE_BUSY_TIMEOUT_MS': '5000'},
+}
+
+
+def _import_app(db_path, config):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+    os.environ['MODEL_AUTOLOAD'] = '0'
+    os.environ.update(config)
+    sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+    import app as backend
+    return backend
+
+
+def _seed(db_path, config, patients):
+    backend = _import_app(db_path, config)
+    with backend.app.app_context():
+        backend.db.create_all()
+        people = [backend.Patient(first_name=f'Hasta{i}', last_name='Test', email=f'hasta{i}@example.com', password='x')
+                  for i in range(patients)]
+        backend.db.session.add_all(people)
+        backend.db.session.flush()
+        backend.db.session.add_all([backend.MRImage(file_path=f'/tmp/mr_{p.id}.jpg', patient_id=p.id) for p in people])
+        backend.db.session.commit()
+
+
+def _writer(db_path, config, worker, iterations, patients, start, results):
+    backend = _import_app(db_path, config)
+    latencies, errors = [], 0
+    with backend.app.app_context():
+        start.wait()
+        for i in range(iterations):
+            patient_id = (worker * iterations + i) % patients + 1
+            started = time.perf_counter()
+            try:
+                # /predict'te mr_image_id tek başına verildiğinde kayıt önce okunur, sonra güncellenir
+                mr = backend.db.session.get(backend.MRImage, patient_id)
+                backend.db.session.add(backend.Notification(patient_id=patient_id, message=f'Yapay zeka tahmini sonucu: {i}'))
+                mr.prediction = ('glioma_tumor', 'meningioma_tumor', 'no_tumor', 'pituitary_tumor')[i % 4]
+                backend.db.session.commit()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                backend.db.session.rollback()
+                errors += 1
+                if 'locked' not in str(e):
+                    raise
+    results.put(('writer', latencies, errors))
+
+
+def _reader(db_path, config, worker, iterations, patients, start, results):
+    backend = _import_app(db_path, config)
+    latencies, errors = [], 0
+    with backend.app.app_context():
+        start.wait()
+        for i in range(iterations):
+            started = time.perf_counter()
+            try:
+                (backend.Notification.query.filter_by(patient_id=(worker + i) % patients + 1)
+                 .order_by(backend.Notification.created_at.desc()).limit(50).all())
+                backend.db.session.commit()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                backend.db.session.rollback()
+                errors += 1
+                if 'locked' not in str(e):
+                    raise
+    results.put(('reader', latencies, errors))
+
+
+def run(name, args):
+    ctx = mp.get_context('spawn')
+    db_path = os.path.join(tempfile.mkdtemp(prefix=f'contention_{name}_', dir=args.dir), 'hospital.db')
+    config = CONFIGS[name]
+    seeder = ctx.Process(target=_seed, args=(db_path, config, args.patients))
+    seeder.start()
+    seeder.join()
+
+    start = ctx.Event()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_writer, args=(db_path, config, w, args.iterations, args.patients, start, results))
+                 for w in range(args.writers)]
+    processes += [ctx.Process(target=_reader, args=(db_path, config, r, args.iterations, args.patients, start, results))
+                  for r in range(args.readers)]
+    for process in processes:
+        process.start()
+    time.sleep(args.startup_seconds)  # işlemlerin uygulamayı içe aktarması beklenir
+    started = time.perf_counter()
+    start.set()
+    collected = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    report = {'config': name, **config, 'seconds': elapsed}
+    for role in ('writer', 'reader'):
+        latencies = np.concatenate([np.asarray(l) for r, l, _ in collected if r == role] or [np.empty(0)])
+        errors = sum(e for r, _, e in collected if r == role)
+        report[role] = {
+            'ok': int(latencies.size),
+            'locked_errors': int(errors),
+            'per_second': latencies.size / elapsed,
+            'p50_ms': float(np.percentile(latencies, 50) * 1000) if latencies.size else None,
+            'p95_ms': float(np.percentile(latencies, 95) * 1000) if latencies.size else None,
+            'max_ms': float(latencies.max() * 1000) if latencies.size else None,
+        }
+    w, r = report['writer'], report['reader']
+    print(f"{name:<7} yazma: {w['per_second']:>7.1f}/sn p95={w['p95_ms'] or 0:>7.1f} ms kilit hatası={w['locked_errors']:<4} "
+          f"okuma: {r['per_second']:>7.1f}/sn p95={r['p95_ms'] or 0:>7.1f} ms kilit hatası={r['locked_errors']}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite eşzamanlı yazma yük testi')
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=200, help='İşlem başına yineleme')
+    parser.add_argument('--patients', type=int, default=100)
+    parser.add_argument('--configs', nargs='*', default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument('--dir', default=None, help='Veritabanlarının oluşturulacağı klasör (tmpfs yerine gerçek disk önerilir)')
+    parser.add_argument('--startup-seconds', type=float, default=5.0)
+    parser.add_argument('--output', default=None, help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+    reports = [run(name, args) for name in args.configs]
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import math
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from preprocessing import IMG_SIZE, decode_into, load_images  # noqa: E402
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+# kod.py'deki ImageDataGenerator ayarlarının aynısı
+AUGMENTATION = {
+    'rotation_range': 45,
+    'width_shift_range': 0.2,
+    'height_shift_range': 0.2,
+    'shear_range': 0.2,  # ImageDataGenerator'da derece cinsinden
+    'zoom_range': 0.2,
+    'horizontal_flip': True,
+    'vertical_flip': True,
+    'brightness_range': (0.6, 1.4),
+    'channel_shift_range': 50.0,
+}
+
+
+def _decode(path, size):
+    # Sunucuyla aynı ön işleme (backend/preprocessing.py)
+    out = np.empty((size, size, 3), dtype=np.uint8)
+    return decode_into(path.decode('utf-8'), out, size)
+
+
+def decode_image(path, size=IMG_SIZE):
+    image = tf.numpy_function(lambda p: _decode(p, size), [path], tf.uint8)
+    image.set_shape((size, size, 3))
+    return image
+
+
+def affine_transform(image, theta, tx, ty, shear, zx, zy):
+    """
+    ImageDataGenerator.apply_affine_transform ile aynı dönüşüm (bilinear, fill_mode='nearest').
+
+    Args:
+        theta (float): Döndürme açısı (derece)
+        tx, ty (float): Kaydırma miktarları (piksel)
+        shear (float): Kesme açısı (derece)
+        zx, zy (float): Yakınlaştırma oranları
+    """
+    shape = tf.shape(image)
+    h = tf.cast(shape[0], tf.float32)
+    w = tf.cast(shape[1], tf.float32)
+    theta = tf.cast(theta, tf.float32) * math.pi / 180.0
+    shear = tf.cast(shear, tf.float32) * math.pi / 180.0
+    tx, ty, zx, zy = (tf.cast(v, tf.float32) for v in (tx, ty, zx, zy))
+
+    zero, one = tf.constant(0.0), tf.constant(1.0)
+    rotation = tf.stack([[tf.cos(theta), -tf.sin(theta), zero], [tf.sin(theta), tf.cos(theta), zero], [zero, zero, one]])
+    shift = tf.stack([[one, zero, tx], [zero, one, ty], [zero, zero, one]])
+    shear_m = tf.stack([[one, -tf.sin(shear), zero], [zero, tf.cos(shear), zero], [zero, zero, one]])
+    zoom = tf.stack([[zx, zero, zero], [zero, zy, zero], [zero, zero, one]])
+    o_x, o_y = h / 2.0 - 0.5, w / 2.0 - 0.5
+    offset = tf.stack([[one, zero, o_x], [zero, one, o_y], [zero, zero, one]])
+    reset = tf.stack([[one, zero, -o_x], [zero, one, -o_y], [zero, zero, one]])
+    m = offset @ rotation @ shift @ shear_m @ zoom @ reset
+
+    # ImageDataGenerator'da olduğu gibi matris (x=sütun, y=satır) sırasında çıktı -> girdi eşlemesidir
+    transform = tf.stack([m[0, 0], m[0, 1], m[0, 2], m[1, 0], m[1, 1], m[1, 2], zero, zero])
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=image[tf.newaxis],
+        transforms=transform[tf.newaxis],
+        output_shape=shape[:2],
+        fill_value=0.0,
+        interpolation='BILINEAR',
+        fill_mode='NEAREST',
+    )[0]
+
+
+def _random_affine_transform(image, params):
+    shape = tf.shape(image)
+    h = tf.cast(shape[0], tf.float32)
+    w = tf.cast(shape[1], tf.float32)
+    theta = tf.random.uniform([], -params['rotation_range'], params['rotation_range'])
+    tx = tf.random.uniform([], -params['height_shift_range'], params['height_shift_range']) * h
+    ty = tf.random.uniform([], -params['width_shift_range'], params['width_shift_range']) * w
+    shear = tf.random.uniform([], -params['shear_range'], params['shear_range'])
+    zx = tf.random.uniform([], 1.0 - params['zoom_range'], 1.0 + params['zoom_range'])
+    zy = tf.random.uniform([], 1.0 - params['zoom_range'], 1.0 + params['zoom_range'])
+    return affine_transform(image, theta, tx, ty, shear, zx, zy)
+
+
+def augment(image, params=AUGMENTATION):
+    """
+    ImageDataGenerator.random_transform ile aynı sırada rastgele veri artırma uygular:
+    afin dönüşüm, kanal kaydırma, yatay/dikey çevirme ve parlaklık.
+    """
+    x = tf.cast(image, tf.float32)
+    x = _random_affine_transform(x, params)
+
+    if params['channel_shift_range']:
+        intensity = tf.random.uniform([], -params['channel_shift_range'], params['channel_shift_range'])
+        x = tf.clip_by_value(x + intensity, tf.reduce_min(x), tf.reduce_max(x))
+
+    if params['horizontal_flip']:
+        x = tf.cond(tf.random.uniform([]) < 0.5, lambda: tf.reverse(x, axis=[1]), lambda: x)
+    if params['vertical_flip']:
+        x = tf.cond(tf.random.uniform([]) < 0.5, lambda: tf.reverse(x, axis=[0]), lambda: x)
+
+    if params['brightness_range']:
+        # ImageDataGenerator: array_to_img (uint8'e kesme) -> ImageEnhance.Brightness (kesmeli çarpım)
+        low, high = params['brightness_range']
+        factor = tf.random.uniform([], low, high)
+        x = tf.floor(tf.clip_by_value(x, 0.0, 255.0))
+        x = tf.clip_by_value(tf.floor(x * factor), 0.0, 255.0)
+    return x
+
+
+def make_dataset(paths, labels, num_classes, batch_size=16, training=False, augment_images=None,
+                 cache=None, shuffle_buffer=2048, seed=None, size=IMG_SIZE):
+    """
+    Dosya yollarından paralel bir tf.data hattı oluşturur.
+
+    Görüntüler paralel çözülür ve uint8 olarak önbelleğe alınır (`cache=''` bellekte, dosya yolu
+    verilirse diskte); böylece ikinci epoch'tan itibaren JPEG çözme maliyeti ödenmez. Veri
+    artırma önbellekten sonra, her epoch'ta yeniden ve paralel uygulanır.
+
+    Args:
+        paths (list): Görüntü yolları
+        labels (np.ndarray): Sınıf indeksleri
+        training (bool): Karıştırma yapılsın mı
+        augment_images (bool): Veri artırma uygulansın mı (None ise training ile aynı)
+        cache (str): None (önbellek yok), '' (bellek) veya önbellek dosyası yolu
+
+    Returns:
+        tf.data.Dataset: (float32 görüntü, one-hot etiket) batch'leri
+    """
+    if augment_images is None:
+        augment_images = training
+    if cache:
+        os.makedirs(os.path.dirname(os.path.abspath(cache)), exist_ok=True)
+    ds = tf.data.Dataset.from_tensor_slices((list(paths), np.asarray(labels, dtype=np.int32)))
+    ds = ds.map(lambda p, y: (decode_image(p, size), y), num_parallel_calls=AUTOTUNE, deterministic=True)
+    if cache is not None:
+        ds = ds.cache(cache)
+    if training:
+        ds = ds.shuffle(min(shuffle_buffer, len(paths)), seed=seed, reshuffle_each_iteration=True)
+    if augment_images:
+        ds = ds.map(lambda x, y: (augment(x), y), num_parallel_calls=AUTOTUNE, deterministic=not training)
+    else:
+        ds = ds.map(lambda x, y: (tf.cast(x, tf.float32), y), num_parallel_calls=AUTOTUNE)
+    ds = ds.map(lambda x, y: (x, tf.one_hot(y, num_classes)), num_parallel_calls=AUTOTUNE)
+    ds = ds.batch(batch_size)
+    return ds.prefetch(AUTOTUNE)
+
+
+def decode_once(paths, cache_file=None, size=IMG_SIZE):
+    """
+    Görüntüleri bir kez çözüp uint8 dizi olarak döndürür.
+
+    `cache_file` verilirse dizi .npy olarak kaydedilir ve sonraki çalıştırmalarda bellek eşlemeli
+    (memory-mapped) olarak açılır; yarım kalan bir eğitim yeniden başlatıldığında görüntüler
+    tekrar çözülmez.
+    """
+    if cache_file and os.path.exists(cache_file):
+        images = np.load(cache_file, mmap_mode='r')
+        if images.shape == (len(paths), size, size, 3):
+            return images
+    images = load_images(paths, size)
+    if cache_file:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+        tmp_file = cache_file + '.tmp.npy'
+        np.save(tmp_file, images)
+        os.replace(tmp_file, cache_file)
+    return images
+
+
+def make_array_dataset(images, labels, indices, num_classes, batch_size=16, training=False,
+                       augment_images=None, shuffle_buffer=2048, seed=None):
+    """
+    Önceden çözülmüş görüntülerin `indices` ile seçilen alt kümesinden tf.data hattı oluşturur.
+    K-fold eğitiminde tüm fold'lar aynı çözülmüş diziyi paylaşır.
+    """
+    if augment_images is None:
+        augment_images = training
+    indices = np.asarray(indices, dtype=np.int64)
+    labels = np.asarray(labels, dtype=np.int32)
+    size = images.shape[1]
+
+    def take(i):
+        return np.asarray(images[i]), labels[i]
+
+    def load(i):
+        image, label = tf.numpy_function(take, [i], (tf.uint8, tf.int32))
+        image.set_shape((size, size, 3))
+        label.set_shape(())
+        return image, label
+
+    ds = tf.data.Dataset.from_tensor_slices(indices)
+    if training:
+        ds = ds.shuffle(min(shuffle_buffer, len(indices)), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(load, num_parallel_calls=AUTOTUNE)
+    if augment_images:
+        ds = ds.map(lambda x, y: (augment(x), y), num_parallel_calls=AUTOTUNE, deterministic=not training)
+    else:
+        ds = ds.map(lambda x, y: (tf.cast(x, tf.float32), y), num_parallel_calls=AUTOTUNE)
+    ds = ds.map(lambda x, y: (x, tf.one_hot(y, num_classes)), num_parallel_calls=AUTOTUNE)
+    ds = ds.batch(batch_size)
+    return ds.prefetch(AUTOTUNE)
@@ -0,0 +1,332 @@
+"""
+Değerlendirme deposu: her checkpoint'in test görüntüleri üzerindeki sınıf olasılıklarını bir kez
+hesaplayıp diskte sütunlu (columnar) parçalar halinde saklar. Kayıtlar checkpoint dosyasının
+SHA-256 özeti ve görüntü baytlarının SHA-256 özetiyle anahtarlanır.
+
+Karışıklık matrisi, ROC/AUC, fold karşılaştırmaları ve topluluk (ensemble) sonuçları bu
+kayıtlardan hesaplanır; rapor değiştiğinde çıkarım tekrarlanmaz. Yalnızca depoda bulunmayan
+görüntüler veya yeni checkpoint'ler modelden geçirilir.
+
+Parçalar pyarrow kuruluysa Parquet, değilse .npz olarak yazılır; okuma iki biçimi de destekler.
+
+Depo düzeni:
+    evaluation_store/<checkpoint özeti>/checkpoint.json
+    evaluation_store/<checkpoint özeti>/part-00000.parquet (image_hash, path, prob_0, prob_1, ...)
+
+Kullanım:
+    python evaluation_store.py compare                       # kfold_manifest.json'daki fold'lar
+    python evaluation_store.py compare --models a.keras b.keras --test-dir Dataset/Test --output comparison.json
+    python evaluation_store.py info
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+from sklearn.metrics import auc, classification_report, confusion_matrix, roc_curve
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from preprocessing import list_images  # noqa: E402
+
+default_store_dir = 'evaluation_store'
+
+# Keras categorical_crossentropy ile aynı kırpma değeri
+EPSILON = 1e-7
+
+# Aynı checkpoint dosyası tekrar tekrar özetlenmesin (yol, boyut, değişiklik zamanı -> özet)
+_checkpoint_hashes = {}
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_hash(model_path):
+    """
+    Checkpoint dosyasının içerik özetini döndürür. Aynı ağırlıklar farklı adla kopyalansa da
+    özet değişmez; aynı ada yeni bir model yazıldığında ise değişir.
+    """
+    stat = os.stat(model_path)
+    key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _checkpoint_hashes:
+        _checkpoint_hashes[key] = _file_hash(model_path)
+    return _checkpoint_hashes[key]
+
+
+def image_hashes(paths):
+    """Görüntü dosyalarının bayt özetlerini döndürür (sunucudaki tahmin önbelleğiyle aynı özet)."""
+    return [_file_hash(path) for path in paths]
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pa, pq
+
+
+class EvaluationStore:
+    """
+    Checkpoint başına olasılık kayıtları.
+
+    Args:
+        root (str): Depo klasörü
+        fmt (str): Yeni parçaların biçimi: 'parquet', 'npz' veya None (pyarrow varsa Parquet)
+    """
+
+    def __init__(self, root=default_store_dir, fmt=None):
+        if fmt is None:
+            fmt = 'parquet' if _parquet() else 'npz'
+        if fmt not in ('parquet', 'npz'):
+            raise ValueError(f"Desteklenmeyen depo biçimi: {fmt} (parquet veya npz olmalı)")
+        if fmt == 'parquet' and _parquet() is None:
+            raise RuntimeError('Parquet deposu için pyarrow kurulmalı (pip install pyarrow)')
+        self.root = root
+        self.fmt = fmt
+        self._loaded = {}
+
+    def _dir(self, ckpt):
+        return os.path.join(self.root, ckpt)
+
+    def _parts(self, ckpt):
+        return sorted(glob.glob(os.path.join(self._dir(ckpt), 'part-*.parquet')) +
+                      glob.glob(os.path.join(self._dir(ckpt), 'part-*.npz')))
+
+    def checkpoints(self):
+        """Depodaki checkpoint'lerin bilgilerini döndürür."""
+        entries = []
+        for meta_path in sorted(glob.glob(os.path.join(self.root, '*', 'checkpoint.json'))):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta['parts'] = len(self._parts(meta['checkpoint_hash']))
+            entries.append(meta)
+        return entries
+
+    def _read_part(self, part):
+        if part.endswith('.npz'):
+            with np.load(part) as columns:
+                return [str(h) for h in columns['image_hash']], [str(p) for p in columns['path']], columns['probs']
+        parquet = _parquet()
+        if parquet is None:
+            raise RuntimeError(f"{part} okunamadı: pyarrow kurulmalı (pip install pyarrow)")
+        table = parquet[1].read_table(part)
+        prob_columns = sorted((name for name in table.column_names if name.startswith('prob_')),
+                              key=lambda name: int(name.split('_')[1]))
+        probs = np.stack([table.column(name).to_numpy() for name in prob_columns], axis=1)
+        return table.column('image_hash').to_pylist(), table.column('path').to_pylist(), probs
+
+    def load(self, ckpt):
+        """
+        Bir checkpoint'in tüm kayıtlarını okur.
+
+        Returns:
+            tuple: (görüntü özeti -> satır indeksi, olasılık matrisi, görüntü yolları)
+        """
+        if ckpt not in self._loaded:
+            index, probs, paths = {}, [], []
+            for part in self._parts(ckpt):
+                part_hashes, part_paths, part_probs = self._read_part(part)
+                for image_hash, path, row in zip(part_hashes, part_paths, part_probs):
+                    if image_hash not in index:
+                        index[image_hash] = len(probs)
+                        probs.append(row)
+                        paths.append(path)
+            probs = np.asarray(probs, dtype=np.float32) if probs else np.zeros((0, 0), dtype=np.float32)
+            self._loaded[ckpt] = (index, probs, paths)
+        return self._loaded[ckpt]
+
+    def _write_meta(self, ckpt, model_path, num_classes, class_names):
+        meta_path = os.path.join(self._dir(ckpt), 'checkpoint.json')
+        meta = {'checkpoint_hash': ckpt, 'model_paths': [], 'num_classes': int(num_classes),
+                'class_names': list(class_names) if class_names else None,
+                'created_at': datetime.now().isoformat()}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        name = os.path.basename(model_path)
+        if name in meta['model_paths']:
+            return
+        meta['model_paths'].append(name)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def append(self, ckpt, hashes, paths, probs):
+        """Yeni kayıtları checkpoint klasörüne yeni bir parça olarak yazar."""
+        if not len(hashes):
+            return
+        os.makedirs(self._dir(ckpt), exist_ok=True)
+        probs = np.asarray(probs, dtype=np.float32)
+        part = os.path.join(self._dir(ckpt), f'part-{len(self._parts(ckpt)):05d}.{self.fmt}')
+        tmp_part = part + '.tmp'
+        if self.fmt == 'parquet':
+            pa, pq = _parquet()
+            columns = {'image_hash': list(hashes), 'path': list(paths)}
+            columns.update({f'prob_{i}': probs[:, i] for i in range(probs.shape[1])})
+            pq.write_table(pa.table(columns), tmp_part)
+        else:
+            with open(tmp_part, 'wb') as f:
+                np.savez(f, image_hash=np.asarray(hashes), path=np.asarray(paths), probs=probs)
+        os.replace(tmp_part, part)
+        self._loaded.pop(ckpt, None)
+
+    def probabilities(self, model_path, hashes, paths, images=None, model=None, batch_size=32, class_names=None):
+        """
+        Görüntülerin checkpoint olasılıklarını döndürür. Depoda olmayan görüntüler (tekrar edenler
+        bir kez) modelden geçirilip depoya eklenir; model yalnızca gerektiğinde yüklenir.
+
+        Args:
+            model_path (str): Checkpoint dosyası (.keras)
+            hashes (list): Görüntü özetleri (image_hashes)
+            paths (list): Görüntü yolları
+            images (ndarray): Önceden çözülmüş uint8 görüntüler (None ise eksik görüntüler çözülür)
+            model: Bellekte duran aynı checkpoint (verilirse tekrar yüklenmez)
+            batch_size (int): Çıkarım batch boyutu
+            class_names (list): checkpoint.json'a yazılacak sınıf isimleri
+
+        Returns:
+            ndarray: `paths` sırasıyla (N, sınıf sayısı) olasılık matrisi
+        """
+        ckpt = checkpoint_hash(model_path)
+        index, _, _ = self.load(ckpt)
+        missing, seen = [], set()
+        for i, image_hash in enumerate(hashes):
+            if image_hash not in index and image_hash not in seen:
+                seen.add(image_hash)
+                missing.append(i)
+        if missing:
+            print(f"{os.path.basename(model_path)}: {len(missing)} görüntü değerlendiriliyor "
+                  f"({len(hashes) - len(missing)} kayıt depodan)")
+            if model is None:
+                from tensorflow.keras.models import load_model
+                model = load_model(model_path, compile=False)
+            probs = _predict(model, images, paths, missing, batch_size)
+            self.append(ckpt, [hashes[i] for i in missing], [paths[i] for i in missing], probs)
+            self._write_meta(ckpt, model_path, probs.shape[1], class_names)
+            index, _, _ = self.load(ckpt)
+        _, stored, _ = self.load(ckpt)
+        return stored[[index[image_hash] for image_hash in hashes]]
+
+
+def _predict(model, images, paths, indices, batch_size):
+    from data_pipeline import load_images, make_array_dataset
+    num_classes = model.output_shape[-1]
+    if images is None:
+        images = load_images([paths[i] for i in indices], model.input_shape[1])
+        indices = np.arange(len(indices))
+    ds = make_array_dataset(images, np.zeros(len(images), dtype=np.int32), indices, num_classes, batch_size)
+    return np.asarray(model.predict(ds.map(lambda x, y: x), verbose=0), dtype=np.float32)
+
+
+def compute_metrics(y_true, probs, class_names):
+    """
+    Olasılıklardan doğruluk, kayıp (categorical crossentropy), karışıklık matrisi ve sınıf başına
+    AUC hesaplar.
+    """
+    y_true = np.asarray(y_true)
+    probs = np.asarray(probs, dtype=np.float64)
+    y_pred = np.argmax(probs, axis=1)
+    normalized = probs / probs.sum(axis=1, keepdims=True)
+    true_probs = np.clip(normalized[np.arange(len(y_true)), y_true], EPSILON, 1 - EPSILON)
+    aucs = {}
+    for i, name in enumerate(class_names):
+        if 0 < np.sum(y_true == i) < len(y_true):
+            fpr, tpr, _ = roc_curve(y_true == i, probs[:, i])
+            aucs[name] = float(auc(fpr, tpr))
+    return {
+        'count': int(len(y_true)),
+        'accuracy': float(np.mean(y_pred == y_true)),
+        'loss': float(-np.mean(np.log(true_probs))),
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=range(len(class_names))).tolist(),
+        'auc': aucs,
+        'macro_auc': float(np.mean(list(aucs.values()))) if aucs else None,
+        'report': classification_report(y_true, y_pred, labels=range(len(class_names)), target_names=class_names,
+                                        output_dict=True, zero_division=0),
+    }
+
+
+def compare_checkpoints(store, checkpoints, hashes, paths, y_true, class_names, images=None, batch_size=32):
+    """
+    Checkpoint'leri aynı test seti üzerinde karşılaştırır: her biri için metrikler, olasılık
+    ortalamasıyla topluluk metrikleri ve ikili tahmin uyuşma oranları.
+
+    Args:
+        store (EvaluationStore): Değerlendirme deposu
+        checkpoints (dict): Ad (ör. 'fold3') -> checkpoint dosyası
+    """
+    probs = {name: store.probabilities(path, hashes, paths, images, batch_size=batch_size, class_names=class_names)
+             for name, path in checkpoints.items()}
+    names = list(probs)
+    predictions = {name: np.argmax(p, axis=1) for name, p in probs.items()}
+    result = {
+        'images': len(hashes),
+        'checkpoints': [{'name': name, 'model_path': checkpoints[name],
+                         'checkpoint_hash': checkpoint_hash(checkpoints[name]),
+                         **compute_metrics(y_true, probs[name], class_names)} for name in names],
+        'agreement': {a: {b: float(np.mean(predictions[a] == predictions[b])) for b in names} for a in names},
+    }
+    if len(names) > 1:
+        result['ensemble'] = compute_metrics(y_true, np.mean([probs[name] for name in names], axis=0), class_names)
+    return result
+
+
+def print_comparison(result):
+    rows = [(entry['name'], entry) for entry in result['checkpoints']]
+    if 'ensemble' in result:
+        rows.append(('ensemble', result['ensemble']))
+    width = max([len('Checkpoint')] + [len(name) for name, _ in rows])
+    print(f"\n{'Checkpoint':<{width}} {'Doğruluk':>9} {'Kayıp':>8} {'Makro AUC':>10}")
+    print("=" * (width + 30))
+    for name, metrics in rows:
+        macro_auc = f"{metrics['macro_auc']:.4f}" if metrics['macro_auc'] is not None else '-'
+        print(f"{name:<{width}} {metrics['accuracy']:>9.4f} {metrics['loss']:>8.4f} {macro_auc:>10}")
+
+
+def main():
+    import kod
+    parser = argparse.ArgumentParser(description='Checkpoint değerlendirme deposu')
+    parser.add_argument('command', choices=['compare', 'info'])
+    parser.add_argument('--store-dir', default=kod.evaluation_store_dir)
+    parser.add_argument('--format', default=None, choices=['parquet', 'npz'], help='Yeni parçaların biçimi')
+    parser.add_argument('--models', nargs='*', default=None, help='Checkpoint dosyaları (verilmezse manifestteki fold\'lar)')
+    parser.add_argument('--manifest', default=kod.manifest_path)
+    parser.add_argument('--test-dir', default=kod.test_dir)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--output', default=None, help='Karşılaştırmanın yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    store = EvaluationStore(args.store_dir, args.format)
+    if args.command == 'info':
+        for meta in store.checkpoints():
+            index, _, _ = store.load(meta['checkpoint_hash'])
+            print(f"{meta['checkpoint_hash'][:16]}  {len(index):>6} görüntü  {meta['parts']:>3} parça  "
+                  f"{', '.join(meta['model_paths'])}")
+        return
+
+    if args.models:
+        checkpoints = {os.path.splitext(os.path.basename(path))[0]: path for path in args.models}
+    else:
+        manifest = kod.load_manifest(args.manifest)
+        checkpoints = {f"fold{entry['fold']}": entry['model_path']
+                       for entry in sorted(manifest['folds'].values(), key=lambda entry: entry['fold'])}
+    paths, y_true, class_names = list_images(args.test_dir)
+    result = compare_checkpoints(store, checkpoints, image_hashes(paths), paths, y_true, class_names,
+                                 batch_size=args.batch_size)
+    print_comparison(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
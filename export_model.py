@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, 'backend'))
+from runtimes import load_runtime  # noqa: E402
+from preprocessing import BatchBuffer, list_images, preprocess_batch, preprocess_image  # noqa: E402
+
+# Parametreler
+default_train_dir = os.path.join(BASE_DIR, 'Dataset', 'Train')
+default_test_dir = os.path.join(BASE_DIR, 'Dataset', 'Test')
+
+
+def iter_batches(paths, batch_size):
+    # Sunucuyla aynı ön işleme; tampon her batch'te tekrar kullanılır
+    buffer = BatchBuffer(batch_size)
+    for start in range(0, len(paths), batch_size):
+        yield preprocess_batch(paths[start:start + batch_size], buffer)
+
+
+def representative_dataset(calibration_dir, samples, seed=42):
+    """int8 nicemleme için Dataset/Train içinden rastgele örnekler üretir."""
+    paths, _, _ = list_images(calibration_dir)
+    random.Random(seed).shuffle(paths)
+    paths = paths[:samples]
+
+    def generator():
+        for path in paths:
+            yield [preprocess_image(path)]
+    return generator
+
+
+def export_savedmodel(model, output_dir):
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    if hasattr(model, 'export'):
+        model.export(output_dir)
+    else:
+        tf.saved_model.save(model, output_dir)
+    return output_dir
+
+
+def export_tflite(saved_model_dir, output_path, quantize='none', calibration_dir=default_train_dir, calibration_samples=200):
+    """
+    SavedModel'i TFLite'a dönüştürür.
+
+    Args:
+        quantize (str): 'none', 'float16' veya 'int8' (int8 için kalibrasyon verisi kullanılır)
+    """
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    if quantize == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(calibration_dir, calibration_samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantize != 'none':
+        raise ValueError(f"Bilinmeyen nicemleme türü: {quantize}")
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def evaluate(predict_fn, paths, labels, batch_size=32):
+    """Doğruluk, tahmin olasılıkları ve görüntü başına ortalama süreyi döndürür."""
+    outputs = []
+    elapsed = 0.0
+    for batch in iter_batches(paths, batch_size):
+        started = time.perf_counter()
+        outputs.append(np.asarray(predict_fn(batch)))
+        elapsed += time.perf_counter() - started
+    probs = np.concatenate(outputs, axis=0)
+    accuracy = float(np.mean(np.argmax(probs, axis=1) == labels))
+    return accuracy, probs, elapsed / max(len(paths), 1)
+
+
+def directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def export_model(model_path, output_dir, fmt='tflite', quantize='none', calibration_dir=default_train_dir,
+                 calibration_samples=200, test_dir=default_test_dir, test_limit=None, batch_size=32):
+    """
+    Eğitilmiş .keras modelini çıkarım (inference) için dışa aktarır ve doğruluk farkını raporlar.
+
+    Args:
+        model_path (str): Eğitilmiş model dosyası
+        output_dir (str): Çıktı klasörü
+        fmt (str): 'savedmodel' veya 'tflite'
+        quantize (str): 'none', 'float16' veya 'int8' (yalnızca tflite)
+        test_limit (int): Değerlendirmede kullanılacak en fazla test görüntüsü
+
+    Returns:
+        dict: Dışa aktarma raporu (export_report.json olarak da kaydedilir)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    model = load_model(model_path, compile=False)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    saved_model_dir = export_savedmodel(model, os.path.join(output_dir, f'{stem}_savedmodel'))
+    if fmt == 'savedmodel':
+        if quantize != 'none':
+            raise ValueError('Nicemleme yalnızca tflite formatında desteklenir')
+        artifact = saved_model_dir
+    elif fmt == 'tflite':
+        suffix = '' if quantize == 'none' else f'_{quantize}'
+        artifact = export_tflite(saved_model_dir, os.path.join(output_dir, f'{stem}{suffix}.tflite'),
+                                 quantize, calibration_dir, calibration_samples)
+    else:
+        raise ValueError(f"Bilinmeyen format: {fmt}")
+    print(f"Model dışa aktarıldı: {artifact}")
+
+    # Orijinal ve dışa aktarılan modeli Dataset/Test üzerinde karşılaştır
+    paths, labels, _ = list_images(test_dir)
+    if test_limit:
+        paths, labels = paths[:test_limit], labels[:test_limit]
+    runtime = load_runtime(artifact)
+    original_acc, original_probs, original_latency = evaluate(lambda b: model.predict(b, verbose=0), paths, labels, batch_size)
+    exported_acc, exported_probs, exported_latency = evaluate(runtime.predict, paths, labels, batch_size)
+
+    report = {
+        'model_path': os.path.abspath(model_path),
+        'artifact': os.path.abspath(artifact),
+        'format': fmt,
+        'quantize': quantize,
+        'original_size_bytes': directory_size(model_path),
+        'artifact_size_bytes': directory_size(artifact),
+        'test_images': len(paths),
+        'original_accuracy': original_acc,
+        'exported_accuracy': exported_acc,
+        'accuracy_delta': exported_acc - original_acc,
+        'prediction_agreement': float(np.mean(np.argmax(original_probs, 1) == np.argmax(exported_probs, 1))),
+        'max_abs_prob_diff': float(np.max(np.abs(original_probs - exported_probs))),
+        'original_ms_per_image': original_latency * 1000,
+        'exported_ms_per_image': exported_latency * 1000,
+    }
+    with open(os.path.join(output_dir, 'export_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\nDışa Aktarma Raporu:")
+    print("=" * 50)
+    print(f"Orijinal doğruluk: {original_acc:.4f}")
+    print(f"Dışa aktarılan doğruluk: {exported_acc:.4f} (fark: {exported_acc - original_acc:+.4f})")
+    print(f"Görüntü başına süre: {original_latency * 1000:.2f} ms -> {exported_latency * 1000:.2f} ms")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Eğitilmiş modeli SavedModel/TFLite olarak dışa aktarır')
+    parser.add_argument('model_path', help='Eğitilmiş .keras model dosyası')
+    parser.add_argument('--output-dir', default='exported_models')
+    parser.add_argument('--format', choices=['savedmodel', 'tflite'], default='tflite')
+    parser.add_argument('--quantize', choices=['none', 'float16', 'int8'], default='none')
+    parser.add_argument('--calibration-dir', default=default_train_dir)
+    parser.add_argument('--calibration-samples', type=int, default=200)
+    parser.add_argument('--test-dir', default=default_test_dir)
+    parser.add_argument('--test-limit', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    export_model(args.model_path, args.output_dir, args.format, args.quantize, args.calibration_dir,
+                 args.calibration_samples, args.test_dir, args.test_limit, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Dondurulmuş EfficientNetB4 gövdesinin (backbone) havuzlanmış özniteliklerini bir kez hesaplayıp
+bellek eşlemeli (memory-mapped) .npy dosyalarına yazar ve sınıflandırma başlığını (dense head)
+doğrudan bu öznitelikler üzerinde eğitir. Başlık denemeleri (dropout, genişlik, öğrenme oranı,
+sınıf ağırlığı) tam görüntü modeli yerine birkaç bin satırlık bir matris üzerinde çalıştığı için
+onlarca deneme dakikalar içinde biter.
+
+Kullanım:
+    python feature_cache.py extract
+    python feature_cache.py sweep --epochs 40
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+from tensorflow.keras.applications import EfficientNetB4
+from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.layers import GlobalAveragePooling2D, Input
+from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.utils import to_categorical
+
+import kod
+
+default_store_dir = 'feature_store'
+
+# Varsayılan başlık deneme ızgarası
+DEFAULT_GRID = {
+    'widths': [(1024, 512, 256), (512, 256), (256,)],
+    'dropout_scale': [0.5, 1.0, 1.5],
+    'learning_rate': [1e-4, 3e-4, 1e-3],
+    'glioma_weight': [1.0, 1.5, 2.0],
+}
+BASE_DROPOUTS = (0.5, 0.3, 0.2)
+
+
+def build_backbone(backbone_model=None):
+    """
+    Havuzlanmış öznitelik çıkaran dondurulmuş gövdeyi oluşturur.
+
+    Args:
+        backbone_model (str): Eğitilmiş bir fold checkpoint'i (None ise ImageNet ağırlıkları)
+    """
+    if backbone_model:
+        trained = load_model(backbone_model, compile=False)
+        base_model = next(layer for layer in trained.layers if layer.name.startswith('efficientnet'))
+    else:
+        base_model = EfficientNetB4(weights=None, include_top=False, input_shape=(kod.img_size, kod.img_size, 3))
+        base_model.set_weights(kod.load_base_weights())
+    base_model.trainable = False
+    inputs = Input(shape=(kod.img_size, kod.img_size, 3))
+    outputs = GlobalAveragePooling2D()(base_model(inputs, training=False))
+    return Model(inputs, outputs)
+
+
+def _store_paths(store_dir, name):
+    return (os.path.join(store_dir, f'{name}_features.npy'),
+            os.path.join(store_dir, f'{name}_labels.npy'),
+            os.path.join(store_dir, f'{name}_meta.json'))
+
+
+def extract_features(images, labels, paths, store_dir, name, backbone, backbone_id, batch_size=32):
+    """
+    Öznitelikleri `store_dir/<name>_features.npy` dosyasına batch batch yazar.
+
+    Yarıda kalan bir çıkarma işlemi kaldığı yerden devam eder; gövde veya görüntü listesi
+    değiştiyse dosya baştan oluşturulur.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    features_path, labels_path, meta_path = _store_paths(store_dir, name)
+    dim = backbone.output_shape[-1]
+    meta = {'backbone': backbone_id, 'img_size': kod.img_size, 'count': len(paths), 'dim': int(dim),
+            'paths': list(paths), 'done': 0}
+    if os.path.exists(meta_path) and os.path.exists(features_path):
+        with open(meta_path) as f:
+            previous = json.load(f)
+        if all(previous.get(k) == meta[k] for k in ('backbone', 'img_size', 'count', 'dim', 'paths')):
+            meta['done'] = previous['done']
+    if meta['done'] >= len(paths):
+        print(f"{name}: öznitelikler hazır ({features_path})")
+        return features_path
+
+    mode = 'r+' if meta['done'] else 'w+'
+    features = np.lib.format.open_memmap(features_path, mode=mode, dtype=np.float32, shape=(len(paths), dim))
+    np.save(labels_path, np.asarray(labels, dtype=np.int64))
+    started = time.perf_counter()
+    for start in range(meta['done'], len(paths), batch_size):
+        end = min(start + batch_size, len(paths))
+        batch = np.asarray(images[start:end], dtype=np.float32)
+        features[start:end] = backbone.predict(batch, verbose=0)
+        features.flush()
+        meta['done'] = end
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+        rate = (end - start) / max(time.perf_counter() - started, 1e-9)
+        started = time.perf_counter()
+        print(f"{name}: {end}/{len(paths)} görüntü ({rate:.1f} görüntü/sn)")
+    del features
+    return features_path
+
+
+def load_store(store_dir, name):
+    """Öznitelikleri bellek eşlemeli olarak, etiketleri ise bellekte döndürür."""
+    features_path, labels_path, _ = _store_paths(store_dir, name)
+    return np.load(features_path, mmap_mode='r'), np.load(labels_path)
+
+
+def build_head(input_dim, num_classes, widths, dropouts, learning_rate):
+    inputs = Input(shape=(input_dim,))
+    model = Model(inputs, kod.add_head(inputs, num_classes, widths, dropouts))
+    model.compile(optimizer=Adam(learning_rate=learning_rate),
+                  loss='categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+def head_config_name(config):
+    widths = '-'.join(str(w) for w in config['widths'])
+    return f"w{widths}_d{config['dropout_scale']}_lr{config['learning_rate']}_g{config['glioma_weight']}"
+
+
+def train_head(config, train, val, test, class_names, epochs=40, batch_size=64):
+    """Tek bir başlık yapılandırmasını öznitelikler üzerinde eğitir ve doğrulama/test skorlarını döndürür."""
+    (x_train, y_train), (x_val, y_val), (x_test, y_test) = train, val, test
+    num_classes = len(class_names)
+    widths = tuple(config['widths'])
+    dropouts = tuple(min(0.9, d * config['dropout_scale']) for d in BASE_DROPOUTS[:len(widths)])
+    model = build_head(x_train.shape[1], num_classes, widths, dropouts, config['learning_rate'])
+    class_weights = kod.compute_class_weights(y_train, class_names, config['glioma_weight'])
+    started = time.perf_counter()
+    history = model.fit(
+        x_train, to_categorical(y_train, num_classes),
+        validation_data=(x_val, to_categorical(y_val, num_classes)),
+        epochs=epochs,
+        batch_size=batch_size,
+        class_weight=class_weights,
+        callbacks=[EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)],
+        verbose=0
+    )
+    val_loss, val_acc = model.evaluate(x_val, to_categorical(y_val, num_classes), verbose=0)
+    test_loss, test_acc = model.evaluate(x_test, to_categorical(y_test, num_classes), verbose=0)
+    return {
+        'name': head_config_name(config),
+        'config': {**config, 'widths': list(widths), 'dropouts': list(dropouts)},
+        'epochs_run': len(history.history['loss']),
+        'val_acc': float(val_acc),
+        'val_loss': float(val_loss),
+        'test_acc': float(test_acc),
+        'test_loss': float(test_loss),
+        'seconds': time.perf_counter() - started,
+    }, model
+
+
+def extract(store_dir=default_store_dir, backbone_model=None, batch_size=32):
+    data = kod.prepare_data()
+    backbone = build_backbone(backbone_model)
+    backbone_id = os.path.abspath(backbone_model) if backbone_model else 'imagenet'
+    extract_features(data['train_images'], data['y_train'], data['train_paths'], store_dir, 'train',
+                     backbone, backbone_id, batch_size)
+    extract_features(data['test_images'], data['y_test'], data['test_paths'], store_dir, 'test',
+                     backbone, backbone_id, batch_size)
+    with open(os.path.join(store_dir, 'class_names.json'), 'w') as f:
+        json.dump(data['class_names'], f)
+
+
+def sweep(store_dir=default_store_dir, grid=None, epochs=40, fold=1, output=None, save_best=None):
+    """
+    Başlık yapılandırmalarını ızgara üzerinde dener. Doğrulama ayrımı kod.py'deki K-fold
+    bölmesinin `fold` numaralı parçasıdır; sonuçlar doğrulama doğruluğuna göre sıralanır.
+    """
+    grid = grid or DEFAULT_GRID
+    x_all, y_all = load_store(store_dir, 'train')
+    x_test, y_test = load_store(store_dir, 'test')
+    with open(os.path.join(store_dir, 'class_names.json')) as f:
+        class_names = json.load(f)
+    train_idx, val_idx = kod.fold_splits({'y_train': y_all})[fold - 1]
+    # Öznitelik matrisi küçüktür; eğitim sırasında diskten tekrar tekrar okunmaması için belleğe alınır
+    x_all = np.asarray(x_all)
+    train = (x_all[train_idx], y_all[train_idx])
+    val = (x_all[val_idx], y_all[val_idx])
+    test = (np.asarray(x_test), y_test)
+
+    keys = list(grid.keys())
+    configs = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    results = []
+    best_model, best_val_acc = None, -1.0
+    for i, config in enumerate(configs, start=1):
+        result, model = train_head(config, train, val, test, class_names, epochs)
+        results.append(result)
+        print(f"[{i}/{len(configs)}] {result['name']}: val_acc={result['val_acc']:.4f} "
+              f"test_acc={result['test_acc']:.4f} ({result['seconds']:.1f} sn)")
+        if result['val_acc'] > best_val_acc:
+            best_model, best_val_acc = model, result['val_acc']
+    results.sort(key=lambda r: (-r['val_acc'], r['val_loss']))
+
+    output = output or os.path.join(store_dir, 'sweep_results.json')
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    if save_best and best_model is not None:
+        best_model.save(save_best)
+    print(f"\nEn iyi başlık: {results[0]['name']} (val_acc={results[0]['val_acc']:.4f}, "
+          f"test_acc={results[0]['test_acc']:.4f})")
+    print(f"Sonuçlar: {output}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Öznitelik önbelleği ve başlık denemeleri')
+    parser.add_argument('command', choices=['extract', 'sweep'])
+    parser.add_argument('--store-dir', default=default_store_dir)
+    parser.add_argument('--backbone-model', default=None, help='Gövde olarak kullanılacak fold checkpoint (varsayılan ImageNet)')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--epochs', type=int, default=40)
+    parser.add_argument('--fold', type=int, default=1, help='Doğrulama için kullanılacak K-fold parçası')
+    parser.add_argument('--grid', default=None, help='Izgarayı içeren JSON dosyası')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--save-best', default=None, help='En iyi başlığın kaydedileceği .keras dosyası')
+    args = parser.parse_args()
+    if args.command == 'extract':
+        extract(args.store_dir, args.backbone_model, args.batch_size)
+    else:
+        grid = None
+        if args.grid:
+            with open(args.grid) as f:
+                grid = json.load(f)
+        sweep(args.store_dir, grid, args.epochs, args.fold, args.output, args.save_best)
+
+
+if __name__ == '__main__':
+    main()
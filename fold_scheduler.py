@@ -0,0 +1,177 @@
+"""
+K-fold eğitimini birden fazla işlemde (process) paralel çalıştırır.
+
+Her işçi işlem, çekirdeklerin kendine düşen payına sabitlenir ve TensorFlow'un intra/inter-op
+thread sayıları bu paya göre sınırlandırılır. Fold sonuçları (test_acc, test_loss, checkpoint)
+ana işlemde tek bir manifest dosyasında toplanır.
+
+Kullanım:
+    python fold_scheduler.py --workers 2
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import traceback
+
+import numpy as np
+
+
+def cpu_slots(workers, cpus=None):
+    """Kullanılabilir çekirdekleri işçiler arasında eşit ve çakışmasız paylaştırır."""
+    if cpus is None:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    workers = max(1, min(workers, len(cpus)))
+    return [[int(c) for c in chunk] for chunk in np.array_split(cpus, workers)]
+
+
+def _limit_threads(cpus, inter_op_threads):
+    threads = str(len(cpus))
+    # TensorFlow ve BLAS thread havuzları TensorFlow içe aktarılmadan önce ayarlanmalı
+    os.environ['OMP_NUM_THREADS'] = threads
+    os.environ['TF_NUM_INTRAOP_THREADS'] = threads
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    import tensorflow as tf
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(len(cpus))
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        # Ana modül TensorFlow'u işçide zaten başlattıysa yalnızca çekirdek sabitlemesi geçerli olur
+        print(f"TensorFlow thread sayıları ayarlanamadı: {e}")
+
+
+def _run_fold(fold, train_idx, val_idx, cpus, inter_op_threads, settings, results):
+    try:
+        _limit_threads(cpus, inter_op_threads)
+        import kod
+        for name, value in settings.items():
+            setattr(kod, name, value)
+        data = kod.prepare_data()
+        base_weights = kod.load_base_weights()
+        result = kod.train_fold(fold, train_idx, val_idx, data, base_weights)
+        result['cpus'] = list(cpus)
+        results.put((fold, result, None))
+    except Exception:
+        results.put((fold, None, traceback.format_exc()))
+
+
+def run_parallel_kfold(workers=2, inter_op_threads=1, folds=None):
+    """
+    Tamamlanmamış fold'ları `workers` adet paralel işlemde eğitir.
+
+    Veri seti ve ImageNet ağırlıkları önce ana işlemde diske yazılır; işçiler bunları bellek
+    eşlemeli olarak açar, böylece görüntüler tekrar çözülmez.
+
+    Args:
+        workers (int): Aynı anda çalışacak fold sayısı
+        inter_op_threads (int): Her işçideki inter-op thread sayısı
+        folds (list): Yalnızca bu fold'ları çalıştır (None ise tümü)
+
+    Returns:
+        dict: Güncellenmiş manifest
+    """
+    import kod
+
+    if not kod.data_cache_dir:
+        raise ValueError('Paralel eğitim için kod.data_cache_dir ayarlanmalı')
+    data = kod.prepare_data()
+    kod.load_base_weights()
+    manifest = kod.load_manifest()
+    splits = kod.fold_splits(data)
+
+    pending = []
+    for fold, (train_idx, val_idx) in enumerate(splits, start=1):
+        if folds and fold not in folds:
+            continue
+        done = manifest['folds'].get(str(fold))
+        if done and os.path.exists(done['model_path']):
+            print(f"Fold {fold}/{kod.n_splits} daha önce tamamlanmış, atlanıyor ({done['model_path']})")
+            continue
+        pending.append((fold, train_idx, val_idx))
+
+    # İşçiler ana modüldeki ayarları görmez; kod.py'deki (değiştirilmiş olabilecek) parametreleri aktar
+    settings = {name: getattr(kod, name) for name in
+                ('train_dir', 'test_dir', 'img_size', 'batch_size', 'epochs', 'n_splits', 'data_cache_dir',
+                 'evaluation_store_dir', 'jit_compile')}
+
+    # TensorFlow fork güvenli değildir; işçiler spawn ile başlatılır
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    free_slots = cpu_slots(workers)
+    running = {}
+    failed = {}
+
+    def finish(fold, result, error):
+        entry = running.pop(fold, None)
+        if entry is not None:
+            entry[0].join()
+            free_slots.append(entry[1])
+        if error:
+            failed[fold] = error
+            print(f"Fold {fold} başarısız:\n{error}")
+            return
+        # Geç gelen başarılı sonuç önceki başarısızlık kaydının yerine geçer
+        failed.pop(fold, None)
+        # Manifest yalnızca ana işlemde yazılır
+        manifest = kod.load_manifest()
+        manifest['folds'][str(fold)] = result
+        kod.save_manifest(manifest)
+        print(f"Fold {fold} tamamlandı: test_acc={result['test_acc']:.4f}, test_loss={result['test_loss']:.4f}")
+
+    while pending or running:
+        while pending and free_slots:
+            fold, train_idx, val_idx = pending.pop(0)
+            cpus = free_slots.pop(0)
+            process = ctx.Process(target=_run_fold, name=f'fold-{fold}',
+                                  args=(fold, train_idx, val_idx, cpus, inter_op_threads, settings, results))
+            process.start()
+            running[fold] = (process, cpus)
+            print(f"Fold {fold} başlatıldı (çekirdekler: {cpus})")
+        try:
+            finish(*results.get(timeout=5))
+        except queue.Empty:
+            # Sonuç göndermeden ölen işlemleri yakala. İşlem sonucunu kuyruğa koyup bekleme süresi
+            # dolduktan hemen sonra çıkmış olabilir; başarısız sayılmadan önce kuyruk boşaltılır
+            dead = [fold for fold, (process, _) in running.items() if not process.is_alive()]
+            if dead:
+                while True:
+                    try:
+                        finish(*results.get(timeout=1))
+                    except queue.Empty:
+                        break
+            for fold in dead:
+                if fold in running:
+                    process, cpus = running.pop(fold)
+                    process.join()
+                    failed[fold] = f'İşlem beklenmedik şekilde sonlandı (çıkış kodu {process.exitcode})'
+                    print(f"Fold {fold} başarısız: {failed[fold]}")
+                    free_slots.append(cpus)
+
+    manifest = kod.load_manifest()
+    if failed:
+        manifest['failed'] = {str(fold): error for fold, error in failed.items()}
+    else:
+        manifest.pop('failed', None)
+    if manifest['folds']:
+        manifest['summary'] = kod.summarize_folds(manifest)
+    kod.save_manifest(manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K-fold eğitimini paralel işlemlerde çalıştırır")
+    parser.add_argument('--workers', type=int, default=2, help='Aynı anda eğitilecek fold sayısı')
+    parser.add_argument('--inter-op-threads', type=int, default=1)
+    parser.add_argument('--folds', type=int, nargs='*', default=None, help='Yalnızca bu fold numaraları')
+    args = parser.parse_args()
+    manifest = run_parallel_kfold(args.workers, args.inter_op_threads, args.folds)
+    summary = manifest.get('summary')
+    if summary:
+        print(f"\nEn iyi fold: {summary['best_fold']} (test_acc={summary['best_test_acc']:.4f})")
+        print(f"Ortalama doğruluk: {summary['mean_test_acc']:.4f} ± {summary['std_test_acc']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
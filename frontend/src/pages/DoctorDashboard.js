@@ -366,7 +366,7 @@ const DoctorDashboard = ({ doctor, onLogout }) => {
                     }}
                   >
                     <img
-                      src={img.file_url}
+                      src={img.thumbnail_url || img.file_url}
                       alt="MR"
                       style={{
                         width: 80,
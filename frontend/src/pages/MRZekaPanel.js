@@ -22,26 +22,16 @@ const MRZekaPanel = ({ doctor, patients }) => {
     setError("");
     try {
       const blob = await (await fetch(imageDataUrl)).blob();
-      const uploadForm = new FormData();
-      uploadForm.append("file", blob, "mr_image.png");
-      uploadForm.append("patient_id", selectedPatient);
-      const uploadRes = await fetch(`${BACKEND_URL}/mrimages/upload`, {
+      // Görüntü tek istekte yüklenir, tahmin edilir ve kaydedilir
+      const ingestForm = new FormData();
+      ingestForm.append("file", blob, "mr_image.png");
+      ingestForm.append("patient_id", selectedPatient);
+      const response = await fetch(`${BACKEND_URL}/mrimages/ingest`, {
         method: "POST",
-        body: uploadForm,
+        body: ingestForm,
       });
-      const uploadData = await uploadRes.json();
-      if (!uploadRes.ok) throw new Error(uploadData.error || "MR yüklenemedi");
-      const mr_image_id = uploadData.id;
-      const predictForm = new FormData();
-      predictForm.append("file", blob, "mr_image.png");
-      predictForm.append("patient_id", selectedPatient);
-      predictForm.append("mr_image_id", mr_image_id);
-      const response = await fetch(`${BACKEND_URL}/predict`, {
-        method: "POST",
-        body: predictForm,
-      });
-      if (!response.ok) throw new Error("Tahmin alınamadı");
       const data = await response.json();
+      if (!response.ok) throw new Error(data.error || "Tahmin alınamadı");
       const pred = {
         type: data.predicted_class,
         score:
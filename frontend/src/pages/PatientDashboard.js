@@ -574,7 +574,7 @@ const PatientDashboard = ({ patient, onLogout }) => {
                 }}
               >
                 <img
-                  src={img.file_url}
+                  src={img.thumbnail_url || img.file_url}
                   alt="MR"
                   style={{
                     width: 80,
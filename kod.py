@@ -1,8 +1,10 @@
 import os
+import sys
+import json
 import numpy as np
 import matplotlib.pyplot as plt
-from tensorflow.keras.preprocessing.image import ImageDataGenerator, load_img, img_to_array
 from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.backend import clear_session
 from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D, BatchNormalization, Input
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
@@ -15,6 +17,12 @@ from collections import Counter
 from datetime import datetime
 from sklearn.model_selection import KFold
 
+# Eğitim ve sunucu aynı ön işleme modülünü kullanır (backend/preprocessing.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from preprocessing import list_images, preprocess_image
+from data_pipeline import decode_once, make_array_dataset
+from evaluation_store import EvaluationStore, compare_checkpoints, compute_metrics, image_hashes, print_comparison
+
 # Klasör yolları
 train_dir = r"C:\Users\Zeynep\Desktop\Class\Dataset\Train"
 test_dir = r"C:\Users\Zeynep\Desktop\Class\Dataset\Test"
@@ -24,109 +32,159 @@ img_size = 224  # EfficientNet için optimize boyut
 batch_size = 16  # 8'den 16'ya çıkaralım (daha iyi performans için)
 epochs = 20
 n_splits = 10
+export_format = 'tflite'  # Eğitim sonrası dışa aktarma: 'tflite', 'savedmodel' veya None
+export_quantize = 'float16'  # 'none', 'float16' veya 'int8'
+data_cache_dir = 'data_cache'  # Çözülen görüntüler burada .npy olarak saklanır (None ise yalnızca bellekte)
+manifest_path = 'kfold_manifest.json'  # Tamamlanan fold'ların sonuçları; yarım kalan eğitim buradan devam eder
+parallel_folds = 1  # 1'den büyükse fold'lar fold_scheduler.py ile ayrı işlemlerde paralel eğitilir
+mode = 'train'  # 'train' (tam k-fold eğitimi), 'features' (öznitelik önbelleği) veya 'sweep' (yalnızca başlık denemeleri)
+feature_store_dir = 'feature_store'  # Dondurulmuş gövde öznitelikleri (feature_cache.py)
+evaluation_store_dir = 'evaluation_store'  # Checkpoint başına test olasılıkları (evaluation_store.py)
+jit_compile = False  # True ise eğitim/değerlendirme adımları XLA ile derlenir (benchmarks/bench_compiled.py ile ölçün)
 
-# Data Augmentation
-train_datagen = ImageDataGenerator(
-    preprocessing_function=preprocess_input,
-    rotation_range=45,
-    width_shift_range=0.2,
-    height_shift_range=0.2,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    vertical_flip=True,
-    fill_mode='nearest',
-    brightness_range=[0.6, 1.4],
-    channel_shift_range=50.0,
-    validation_split=0.1
-)
-
-test_datagen = ImageDataGenerator(preprocessing_function=preprocess_input)
-
-# Train ve test generator'ları
-train_generator = train_datagen.flow_from_directory(
-    train_dir,
-    target_size=(img_size, img_size),
-    batch_size=batch_size,
-    class_mode='categorical',
-    subset='training',
-    shuffle=True
-)
-
-validation_generator = train_datagen.flow_from_directory(
-    train_dir,
-    target_size=(img_size, img_size),
-    batch_size=batch_size,
-    class_mode='categorical',
-    subset='validation',
-    shuffle=True
-)
-
-test_generator = test_datagen.flow_from_directory(
-    test_dir,
-    target_size=(img_size, img_size),
-    batch_size=batch_size,
-    class_mode='categorical',
-    shuffle=False
-)
-
-# Sınıf ağırlıklarını hesapla
-class_counts = Counter(train_generator.classes)
-total_samples = sum(class_counts.values())
-class_weights = {class_id: total_samples / (len(class_counts) * count) 
-                for class_id, count in class_counts.items()}
-
-# glioma_tumor için ağırlığı artır
-glioma_index = train_generator.class_indices['glioma_tumor']
-class_weights[glioma_index] *= 1.5
-
-# Sınıf isimlerini al
-class_names = list(train_generator.class_indices.keys())
-
-# K-fold cross validation
-kfold = KFold(n_splits=n_splits, shuffle=True, random_state=42)
-fold = 1
-fold_accuracies = []
-fold_losses = []
-
-for train_idx, val_idx in kfold.split(train_generator.classes):
-    print(f"\nFold {fold}/{n_splits}")
-    print("=" * 50)
-    
-    # Model oluştur
+# Sınıf isimleri (alfabetik klasör sırası, backend/app.py ile aynı)
+CLASS_NAMES = ["glioma_tumor", "meningioma_tumor", "no_tumor", "pituitary_tumor"]
+
+
+def prepare_data():
+    """
+    Eğitim ve test görüntülerini tüm fold'lar için bir kez çözer.
+
+    Returns:
+        dict: Çözülmüş görüntüler, etiketler ve sınıf isimleri
+    """
+    train_paths, y_train, class_names = list_images(train_dir)
+    test_paths, y_test, _ = list_images(test_dir)
+    train_cache = os.path.join(data_cache_dir, 'train.npy') if data_cache_dir else None
+    test_cache = os.path.join(data_cache_dir, 'test.npy') if data_cache_dir else None
+    return {
+        'train_paths': train_paths,
+        'train_images': decode_once(train_paths, train_cache, img_size),
+        'y_train': y_train,
+        'test_paths': test_paths,
+        'test_hashes': image_hashes(test_paths),
+        'test_images': decode_once(test_paths, test_cache, img_size),
+        'y_test': y_test,
+        'class_names': class_names,
+    }
+
+
+def compute_class_weights(labels, class_names, glioma_weight=1.5):
+    # Sınıf ağırlıklarını hesapla
+    class_counts = Counter(labels.tolist())
+    total_samples = sum(class_counts.values())
+    class_weights = {class_id: total_samples / (len(class_counts) * count)
+                     for class_id, count in class_counts.items()}
+
+    # glioma_tumor için ağırlığı artır
+    glioma_index = class_names.index('glioma_tumor')
+    class_weights[glioma_index] *= glioma_weight
+    return class_weights
+
+
+def load_base_weights():
+    """
+    ImageNet ağırlıklı EfficientNetB4'ü bir kez oluşturur ve ağırlıklarını bellekte tutar.
+    data_cache_dir ayarlıysa ağırlıklar diske de yazılır; paralel işçiler buradan okur.
+    """
+    cache_file = os.path.join(data_cache_dir, f'efficientnetb4_imagenet_{img_size}.npz') if data_cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        with np.load(cache_file) as cached:
+            return [cached[f'arr_{i}'] for i in range(len(cached.files))]
     base_model = EfficientNetB4(weights='imagenet', include_top=False, input_shape=(img_size, img_size, 3))
-    
+    weights = base_model.get_weights()
+    if cache_file:
+        os.makedirs(data_cache_dir, exist_ok=True)
+        tmp_file = cache_file + '.tmp.npz'
+        np.savez(tmp_file, *weights)
+        os.replace(tmp_file, cache_file)
+    return weights
+
+
+def add_head(x, num_classes=4, widths=(1024, 512, 256), dropouts=(0.5, 0.3, 0.2)):
+    # Sınıflandırma başlığı (orijinal haliyle: BN -> 1024 -> 512 -> 256 -> softmax)
+    x = BatchNormalization()(x)
+    for width, rate in zip(widths, dropouts):
+        x = Dense(width, activation='relu')(x)
+        x = Dropout(rate)(x)
+    return Dense(num_classes, activation='softmax')(x)
+
+
+def build_model(base_weights, num_classes=4):
+    # Model oluştur (ImageNet ağırlıkları tekrar indirilmez, bellekteki kopyadan alınır)
+    base_model = EfficientNetB4(weights=None, include_top=False, input_shape=(img_size, img_size, 3))
+    base_model.set_weights(base_weights)
+
     # Fine-tuning: Son 120 katmanı aç (performans için önemli)
     for layer in base_model.layers[:-120]:
         layer.trainable = False
     for layer in base_model.layers[-120:]:
         layer.trainable = True
-    
+
     # Model mimarisi (orijinal haliyle)
     inputs = Input(shape=(img_size, img_size, 3))
     x = base_model(inputs)
     x = GlobalAveragePooling2D()(x)
-    x = BatchNormalization()(x)
-    x = Dense(1024, activation='relu')(x)
-    x = Dropout(0.5)(x)
-    x = Dense(512, activation='relu')(x)
-    x = Dropout(0.3)(x)
-    x = Dense(256, activation='relu')(x)
-    x = Dropout(0.2)(x)
-    predictions = Dense(4, activation='softmax')(x)
-    
+    predictions = add_head(x, num_classes)
+
     model = Model(inputs=inputs, outputs=predictions)
-    
+
     # Optimizer
     optimizer = Adam(learning_rate=0.0001)
-    model.compile(optimizer=optimizer, 
-                 loss='categorical_crossentropy', 
-                 metrics=['accuracy'])
-    
+    model.compile(optimizer=optimizer,
+                  loss='categorical_crossentropy',
+                  metrics=['accuracy'],
+                  jit_compile=jit_compile)
+    return model
+
+
+def load_manifest(path=None):
+    path = path or manifest_path
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {'n_splits': n_splits, 'folds': {}}
+
+
+def save_manifest(manifest, path=None):
+    path = path or manifest_path
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fold_splits(data):
+    kfold = KFold(n_splits=n_splits, shuffle=True, random_state=42)
+    return list(kfold.split(data['y_train']))
+
+
+def train_fold(fold, train_idx, val_idx, data, base_weights):
+    """
+    Tek bir fold'u, o fold'un eğitim/doğrulama indeksleriyle eğitir ve test setinde değerlendirir.
+
+    Returns:
+        dict: Fold sonucu (model dosyası, test doğruluğu/kaybı ve eğitim geçmişi)
+    """
+    print(f"\nFold {fold}/{n_splits}")
+    print("=" * 50)
+
+    num_classes = len(data['class_names'])
+    train_ds = make_array_dataset(data['train_images'], data['y_train'], train_idx, num_classes,
+                                  batch_size, training=True)
+    # Doğrulama verisi eskisi gibi veri artırmalı okunur
+    val_ds = make_array_dataset(data['train_images'], data['y_train'], val_idx, num_classes,
+                                batch_size, training=True)
+    class_weights = compute_class_weights(data['y_train'][train_idx], data['class_names'])
+
+    # Önceki fold'un grafiğini bellekten temizle
+    clear_session()
+    model = build_model(base_weights, num_classes)
+
     # Model kaydetme
     current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
     model_filename = f'brain_tumor_model_fold{fold}_{current_time}.keras'
-    
+
     # Callbacks
     early_stop = EarlyStopping(
         monitor='val_loss',
@@ -134,7 +192,7 @@ for train_idx, val_idx in kfold.split(train_generator.classes):
         restore_best_weights=True,
         verbose=1
     )
-    
+
     checkpoint = ModelCheckpoint(
         model_filename,
         monitor='val_accuracy',
@@ -142,7 +200,7 @@ for train_idx, val_idx in kfold.split(train_generator.classes):
         mode='max',
         verbose=1
     )
-    
+
     reduce_lr = ReduceLROnPlateau(
         monitor='val_loss',
         factor=0.2,
@@ -150,158 +208,230 @@ for train_idx, val_idx in kfold.split(train_generator.classes):
         min_lr=0.00001,
         verbose=1
     )
-    
+
     # Eğitim
     history = model.fit(
-        train_generator,
+        train_ds,
         epochs=epochs,
-        validation_data=validation_generator,
+        validation_data=val_ds,
         callbacks=[early_stop, checkpoint, reduce_lr],
         class_weight=class_weights,
         verbose=1  # Epoch ilerlemesini göster
     )
-    
-    # Model değerlendirme
-    test_model = load_model(model_filename)
-    test_loss, test_acc = test_model.evaluate(test_generator)
+
+    # Model değerlendirme (değerlendirme adımı da eğitimle aynı şekilde derlenir). Test olasılıkları
+    # değerlendirme deposuna yazılır; rapor ve fold karşılaştırmaları tekrar çıkarım yapmaz
+    test_model = load_model(model_filename, compile=False)
+    test_model.compile(loss='categorical_crossentropy', metrics=['accuracy'], jit_compile=jit_compile)
+    test_probs = EvaluationStore(evaluation_store_dir).probabilities(
+        model_filename, data['test_hashes'], data['test_paths'], data['test_images'], model=test_model,
+        batch_size=batch_size, class_names=data['class_names'])
+    test_metrics = compute_metrics(data['y_test'], test_probs, data['class_names'])
+    test_loss, test_acc = test_metrics['loss'], test_metrics['accuracy']
     print(f"\nFold {fold} Test Doğruluk: {test_acc:.4f}")
     print(f"Fold {fold} Test Kayıp: {test_loss:.4f}")
-    
-    fold_accuracies.append(test_acc)
-    fold_losses.append(test_loss)
-    fold += 1
-
-# En iyi modeli bul
-best_fold_idx = np.argmax(fold_accuracies)
-best_accuracy = fold_accuracies[best_fold_idx]
-best_model_path = f'brain_tumor_model_fold{best_fold_idx + 1}_{current_time}.keras'
-
-print("\nEn İyi Model Bilgileri:")
-print("=" * 50)
-print(f"Fold: {best_fold_idx + 1}")
-print(f"Doğruluk: {best_accuracy:.4f}")
-print(f"Model Dosyası: {best_model_path}")
-
-# En iyi modeli yükle
-best_model = load_model(best_model_path)
-
-# En iyi fold'un eğitim grafikleri
-plt.figure(figsize=(12, 4))
-
-plt.subplot(1, 2, 1)
-plt.plot(history.history['accuracy'], label='Eğitim Doğruluğu')
-plt.plot(history.history['val_accuracy'], label='Doğrulama Doğruluğu')
-plt.title(f'En İyi Fold ({best_fold_idx + 1}) Model Doğruluk')
-plt.xlabel('Epoch')
-plt.ylabel('Doğruluk')
-plt.legend()
-
-plt.subplot(1, 2, 2)
-plt.plot(history.history['loss'], label='Eğitim Kayıp')
-plt.plot(history.history['val_loss'], label='Doğrulama Kayıp')
-plt.title(f'En İyi Fold ({best_fold_idx + 1}) Model Kayıp')
-plt.xlabel('Epoch')
-plt.ylabel('Kayıp')
-plt.legend()
-
-plt.tight_layout()
-plt.savefig('best_training_curves.png')
-plt.show()
-plt.close()
-
-# En iyi fold'un Confusion Matrix'i
-y_pred = best_model.predict(test_generator)
-y_pred_classes = np.argmax(y_pred, axis=1)
-y_true = test_generator.classes
-cm = confusion_matrix(y_true, y_pred_classes)
-
-plt.figure(figsize=(10, 8))
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-            xticklabels=class_names,
-            yticklabels=class_names)
-plt.title(f'En İyi Fold ({best_fold_idx + 1}) Confusion Matrix')
-plt.ylabel('True Label')
-plt.xlabel('Predicted Label')
-plt.savefig('best_confusion_matrix.png')
-plt.show()
-plt.close()
-
-# En iyi fold'un ROC eğrileri
-plt.figure(figsize=(10, 8))
-print("\nEn İyi Fold AUC Değerleri:")
-print("=" * 50)
-for i in range(len(class_names)):
-    fpr, tpr, _ = roc_curve(y_true == i, y_pred[:, i])
-    roc_auc = auc(fpr, tpr)
-    plt.plot(fpr, tpr, label=f'{class_names[i]} (AUC = {roc_auc:.2f})')
-    print(f"{class_names[i]}: {roc_auc:.4f}")
-
-plt.plot([0, 1], [0, 1], 'k--')
-plt.xlim([0.0, 1.0])
-plt.ylim([0.0, 1.05])
-plt.xlabel('False Positive Rate')
-plt.ylabel('True Positive Rate')
-plt.title(f'En İyi Fold ({best_fold_idx + 1}) ROC Curves')
-plt.legend(loc="lower right")
-plt.savefig('best_roc_curves.png')
-plt.show()
-plt.close()
-
-# En iyi modeli kaydet
-best_model.save('best_brain_tumor_model.keras')
-print("\nEn iyi model 'best_brain_tumor_model.keras' olarak kaydedildi.")
-
-# Sınıf sıralamalarını en sonda yazdır
-print("\nTrain class indices:", train_generator.class_indices)
-print("Test class indices:", test_generator.class_indices)
-
-def predict_tumor_type(image_path, model_path):
+
+    return {
+        'fold': fold,
+        'model_path': model_filename,
+        'test_acc': float(test_acc),
+        'test_loss': float(test_loss),
+        'test_macro_auc': test_metrics['macro_auc'],
+        'history': {k: [float(v) for v in values] for k, values in history.history.items()},
+        'completed_at': datetime.now().isoformat(),
+    }
+
+
+def run_kfold(data, base_weights=None):
+    """
+    K-fold eğitimini çalıştırır. Manifest dosyasında tamamlanmış görünen (ve model dosyası
+    duran) fold'lar atlanır; böylece yarıda kalan bir çalışma kaldığı yerden devam eder.
+    """
+    manifest = load_manifest()
+    for fold, (train_idx, val_idx) in enumerate(fold_splits(data), start=1):
+        done = manifest['folds'].get(str(fold))
+        if done and os.path.exists(done['model_path']):
+            print(f"\nFold {fold}/{n_splits} daha önce tamamlanmış, atlanıyor ({done['model_path']})")
+            continue
+        if base_weights is None:
+            base_weights = load_base_weights()
+        manifest['folds'][str(fold)] = train_fold(fold, train_idx, val_idx, data, base_weights)
+        save_manifest(manifest)
+    manifest['summary'] = summarize_folds(manifest)
+    save_manifest(manifest)
+    return manifest
+
+
+def best_fold(manifest):
+    # En iyi modeli bul (manifestteki fold sonuçlarından; dosya adı son fold'un zamanından üretilmez)
+    return max(manifest['folds'].values(), key=lambda entry: entry['test_acc'])
+
+
+def summarize_folds(manifest):
+    accuracies = [entry['test_acc'] for entry in manifest['folds'].values()]
+    losses = [entry['test_loss'] for entry in manifest['folds'].values()]
+    best = best_fold(manifest)
+    return {
+        'completed_folds': len(accuracies),
+        'mean_test_acc': float(np.mean(accuracies)),
+        'std_test_acc': float(np.std(accuracies)),
+        'mean_test_loss': float(np.mean(losses)),
+        'best_fold': best['fold'],
+        'best_test_acc': best['test_acc'],
+        'best_model_path': best['model_path'],
+    }
+
+
+def report_fold_comparison(manifest, data, output='fold_comparison.json'):
+    """
+    Fold'ları test seti üzerinde değerlendirme deposundaki olasılıklarla karşılaştırır
+    (fold metrikleri, olasılık ortalamasıyla topluluk ve fold'lar arası tahmin uyuşması).
+    Depoda kaydı olmayan fold'lar (ör. eski bir manifestten) bir kez değerlendirilir.
+    """
+    checkpoints = {f"fold{entry['fold']}": entry['model_path']
+                   for entry in sorted(manifest['folds'].values(), key=lambda entry: entry['fold'])}
+    result = compare_checkpoints(EvaluationStore(evaluation_store_dir), checkpoints, data['test_hashes'],
+                                 data['test_paths'], data['y_test'], data['class_names'], data['test_images'],
+                                 batch_size)
+    print_comparison(result)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return result
+
+
+def report_best_model(best, data):
+    class_names = data['class_names']
+    best_fold_no = best['fold']
+    best_model_path = best['model_path']
+    history = best['history']
+
+    print("\nEn İyi Model Bilgileri:")
+    print("=" * 50)
+    print(f"Fold: {best_fold_no}")
+    print(f"Doğruluk: {best['test_acc']:.4f}")
+    print(f"Model Dosyası: {best_model_path}")
+
+    # En iyi fold'un eğitim grafikleri
+    plt.figure(figsize=(12, 4))
+
+    plt.subplot(1, 2, 1)
+    plt.plot(history['accuracy'], label='Eğitim Doğruluğu')
+    plt.plot(history['val_accuracy'], label='Doğrulama Doğruluğu')
+    plt.title(f'En İyi Fold ({best_fold_no}) Model Doğruluk')
+    plt.xlabel('Epoch')
+    plt.ylabel('Doğruluk')
+    plt.legend()
+
+    plt.subplot(1, 2, 2)
+    plt.plot(history['loss'], label='Eğitim Kayıp')
+    plt.plot(history['val_loss'], label='Doğrulama Kayıp')
+    plt.title(f'En İyi Fold ({best_fold_no}) Model Kayıp')
+    plt.xlabel('Epoch')
+    plt.ylabel('Kayıp')
+    plt.legend()
+
+    plt.tight_layout()
+    plt.savefig('best_training_curves.png')
+    plt.show()
+    plt.close()
+
+    # En iyi fold'un Confusion Matrix'i (olasılıklar eğitim sırasında değerlendirme deposuna yazıldı)
+    y_pred = EvaluationStore(evaluation_store_dir).probabilities(
+        best_model_path, data['test_hashes'], data['test_paths'], data['test_images'], batch_size=batch_size,
+        class_names=class_names)
+    y_pred_classes = np.argmax(y_pred, axis=1)
+    y_true = data['y_test']
+    cm = confusion_matrix(y_true, y_pred_classes)
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                xticklabels=class_names,
+                yticklabels=class_names)
+    plt.title(f'En İyi Fold ({best_fold_no}) Confusion Matrix')
+    plt.ylabel('True Label')
+    plt.xlabel('Predicted Label')
+    plt.savefig('best_confusion_matrix.png')
+    plt.show()
+    plt.close()
+
+    # En iyi fold'un ROC eğrileri
+    plt.figure(figsize=(10, 8))
+    print("\nEn İyi Fold AUC Değerleri:")
+    print("=" * 50)
+    for i in range(len(class_names)):
+        fpr, tpr, _ = roc_curve(y_true == i, y_pred[:, i])
+        roc_auc = auc(fpr, tpr)
+        plt.plot(fpr, tpr, label=f'{class_names[i]} (AUC = {roc_auc:.2f})')
+        print(f"{class_names[i]}: {roc_auc:.4f}")
+
+    plt.plot([0, 1], [0, 1], 'k--')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title(f'En İyi Fold ({best_fold_no}) ROC Curves')
+    plt.legend(loc="lower right")
+    plt.savefig('best_roc_curves.png')
+    plt.show()
+    plt.close()
+
+    # En iyi modeli kaydet
+    best_model = load_model(best_model_path)
+    best_model.save('best_brain_tumor_model.keras')
+    print("\nEn iyi model 'best_brain_tumor_model.keras' olarak kaydedildi.")
+
+    # Sunucuda kullanılacak çıkarım modelini dışa aktar (doğruluk farkı Dataset/Test üzerinde raporlanır)
+    if export_format:
+        from export_model import export_model
+        export_model('best_brain_tumor_model.keras', 'exported_models', fmt=export_format,
+                     quantize=export_quantize, calibration_dir=train_dir, test_dir=test_dir)
+
+    # Sınıf sıralamalarını en sonda yazdır
+    print("\nClass indices:", {name: i for i, name in enumerate(class_names)})
+
+
+def predict_tumor_type(image_path, model_path, class_names=CLASS_NAMES):
     """
     Verilen MR görüntüsünün tümör türünü sınıflandırır ve olasılıkları gösterir.
-    
+
     Args:
         image_path (str): MR görüntüsünün dosya yolu
         model_path (str): Eğitilmiş model dosyasının yolu
+        class_names (list): Modeldeki sıraya göre sınıf isimleri
     """
-    # Görüntüyü yükle ve ön işle
-    img = load_img(image_path, target_size=(img_size, img_size))
-    img_array = img_to_array(img)
-    img_array = np.expand_dims(img_array, axis=0)
-    img_array = preprocess_input(img_array)
-    
+    # Görüntüyü yükle ve ön işle (sunucuyla aynı ön işleme)
+    img_array = preprocess_input(preprocess_image(image_path, img_size))
+
     # Modeli yükle
     model = load_model(model_path)
-    
+
     # Tahmin yap
     predictions = model.predict(img_array)
-    
-    # Sınıf isimlerini al
-    class_names = list(train_generator.class_indices.keys())
-    
+
     # Sonuçları göster
     print("\nTümör Sınıflandırma Sonuçları:")
     print("=" * 50)
     for i, class_name in enumerate(class_names):
         probability = predictions[0][i] * 100
         print(f"{class_name}: %{probability:.2f}")
-    
+
     # En yüksek olasılıklı sınıfı bul
     predicted_class = class_names[np.argmax(predictions[0])]
     max_probability = np.max(predictions[0]) * 100
-    
+
     print("\nTahmin:")
     print(f"Tümör Türü: {predicted_class}")
     print(f"Güven: %{max_probability:.2f}")
-    
+
     # Görüntüyü ve sonuçları görselleştir
     plt.figure(figsize=(10, 5))
-    
+
     # Görüntüyü göster
     plt.subplot(1, 2, 1)
-    plt.imshow(img)
+    plt.imshow(img_array[0].astype('uint8'))
     plt.title('MR Görüntüsü')
     plt.axis('off')
-    
+
     # Olasılık çubuğunu göster
     plt.subplot(1, 2, 2)
     y_pos = np.arange(len(class_names))
@@ -309,11 +439,34 @@ def predict_tumor_type(image_path, model_path):
     plt.yticks(y_pos, class_names)
     plt.xlabel('Olasılık (%)')
     plt.title('Sınıf Olasılıkları')
-    
+
     plt.tight_layout()
     plt.savefig('prediction_result.png')
     plt.show()
     plt.close()
 
+
+def main():
+    if mode in ('features', 'sweep'):
+        import feature_cache
+        if mode == 'features':
+            feature_cache.extract(feature_store_dir)
+        else:
+            feature_cache.sweep(feature_store_dir)
+        return
+    if parallel_folds > 1:
+        from fold_scheduler import run_parallel_kfold
+        manifest = run_parallel_kfold(parallel_folds)
+        data = prepare_data()
+    else:
+        data = prepare_data()
+        manifest = run_kfold(data)
+    report_fold_comparison(manifest, data)
+    report_best_model(best_fold(manifest), data)
+
+
+if __name__ == '__main__':
+    main()
+
 # Örnek kullanım:
-# predict_tumor_type('path/to/mr_image.jpg', 'brain_tumor_model_fold1_20240321_123456.keras') 
\ No newline at end of file
+# predict_tumor_type('path/to/mr_image.jpg', 'brain_tumor_model_fold1_20240321_123456.keras')